@@ -0,0 +1,31 @@
+import argparse
+import time
+
+from Models.Implementations.Examples.ExampleDecoder import ExampleDecoder
+
+"""
+Measures the ingest throughput of a decoder while its history grows.
+The throughput must not fall as the number of stored samples increases.
+Run from the root directory: python -m Benchmarks.DecoderIngestBenchmark
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--blocks', type=int, default=10, help="Number of measured blocks.")
+    parser.add_argument('--block-size', type=int, default=100000, help="Number of samples per block.")
+    args = parser.parse_args()
+
+    decoder = ExampleDecoder(None, None)
+    count = 0
+    for block in range(args.blocks):
+        start = time.perf_counter()
+        for i in range(count, count + args.block_size):
+            decoder.append(0, float(i), (1,))
+        duration = time.perf_counter() - start
+        count += args.block_size
+        print(f"history {count:>10d} samples: {args.block_size / duration:12.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
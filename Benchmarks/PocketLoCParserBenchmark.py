@@ -0,0 +1,73 @@
+import argparse
+import numpy as np
+import random
+import re
+import time
+
+from Models.Implementations.Receivers.PocketLoCReceiver import parse_frames, FRAME_FIELDS, FRAME_TERMINATOR, VALUE_COLUMNS
+from Utils.RingBuffer import RingBuffer
+from Utils.StreamFramer import DelimiterFramer
+
+"""
+Compares the frames per second of the bulk PocketLoC frame parser with the previous frame-by-frame parser.
+Both include storing the parsed values in the receiver buffer, the bulk parser also includes framing.
+Run from the root directory: python -m Benchmarks.PocketLoCParserBenchmark
+"""
+
+
+def generate_stream(num_frames):
+    """
+    Generates a byte stream of PocketLoC frames.
+    :param num_frames: Number of frames.
+    :return: Byte stream.
+    """
+    frames = []
+    for i in range(num_frames):
+        values = [f"{random.uniform(0, 65535):12.3f}" for _ in range(FRAME_FIELDS)]
+        values[6] = values[13] = "           0"
+        frames.append(",".join(values) + "\r\n")
+    return "".join(frames).encode('utf-8'), len(frames[0])
+
+
+def parse_frame_legacy(raw):
+    """
+    Previous parser, called once per frame.
+    :param raw: Bytes of a single frame.
+    :return: Values of both sensors and saturation flag.
+    """
+    raw_items = re.split(",", raw.decode('utf-8'))
+    values = [float(x) for x in raw_items[0:14]]
+    return values[0:6], values[7:13], values[6] > 0 or values[13] > 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=100000, help="Number of frames in the byte stream.")
+    parser.add_argument('--chunk', type=int, default=4096, help="Number of bytes per read.")
+    args = parser.parse_args()
+
+    stream, frame_length = generate_stream(args.frames)
+
+    buffer = RingBuffer(args.frames, len(VALUE_COLUMNS))
+    start = time.perf_counter()
+    for offset in range(0, len(stream), frame_length):
+        sensor0, sensor1, saturation = parse_frame_legacy(stream[offset:offset + frame_length])
+        buffer.push(time.time(), sensor0 + sensor1)
+    legacy = args.frames / (time.perf_counter() - start)
+
+    buffer = RingBuffer(args.frames, len(VALUE_COLUMNS))
+    start = time.perf_counter()
+    parsed = 0
+    framer = DelimiterFramer(FRAME_TERMINATOR)
+    for offset in range(0, len(stream), args.chunk):
+        frames, invalid = parse_frames(framer.feed(stream[offset:offset + args.chunk]))
+        buffer.push_block(np.full(len(frames), time.time()), frames[:, VALUE_COLUMNS])
+        parsed += len(frames)
+    bulk = parsed / (time.perf_counter() - start)
+
+    print(f"previous parser: {legacy:12.0f} frames/s")
+    print(f"bulk parser:     {bulk:12.0f} frames/s ({args.chunk} bytes per read, {parsed} frames)")
+
+
+if __name__ == "__main__":
+    main()
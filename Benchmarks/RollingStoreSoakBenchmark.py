@@ -0,0 +1,69 @@
+import argparse
+import numpy as np
+import tempfile
+import time
+import tracemalloc
+
+from Utils.SampleStore import RollingSampleStore, SampleStore
+
+"""
+Appends measurements to a rolling store for a long simulated session and reports the allocated memory.
+The memory of the rolling store must stay flat, while the memory of a store in RAM grows with the session.
+Run from the root directory: python -m Benchmarks.RollingStoreSoakBenchmark
+"""
+
+
+def soak(store, num_blocks, block_size, num_sensors, reports):
+    """
+    Appends blocks of measurements and prints the allocated memory.
+    :param store: Sample store.
+    :param num_blocks: Number of appended blocks.
+    :param block_size: Number of samples per block.
+    :param num_sensors: Number of sensors.
+    :param reports: Number of printed reports.
+    """
+    values = np.random.rand(block_size, num_sensors)
+    step = max(1, num_blocks // reports)
+    tracemalloc.start()
+    start = time.perf_counter()
+    for block in range(num_blocks):
+        timestamps = 1.0 + np.arange(block * block_size, (block + 1) * block_size) / 1000
+        store.extend(timestamps, values)
+        if (block + 1) % step == 0:
+            current, peak = tracemalloc.get_traced_memory()
+            print(f"{(block + 1) * block_size:>12d} samples: {current / 2 ** 20:8.1f} MiB allocated, "
+                  f"{peak / 2 ** 20:8.1f} MiB peak")
+    duration = time.perf_counter() - start
+    tracemalloc.stop()
+    print(f"{num_blocks * block_size / duration:.0f} samples/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=20000000, help="Number of samples in the session.")
+    parser.add_argument('--block-size', type=int, default=1000, help="Number of samples per block.")
+    parser.add_argument('--window', type=int, default=1000000, help="Window of the rolling store.")
+    parser.add_argument('--sensors', type=int, default=4, help="Number of sensors.")
+    parser.add_argument('--reports', type=int, default=10, help="Number of printed reports.")
+    parser.add_argument('--compare', action='store_true', help="Also run the session with a store in RAM.")
+    args = parser.parse_args()
+
+    num_blocks = args.samples // args.block_size
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"rolling store (window {args.window} samples):")
+        store = RollingSampleStore(directory, "receiver00", args.window, args.sensors)
+        soak(store, num_blocks, args.block_size, args.sensors, args.reports)
+
+        # Reading back the beginning of the session from the archive
+        start = time.perf_counter()
+        timestamps, values = store.get_range(1.0, 1.0 + args.window / 1000)
+        print(f"paged in {len(timestamps)} archived samples in {1000 * (time.perf_counter() - start):.1f} ms")
+        del store
+
+    if args.compare:
+        print("store in RAM:")
+        soak(SampleStore(args.window, args.sensors), num_blocks, args.block_size, args.sensors, args.reports)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+import numpy as np
+
+from Utils.SampleStore import SampleStore
+
+"""
+Measures the cost per appended sample of the sample store for a growing number of samples.
+The previous implementation, which grew its arrays in fixed steps, is measured for comparison.
+Run from the root directory: python -m Benchmarks.SampleStoreBenchmark
+"""
+
+STEP = 10000
+
+
+class FixedStepStore:
+    """
+    Previous growth strategy of the decoder: arrays are enlarged by a fixed number of entries.
+    """
+    def __init__(self, num_sensors):
+        self.length = 0
+        self.timestamps = np.empty((STEP,))
+        self.values = np.empty((STEP, num_sensors))
+
+    def append(self, timestamp, values):
+        if self.length == len(self.timestamps):
+            self.timestamps = np.concatenate((self.timestamps, np.empty((STEP,))))
+            self.values = np.vstack((self.values, np.empty((STEP, self.values.shape[1]))))
+        self.timestamps[self.length] = timestamp
+        self.values[self.length] = values
+        self.length += 1
+
+
+def run(store, max_exponent, num_sensors):
+    """
+    Appends 10^max_exponent samples and prints the mean cost per sample for every decade.
+    :param store: Store to be benchmarked.
+    :param max_exponent: Exponent of the total number of samples.
+    :param num_sensors: Number of sensors.
+    """
+    values = np.ones((num_sensors,))
+    count = 0
+    for exponent in range(1, max_exponent + 1):
+        target = 10 ** exponent
+        start = time.perf_counter()
+        for i in range(count, target):
+            store.append(float(i), values)
+        duration = time.perf_counter() - start
+        print(f"{count:>12d} - {target:<12d} {1e9 * duration / (target - count):8.1f} ns/sample")
+        count = target
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-exponent', type=int, default=7, help="Append up to 10^N samples (use 8 for 10^8).")
+    parser.add_argument('--legacy-max-exponent', type=int, default=6, help="Append up to 10^N samples with the previous implementation.")
+    parser.add_argument('--sensors', type=int, default=1, help="Number of sensors per sample.")
+    args = parser.parse_args()
+
+    print("SampleStore (geometric growth)")
+    run(SampleStore(STEP, args.sensors), args.max_exponent, args.sensors)
+    print("Previous implementation (fixed step growth)")
+    run(FixedStepStore(args.sensors), args.legacy_max_exponent, args.sensors)
+
+
+if __name__ == "__main__":
+    main()
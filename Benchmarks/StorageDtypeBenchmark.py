@@ -0,0 +1,69 @@
+import argparse
+import numpy as np
+import time
+import tracemalloc
+
+from Utils.SampleStore import SampleStore
+
+"""
+Fills sample stores with the storage dtypes of the receivers and reports their memory and the time to read the values
+back as physical values, once decimated as for the plot and once completely as for the export.
+Run from the root directory: python -m Benchmarks.StorageDtypeBenchmark
+"""
+
+# Storage dtype, scale and offset, e.g., the int32 setup of the AD7746 receiver (raw 24-bit codes to fF)
+CONFIGURATIONS = [
+    ('float64', np.float64, None, None),
+    ('float32', np.float32, None, None),
+    ('int32 + scale/offset', np.int32, 4096 / 8388607, -8388608 * 4096 / 8388607)
+]
+
+
+def fill(dtype, scale, offset, num_samples, block_size, num_sensors):
+    """
+    Appends raw codes block by block to a new store and measures the allocated memory.
+    :param dtype: Storage dtype.
+    :param scale: Scale from stored to physical values.
+    :param offset: Offset from stored to physical values.
+    :param num_samples: Number of appended samples.
+    :param block_size: Number of samples per block.
+    :param num_sensors: Number of sensors.
+    :return: Store and allocated memory in bytes.
+    """
+    codes = np.random.randint(0, 2 ** 24, size=(block_size, num_sensors))
+    values = codes if scale is not None else codes * 4096 / 8388607 - 4096
+    tracemalloc.start()
+    store = SampleStore(num_samples, num_sensors, dtype, scale, offset)
+    for block in range(num_samples // block_size):
+        store.extend(1.0 + np.arange(block * block_size, (block + 1) * block_size) / 1000, values)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--samples', type=int, default=10000000, help="Number of samples per store.")
+    parser.add_argument('--block-size', type=int, default=1000, help="Number of samples per block.")
+    parser.add_argument('--sensors', type=int, default=4, help="Number of sensors.")
+    parser.add_argument('--step-size', type=int, default=100, help="Decimation of the plot.")
+    args = parser.parse_args()
+
+    for name, dtype, scale, offset in CONFIGURATIONS:
+        store, allocated = fill(dtype, scale, offset, args.samples, args.block_size, args.sensors)
+
+        start = time.perf_counter()
+        store.to_physical(store.get_values()[::args.step_size])
+        plot_duration = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.to_physical(store.get_values())
+        export_duration = time.perf_counter() - start
+
+        print(f"{name:>22s}: {allocated / 2 ** 20:8.1f} MiB ({allocated / store.length:5.1f} bytes/sample), "
+              f"plot {1000 * plot_duration:7.1f} ms, export {1000 * export_duration:7.1f} ms")
+        del store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import numpy as np
+import scipy.ndimage
+import time
+
+from Utils.SampleStore import SampleStore
+from Utils.StreamingFilter import StreamingGaussianFilter
+
+"""
+Simulates the decode frames of the LDC1614 decoder and compares the time per frame of the streaming Gaussian filter with
+filtering the whole history with scipy.ndimage.gaussian_filter1d (only on the reported frames) while the history grows.
+The time per frame of the streaming filter must not grow with the number of stored samples.
+Run from the root directory: python -m Benchmarks.StreamingFilterBenchmark
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=40000, help="Number of decode frames.")
+    parser.add_argument('--frame-size', type=int, default=50, help="Number of new samples per frame.")
+    parser.add_argument('--report', type=int, default=5000, help="Number of frames per reported line.")
+    parser.add_argument('--sensors', type=int, default=4, help="Number of sensors.")
+    parser.add_argument('--sigma', type=float, default=2.0, help="Standard deviation of the Gaussian kernel.")
+    args = parser.parse_args()
+
+    store = SampleStore(10000, args.sensors)
+    streaming = StreamingGaussianFilter(args.sigma, args.sensors)
+    values = np.random.normal(size=(args.frame_size, args.sensors))
+    streaming_duration = 0
+    for frame in range(args.frames):
+        store.extend(frame * args.frame_size + np.arange(args.frame_size), values)
+
+        start = time.perf_counter()
+        timestamps, filtered, length = streaming.update(store)
+        streaming_duration += time.perf_counter() - start
+
+        if (frame + 1) % args.report == 0:
+            start = time.perf_counter()
+            full = scipy.ndimage.gaussian_filter1d(store.get_values(), args.sigma, axis=0)
+            full_duration = time.perf_counter() - start
+            # Both filters give the same settled values
+            assert np.array_equal(filtered[:length], full[:length])
+            print(f"history {store.length:>10d} samples: full {1000 * full_duration:8.3f} ms/frame, "
+                  f"streaming {1000 * streaming_duration / args.report:8.3f} ms/frame")
+            streaming_duration = 0
+
+
+if __name__ == "__main__":
+    main()
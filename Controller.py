@@ -114,7 +114,7 @@ class Controller:
         This is called when the user presses on the Clear button.
         """
         self.view.decoder_clear()
-        self.model.decoder.clear()
+        self.model.clear_decoder()
 
     def edit_decoder_parameters(self):
         """
@@ -156,6 +156,17 @@ class Controller:
     def export_symbol_values(self, filename):
         self.model.decoder.export_symbol_values(filename)
 
+    def get_aggregates(self, receiver_index, start_time, end_time, max_buckets):
+        """
+        Gets the minimum, maximum and mean of the measurements of a receiver per time bucket.
+        :param receiver_index: Index of the receiver.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :param max_buckets: Maximum number of buckets.
+        :return: Bucket centers, minimum, maximum and mean if available, else None.
+        """
+        return self.model.get_aggregates(receiver_index, start_time, end_time, max_buckets)
+
     def get_available_decoders(self):
         """
         Get a list of available decoders.
@@ -170,6 +181,14 @@ class Controller:
         """
         return self.model.get_available_encoders()
 
+    def get_changes_since(self, version):
+        """
+        Gets the current decoder snapshot together with the changes since a previous version.
+        :param version: Version of the last snapshot that was processed.
+        :return: Changes if they are available, else None.
+        """
+        return self.model.get_changes_since(version)
+
     def get_decoded(self):
         """
         Gets value updates from the decoder.
@@ -193,6 +212,27 @@ class Controller:
         """
         return self.model.get_encoder_info()
 
+    def get_received(self, receiver_index, start_time, end_time):
+        """
+        Gets the measurements of a receiver within a time range, including archived ones.
+        :param receiver_index: Index of the receiver.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :return: Timestamps and values if available, else None.
+        """
+        return self.model.get_received(receiver_index, start_time, end_time)
+
+    def load_session(self, directory):
+        """
+        Opens a session that was recorded with storage mode memmap, e.g., after a crash.
+        This is called when the user selects a session directory in the menu.
+        :param directory: Session directory.
+        """
+        if not directory:
+            return
+        if self.model.load_session(directory):
+            self.view.decoder_clear()
+
     def remove_decoder(self):
         """
         Removes the decoder.
@@ -210,10 +250,10 @@ class Controller:
     def run(self, sleep_time):
         """
         Main progam loop.
-        :param sleep_time: Sleep time in seconds, this is necessary in order for the GUI not to freeze and crash at some point.
+        Decoding runs in the decode worker of the model (see Models/DecodeWorker.py), so the loop is not blocked by slow
+        decoders and only waits until the program is closed.
+        :param sleep_time: Time in seconds between two checks.
         """
-        if self.model.is_decoder_active():
-            self.model.decoder.decode()
         time.sleep(sleep_time)
 
     def run_gui(self):
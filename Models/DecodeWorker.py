@@ -0,0 +1,132 @@
+import threading
+import time
+
+from Utils import Logging
+from Utils.RunningStatistics import RunningStatistics
+
+"""
+This module implements the thread that runs the decode steps of a decoder while it is active.
+"""
+
+# Maximum time in seconds the worker waits for new measurements before decoding anyway
+IDLE_TIMEOUT = 1.0
+# Maximum time in seconds stop waits for a running decode step to finish
+STOP_TIMEOUT = 1.0
+
+
+class DataEvent(threading.Event):
+    """
+    Event that receivers set when new measurements are available.
+    It remembers when it was first set after it has been cleared, i.e., since when measurements wait to be decoded.
+    """
+    def __init__(self):
+        super().__init__()
+        self.set_time = None
+
+    def clear(self):
+        self.set_time = None
+        super().clear()
+
+    def set(self):
+        if self.set_time is None:
+            self.set_time = time.time()
+        super().set()
+
+
+class DecodeWorker:
+    """
+    Runs the decode steps of a decoder in a dedicated (daemon) thread.
+    The worker wakes up as soon as a receiver signals new measurements (see DataEvent), bursts of measurements are
+    coalesced, so that decode steps are at least min_interval apart. The latency from the first signalled measurement
+    to the end of the decode step that processed it is kept in latency (last step) and latency_statistics (all steps
+    since the worker was started), it is logged when the worker is stopped.
+    """
+    def __init__(self, decoder, min_interval):
+        """
+        Initializes the worker.
+        :param decoder: Decoder whose decode steps are run.
+        :param min_interval: Minimum time in seconds between the start of two decode steps.
+        """
+        self.decoder = decoder
+        self.min_interval = min_interval
+
+        # Set by clear, the decoder is cleared by the worker thread before the next decode step
+        self.clear_done = threading.Event()
+        self.clear_requested = False
+        self.last_decode_time = 0
+        self.latency = None
+        self.latency_statistics = RunningStatistics(1)
+        self.running = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def run(self):
+        """
+        Loop of the worker thread, runs a decode step whenever measurements have been signalled (at least every
+        IDLE_TIMEOUT seconds).
+        """
+        event = self.decoder.data_event
+        while self.running:
+            event.wait(IDLE_TIMEOUT)
+            # Let bursts of measurements accumulate, stop interrupts the waiting
+            remaining = self.last_decode_time + self.min_interval - time.time()
+            if remaining > 0 and self.stop_event.wait(remaining):
+                break
+            if not self.running:
+                break
+            if self.clear_requested:
+                self.clear_requested = False
+                event.clear()
+                self.decoder.clear()
+                self.clear_done.set()
+                continue
+
+            set_time = event.set_time
+            event.clear()
+            self.last_decode_time = time.time()
+            self.decoder.decode()
+            if set_time is not None:
+                now = time.time()
+                self.latency = now - set_time
+                self.latency_statistics.update([now], [[self.latency]])
+
+    def clear(self):
+        """
+        Clears the decoder in the worker thread, which is the only consumer of the receiver buffers, and waits until
+        it is done (at most STOP_TIMEOUT seconds).
+        """
+        self.clear_done.clear()
+        self.clear_requested = True
+        # Wakes the worker if it waits for measurements
+        self.decoder.data_event.set()
+        if not self.clear_done.wait(STOP_TIMEOUT):
+            Logging.warning("Decoder was not cleared in time, it is cleared before the next decode step.")
+
+    def start(self):
+        """
+        Starts the worker thread.
+        """
+        self.running = True
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops the worker thread and waits until a running decode step has finished (at most STOP_TIMEOUT seconds).
+        """
+        self.running = False
+        self.stop_event.set()
+        # Wakes the worker if it waits for measurements
+        self.decoder.data_event.set()
+        if self.thread is not None:
+            self.thread.join(STOP_TIMEOUT)
+            if self.thread.is_alive():
+                Logging.warning("Decode step did not finish in time, the decoder is stopped anyway.")
+        self.thread = None
+        self.decoder.data_event.clear()
+        count = self.latency_statistics.count[0]
+        if count > 0:
+            Logging.info(f"Decode latency of the last {count} steps: mean "
+                         f"{1000 * self.latency_statistics.mean[0]:.1f} ms, maximum "
+                         f"{1000 * self.latency_statistics.maximum[0]:.1f} ms.")
@@ -5,15 +5,21 @@ import serial
 import serial.tools.list_ports
 
 from Models.Interfaces.DecoderInterface import DecoderInterface
+from Models.Interfaces.SequenceCodec import SequenceCodec
 from Models.Implementations.Receivers.AD7746Receiver import AD7746Receiver
 
 NEGATIVE_DETECTION_THRESHOLD = True
+# Length of the quiet period at the start of a transmission that the detection threshold is derived from
+REFERENCE_LENGTH = 2 #seconds
 
 class AD7746Decoder(DecoderInterface):
     def __init__(self, parameters, parameter_values):
         super().__init__(parameters, parameter_values)
 
         self.parameter_values = parameter_values
+        self.reference_length = REFERENCE_LENGTH
+        #binary CSK, 3 sync symbols and 8 bits per character
+        self.codec = SequenceCodec(8, sync_symbols=3)
         self.parameters_edited()
 
         super().setup()
@@ -62,6 +68,8 @@ class AD7746Decoder(DecoderInterface):
 
         self.abs_detection_threshold = 0
         self.first_symbol_edge = 0
+        self.scan_count = 0
+        self.threshold_pass = None
 
         receiver = AD7746Receiver(self.port, self.conversion_time, self.excitation_level, self.active_channel, self.diff_mode)
         self.receivers = [receiver]
@@ -71,6 +79,8 @@ class AD7746Decoder(DecoderInterface):
         self.abs_detection_threshold = 0
         self.abs_variation = 0
         self.first_symbol_edge = 0
+        self.scan_count = 0
+        self.threshold_pass = None
         return super().clear()
 
     def decoder_started(self):
@@ -98,24 +108,32 @@ class AD7746Decoder(DecoderInterface):
         pass
 
     def calculate_symbol_intervals(self):
-        ref_threshold_length = 2 #seconds
+        """
+        Appends all symbol intervals that have started since the last step, once the first symbol has been found.
+        """
+        if self.first_symbol_edge == 0 and not self.synchronize():
+            return
 
-        if self.first_symbol_edge > 0:
+        next_edge = self.symbol_intervals[-1] + self.symbol_duration
+        while self.max_timestamp > next_edge:
+            self.symbol_intervals.append(next_edge)
             next_edge = self.symbol_intervals[-1] + self.symbol_duration
-            if self.max_timestamp > next_edge:
-                self.symbol_intervals.append(next_edge)
-            
-            return
-        
-        if self.max_timestamp - self.min_timestamp < ref_threshold_length:
+
+    def synchronize(self):
+        """
+        Searches the first symbol and starts the symbol intervals with it.
+        Only the samples that have been received since the last step are scanned for the first threshold pass, the
+        position of the scan is kept in scan_count (number of samples since the start, including archived samples).
+        :return: Whether the first symbol has been found.
+        """
+        reference_range = self.get_reference_range()
+        if reference_range is None:
             #We have to wait for enough samples
-            return
+            return False
         elif self.abs_detection_threshold == 0:
-            #Use start of transmission to determine a first peak threshold
-            quiet_stop = np.argmax(self.timestamps[0] > self.min_timestamp + ref_threshold_length)
-            
-            max_value = max(self.received[0][0:quiet_stop])
-            min_value = min(self.received[0][0:quiet_stop])
+            #Use start of transmission (statistics of the first REFERENCE_LENGTH seconds) to determine a first peak threshold
+            #Thresholds are physical values (pF), like the statistics
+            min_value, max_value = reference_range
             self.abs_variation = max_value - min_value
 
             if NEGATIVE_DETECTION_THRESHOLD:
@@ -123,40 +141,53 @@ class AD7746Decoder(DecoderInterface):
             else:
                 self.abs_detection_threshold = min_value + self.abs_variation*(self.threshold_factor + 0.5)
 
-        else:
+        offset, length = self.offsets[0], self.lengths[0]
+        if self.threshold_pass is None:
             #find first threshold pass to detect first peak
-            threshold_pass = 0
+            start = max(0, self.scan_count - offset)
+            self.scan_count = offset + length
+            #Missing values become NaN and never pass the threshold
+            values = self.stores[0].to_physical(self.received[0][start:length, 0], 0)
             if NEGATIVE_DETECTION_THRESHOLD:
-                threshold_pass = np.argmax(self.received[0] < self.abs_detection_threshold)
+                passed = values < self.abs_detection_threshold
             else:
-                threshold_pass = np.argmax(self.received[0] > self.abs_detection_threshold)
-
-            if threshold_pass > 0:
-                first_peak_end_limit = np.argmax(self.timestamps[0] > self.timestamps[0][threshold_pass] + self.symbol_duration)
-                if first_peak_end_limit > 0:
-                    first_peak = 0
-                    if NEGATIVE_DETECTION_THRESHOLD:
-                        first_peak = np.argmin(self.received[0][threshold_pass:first_peak_end_limit])
-                    else:
-                        first_peak = np.argmax(self.received[0][threshold_pass:first_peak_end_limit])
+                passed = values > self.abs_detection_threshold
+            passes = np.flatnonzero(passed)
+            if len(passes) == 0:
+                return False
+            self.threshold_pass = offset + start + passes[0]
+
+        threshold_pass = max(0, self.threshold_pass - offset)
+        #The peak is centered in its symbol interval, so it follows the threshold pass within half a symbol duration
+        #and the search must not reach into the peak of the next symbol
+        first_peak_end_limit = self.index_of(0, self.timestamps[0][threshold_pass] + self.symbol_duration/2)
+        if first_peak_end_limit == length:
+            #Wait until the first symbol is complete
+            return False
+        if NEGATIVE_DETECTION_THRESHOLD:
+            first_peak = np.argmin(self.received[0][threshold_pass:first_peak_end_limit, 0])
+        else:
+            first_peak = np.argmax(self.received[0][threshold_pass:first_peak_end_limit, 0])
 
-                    #center first peak in first symbol interval
-                    self.first_symbol_edge = self.timestamps[0][threshold_pass+first_peak] - self.symbol_duration/2
-                    self.symbol_intervals = [self.first_symbol_edge]
+        #center first peak in first symbol interval
+        self.first_symbol_edge = self.timestamps[0][threshold_pass+first_peak] - self.symbol_duration/2
+        self.symbol_intervals = [self.first_symbol_edge]
+        return True
 
     def calculate_symbol_values(self):
-        
-        if len(self.symbol_intervals)-1 > len(self.symbol_values):
-            start_time = self.symbol_intervals[-2]
-            end_time = self.symbol_intervals[-1]
-
-            start_index = np.argmax(self.timestamps[0] > start_time)
-            end_index = np.argmax(self.timestamps[0] > end_time)
-
-            if start_index == 0 or start_index == end_index:
+        """
+        Assigns values to all complete symbol intervals that do not have a value yet.
+        """
+        while len(self.symbol_intervals)-1 > len(self.symbol_values):
+            start_time = self.symbol_intervals[len(self.symbol_values)]
+            end_time = self.symbol_intervals[len(self.symbol_values)+1]
+
+            #Wait until the interval is complete
+            if self.index_of(0, end_time) == self.lengths[0]:
                 return
 
-            interval_data = self.received[0][start_index:end_index]
+            interval_timestamps, interval_data = self.get_range(0, start_time, end_time)
+            interval_data = self.stores[0].to_physical(interval_data)
 
             #So far only binary CSK
             symbol_value = self.binary_threshold_detection(interval_data)
@@ -164,6 +195,9 @@ class AD7746Decoder(DecoderInterface):
             self.symbol_values.append(symbol_value)
 
     def binary_threshold_detection(self, interval_data):
+        if len(interval_data) == 0:
+            #No samples in the interval (e.g., after a gap of the receiver)
+            return 0
         if NEGATIVE_DETECTION_THRESHOLD:
             #Downward symbols
             min_index = np.argmin(interval_data)
@@ -177,24 +211,10 @@ class AD7746Decoder(DecoderInterface):
         return 0
 
     def calculate_sequence(self):
-
-        #binary CSK
-        sync_symbols = 3
-        symbol_length = 8
-
-        received_seq_length = np.floor((len(self.symbol_values)-3)/symbol_length)
-
-        if received_seq_length > 0 and received_seq_length > len(self.sequence):
-            #We have something to decode
-
-            seq_start = len(self.sequence)*symbol_length+sync_symbols
-
-            chr_value = 0
-
-            for i in range(symbol_length):
-                chr_value += (self.symbol_values[seq_start+i]<<(7-i))
-
-            self.sequence += chr(chr_value)
+        """
+        Decodes all characters whose symbols have been received.
+        """
+        self.sequence += self.codec.decode(self.symbol_values, len(self.sequence))
 
     def shutdown(self):
         if self.receivers is not None:
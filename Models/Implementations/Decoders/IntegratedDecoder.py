@@ -138,7 +138,7 @@ class IntegratedDecoder(DecoderInterface):
             return
         elif self.abs_detection_threshold == 0:
             #Use start of transmission to determine a first peak threshold
-            quiet_stop = np.argmax(self.timestamps[0] > self.min_timestamp + ref_threshold_length)
+            quiet_stop = self.index_of(0, self.min_timestamp + ref_threshold_length)
 
             min_value = min(self.received[0][0:quiet_stop])
             abs_variation = max(self.received[0][0:quiet_stop]) - min_value
@@ -147,10 +147,10 @@ class IntegratedDecoder(DecoderInterface):
 
         else:
             #find first threshold pass to detect first peak
-            threshold_pass = np.argmax(self.received[0] > self.abs_detection_threshold)
+            threshold_pass = np.argmax(self.received[0][:self.lengths[0]] > self.abs_detection_threshold)
             if threshold_pass > 0:
-                first_peak_end_limit = np.argmax(self.timestamps[0] > self.timestamps[0][threshold_pass] + self.symbol_duration)
-                if first_peak_end_limit > 0:
+                first_peak_end_limit = self.index_of(0, self.timestamps[0][threshold_pass] + self.symbol_duration)
+                if first_peak_end_limit < self.lengths[0]:
                     first_peak = np.argmax(self.received[0][threshold_pass:first_peak_end_limit])
 
                     #center first peak in first symbol interval
@@ -2,7 +2,6 @@
 Author: Benjamin Schiller
 E-mail: benjamin.bs.schiller@fau.de
 """
-import scipy.ndimage
 import serial
 import serial.tools.list_ports
 import numpy as np
@@ -10,6 +9,8 @@ import numpy as np
 from Models.Interfaces.DecoderInterface import DecoderInterface
 from Models.Implementations.Receivers.LDC1614EVMReceiver import LDC1614EVMReceiver
 from Utils import Logging
+from Utils.Settings import SettingsStore
+from Utils.StreamingFilter import StreamingGaussianFilter
 
 CLK_IN_MHZ = 40.0
 
@@ -30,17 +31,15 @@ class LDC1614EVMDecoder(DecoderInterface):
     def calculate_additional_datalines(self):
         """
         Generates Gaussian filtered version of the datalines.
-        Note: Can be optimized by avoiding re-calculating old values every time.
+        Only the new values are filtered (see Utils/StreamingFilter.py).
         """
-        received = self.decoded['received']
-        lengths, timestamps = received['lengths'], received['timestamps']
+        # Only settled values are returned, the datalines lag the radius of the filter behind the measurements
+        timestamps, filtered, length = self.gaussian_filter.update(self.stores[0])
+        # No values available
+        if length == 0:
+            return
         for i in range(self.active_channels):
-            sensor_values = self.get_received(0, i)
-            # No values available
-            if sensor_values is None:
-                return
-            sensor_filtered = scipy.ndimage.gaussian_filter1d(sensor_values, self.sigma)
-            dataline = {'length': lengths[0], 'timestamps': timestamps[0][:lengths[0]], 'values': sensor_filtered}
+            dataline = {'length': length, 'timestamps': timestamps[:length], 'values': filtered[:length, i]}
             self.additional_datalines[i] = dataline
 
     def parameters_edited(self):
@@ -95,9 +94,13 @@ class LDC1614EVMDecoder(DecoderInterface):
         self.receivers = [receiver]
         self.receiver_names = ["LDC1614"]
 
+        self.gaussian_filter = StreamingGaussianFilter(self.sigma, self.active_channels,
+                                                       SettingsStore.settings['DECODER_ARRAY_LENGTH'])
+
     def clear(self):
         self.abs_detection_threshold = 0
         self.first_symbol_edge = 0
+        self.gaussian_filter.clear()
         return super().clear()
 
     def calculate_symbol_intervals(self):
@@ -116,7 +119,8 @@ class LDC1614EVMDecoder(DecoderInterface):
             return
         elif self.abs_detection_threshold == 0:
             #Use start of transmission to determine a first peak threshold
-            quiet_stop = np.argmax(self.timestamps[0] > self.min_timestamp + ref_threshold_length)
+            #Values are raw conversion results, thresholds are only compared with them and not converted
+            quiet_stop = self.index_of(0, self.min_timestamp + ref_threshold_length)
 
             min_value = min(self.received[0][0:quiet_stop])
             abs_variation = max(self.received[0][0:quiet_stop]) - min_value
@@ -125,10 +129,10 @@ class LDC1614EVMDecoder(DecoderInterface):
 
         else:
             #find first threshold pass to detect first peak
-            threshold_pass = np.argmax(self.received[0] > self.abs_detection_threshold)
+            threshold_pass = np.argmax(self.received[0][:self.lengths[0]] > self.abs_detection_threshold)
             if threshold_pass > 0:
-                first_peak_end_limit = np.argmax(self.timestamps[0] > self.timestamps[0][threshold_pass] + self.symbol_duration)
-                if first_peak_end_limit > 0:
+                first_peak_end_limit = self.index_of(0, self.timestamps[0][threshold_pass] + self.symbol_duration)
+                if first_peak_end_limit < self.lengths[0]:
                     first_peak = np.argmax(self.received[0][threshold_pass:first_peak_end_limit])
 
                     #center first peak in first symbol interval
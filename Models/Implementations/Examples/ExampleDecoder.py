@@ -1,6 +1,7 @@
 import numpy as np
 
 from Models.Interfaces.DecoderInterface import DecoderInterface
+from Models.Interfaces.SequenceCodec import SequenceCodec
 from Models.Implementations.Examples.ExampleReceiver import ExampleReceiver
 
 
@@ -9,34 +10,44 @@ class ExampleDecoder(DecoderInterface):
         super().__init__(parameters, parameter_values)
 
         self.receivers = [ExampleReceiver()]
+        # 7 bits per character, every bit is sent as value + 1 followed by 0 (see ExampleEncoder)
+        self.codec = SequenceCodec(7, symbol_stride=2, symbol_offset=1)
+        # Number of samples (since the start) that have been scanned for edges
+        self.edge_count = 0
 
         super().setup()
 
+    def clear(self):
+        self.edge_count = 0
+        return super().clear()
+
     def calculate_symbol_intervals(self):
-        l = self.lengths[0]
-        if l > 0:
-            difference = self.received[0][1:l] - self.received[0][0:l-1]
-            indices = list(np.nonzero(np.array(difference))[0])
-            self.symbol_intervals = [self.timestamps[0][i] for i in indices]
+        """
+        Appends a symbol interval for every value change in the samples that have been received since the last step.
+        """
+        offset, length = self.offsets[0], self.lengths[0]
+        if length == 0:
+            return
+        # The last scanned sample is needed for the change to the first new sample
+        start = max(0, self.edge_count - offset - 1)
+        self.edge_count = offset + length
+        values = self.received[0][start:length]
+        indices = np.flatnonzero(np.any(values[1:] != values[:-1], axis=1))
+        self.symbol_intervals += self.timestamps[0][start + indices].tolist()
 
     def calculate_symbol_values(self):
+        """
+        Assigns the rounded mean value to every new symbol interval, the samples are found by binary search.
+        """
         for i in range(len(self.symbol_values), len(self.symbol_intervals) - 1):
-            left_index = np.argmin(list(map(abs, self.timestamps[0][:self.lengths[0]] - self.symbol_intervals[i])))
-            right_index = np.argmin(list(map(abs, self.timestamps[0][:self.lengths[0]] - self.symbol_intervals[i + 1])))
+            timestamps, values = self.get_range(0, self.symbol_intervals[i], self.symbol_intervals[i + 1])
 
-            max_tmp = int(np.round(np.mean(self.received[0][left_index:right_index])))
+            max_tmp = int(np.round(np.mean(values)))
             self.symbol_values += [max_tmp]
 
     def calculate_sequence(self):
-        symbol_length = 7
-        length = max(0, len(self.symbol_values) - symbol_length * 2)
-        for i in range(len(self.sequence) * symbol_length * 2, length, symbol_length * 2):
-            vs = self.symbol_values[i:i + symbol_length * 2]
-            vs = [v-1 for v in vs if v > 0]
-            c = 0
-            for bit in vs:
-                c = c * 2 + bit
-            self.sequence += chr(c)
+        # A character is decoded once the first symbol after it has been received
+        self.sequence += self.codec.decode(self.symbol_values, len(self.sequence), len(self.symbol_values) - 1)
 
 
 def get_parameters():
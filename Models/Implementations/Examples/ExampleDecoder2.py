@@ -1,7 +1,9 @@
+import numpy as np
 import random
 import time
 
 from Models.Interfaces.DecoderInterface import DecoderInterface
+from Models.Interfaces.SequenceCodec import SequenceCodec
 from Models.Implementations.Examples.ExampleReceiver2 import ExampleReceiver2
 
 
@@ -9,12 +11,17 @@ class ExampleDecoder2(DecoderInterface):
     def __init__(self, parameters, parameter_values):
         super().__init__(parameters, parameter_values)
         # Mandatory
-        self.receivers = [ExampleReceiver2()] * 3
+        self.receivers = [ExampleReceiver2() for _ in range(3)]
 
         # Optional
-        self.additional_datalines_names = ["Mean"]
+        self.additional_datalines_names = ["Mean (resampled)"]
         self.receiver_names = ["Alpha", "Beta", "Gamma"]
         self.landmark_names = ['Landmark1', 'Landmark2']
+        # Aligns the receivers to a common time base for the mean over all sensors of all receivers, so the "Mean"
+        # dataline is calculated on the resampled time base and not from the received values of the first receiver
+        self.resampling_rate = 100
+        # 4 binary symbols per character, starting with 'A'
+        self.codec = SequenceCodec(4, character_offset=ord('A'))
 
         self.plot_settings = {
             'datalines_active': [[True, False], [False, True], [True, False]],
@@ -35,12 +42,28 @@ class ExampleDecoder2(DecoderInterface):
 
         super().setup()
 
+        # Means of the resampled rows and number of resampled rows (since the start) whose mean has been calculated
+        self.mean = self.create_sample_store("mean", 1)
+        self.mean_count = 0
+
+    def clear(self):
+        super().clear()
+        self.mean = self.create_sample_store("mean", 1)
+        self.mean_count = 0
+
     def calculate_additional_datalines(self):
-        for i in range(self.num_additional_datalines):
-            length = self.lengths[0]
-            timestamps = self.timestamps[0]
-            y = [self.received[0][i, 0] + 2 for i in range(self.lengths[0])]
-            self.additional_datalines[i] = {'length': length, 'timestamps': timestamps, 'values': y}
+        """
+        Calculates the mean over all sensors of all receivers for the resampled rows that are new since the last step.
+        """
+        timestamps, values, length, offset = self.resampler.store.published
+        start = max(0, self.mean_count - offset)
+        self.mean_count = offset + length
+        if length <= start:
+            return
+        self.mean.extend(timestamps[start:length], np.mean(values[start:length], axis=1))
+        timestamps, values, length, offset = self.mean.published
+        self.additional_datalines[0] = {'length': length, 'timestamps': timestamps[:length],
+                                         'values': values[:length, 0]}
 
     def calculate_landmarks(self):
         x = [0.5 * (self.symbol_intervals[a] + self.symbol_intervals[a+1]) for a in range(max(0, len(self.symbol_intervals) - 1))]
@@ -49,14 +72,8 @@ class ExampleDecoder2(DecoderInterface):
             self.landmarks[i] = {'x': x, 'y': [a/(2**i) for a in y]}
 
     def calculate_sequence(self):
-        length = max(0, len(self.symbol_values) - 4)
-        for i in range(len(self.sequence) * 4, length, 4):
-            vs = self.symbol_values[i:i+4]
-            c = 0
-            for bit in vs:
-                c = c * 2 + bit
-            c += 65
-            self.sequence += chr(c)
+        # A character is decoded once the first symbol after it has been received
+        self.sequence += self.codec.decode(self.symbol_values, len(self.sequence), len(self.symbol_values) - 1)
 
     def calculate_symbol_intervals(self):
         if not self.symbol_intervals:
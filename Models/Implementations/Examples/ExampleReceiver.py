@@ -1,3 +1,5 @@
+import queue
+
 from Models.Interfaces.ReceiverInterface import ReceiverInterface
 from Utils import Queue
 
@@ -12,7 +14,14 @@ class ExampleReceiver(ReceiverInterface):
         super().setup()
 
     def listen_step(self):
-        if not Queue.queue.empty():
-            values, t = Queue.queue.get()
-            values = (values,)
-            self.append_values(values, timestamp=t + 1)
\ No newline at end of file
+        # Blocks until the transmitter puts a value into the queue
+        try:
+            values, t = Queue.queue.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            return
+        values = (values,)
+        self.append_values(values, timestamp=t + 1)
+
+    def wait_for_data(self):
+        # Waiting is already done in listen_step
+        pass
\ No newline at end of file
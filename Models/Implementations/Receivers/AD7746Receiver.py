@@ -2,7 +2,10 @@
 
 from Models.Interfaces.ReceiverInterface import ReceiverInterface
 from Utils import Logging
+from Utils.LineProtocol import LineParser
+from Utils.StreamFramer import DelimiterFramer
 
+import numpy as np
 import serial
 import time
 
@@ -19,6 +22,10 @@ class AD7746Receiver(ReceiverInterface):
 
         self.num_sensors = 1
         self.sensor_names = ["Capacitance"]
+        # The raw 24-bit codes are stored, they are converted to fF when they are read (see convert_raw_value)
+        self.storage_dtype = np.int32
+        self.value_scale = 4096/8388607
+        self.value_offset = -8388608*4096/8388607
 
         self.smp = serial.Serial()
         self.smp.port = str(port)
@@ -43,6 +50,10 @@ class AD7746Receiver(ReceiverInterface):
         self.ms_offset = None
         self.start_rx_time = None
 
+        # Every line consists of "uc_time, raw_value"
+        self.framer = DelimiterFramer(b"\n")
+        self.line_parser = LineParser(2)
+
         super().setup()
 
     def set_conversion_time(self, time_level):
@@ -73,11 +84,13 @@ class AD7746Receiver(ReceiverInterface):
             #Reset times for this transmission
             self.ms_offset = None
             self.start_rx_time = None
+            self.framer.clear()
 
         self.smp.write(write_cmd + b"\r\n")
         self.smp.readline()
         
     def convert_raw_value(self, raw_value):
+        #Works on single values and arrays
         #Data is 0x000000 - 0xFFFFFF with 0x800000=0
         #max value is +4.096pF, min value is -4.096pF
 
@@ -86,36 +99,28 @@ class AD7746Receiver(ReceiverInterface):
         return out_val
 
     def convert_timestamp(self, uc_time):
-        #uc_time is ms since the uc startup (will loop after about 40days)
+        #uc_time is ms since the uc startup (will loop after about 40days), works on single values and arrays
 
         if self.ms_offset == None:
             #Set initial offset
-            self.ms_offset = uc_time
+            self.ms_offset = np.ravel(uc_time)[0]
             self.start_rx_time = time.time()
         
         timestamp = (uc_time-self.ms_offset)/1000 + self.start_rx_time
         return timestamp
 
 
+    def get_port(self):
+        return self.smp
+
     def shutdown(self):
         self.set_status(False)
         self.smp.close()
 
 
     def listen_step(self):
-        
-        while self.smp.in_waiting >= 24:
-            raw_set = self.smp.readline()
-            dataset = raw_set.decode("ascii")
-            elements = dataset.split(", ")
-            if len(elements) != 2:
-                Logging.warning("Unexpected receiver message: " + dataset)
-                return
-
-            try:
-                uc_time = int(elements[0])
-                raw_value = int(elements[1])
-                self.append_values([self.convert_raw_value(raw_value)], self.convert_timestamp(uc_time))
-            except:
-                Logging.warning("Unexpected receiver message.")
-                return
\ No newline at end of file
+        lines, invalid = self.line_parser.parse(self.read_frames())
+        if invalid:
+            Logging.warning(f"Unexpected receiver message: {invalid[0].decode('ascii', 'replace')} ({len(invalid)} in total)")
+        if len(lines) > 0:
+            self.append_block(self.convert_timestamp(lines[:, 0]), lines[:, 1:])
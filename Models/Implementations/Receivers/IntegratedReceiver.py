@@ -2,7 +2,10 @@
 
 from Models.Interfaces.ReceiverInterface import ReceiverInterface
 from Utils import Logging
+from Utils.LineProtocol import LineParser
+from Utils.StreamFramer import DelimiterFramer
 
+import numpy as np
 import serial
 import time
 
@@ -51,9 +54,22 @@ class IntegratedReceiver(ReceiverInterface):
 
         self.clk_in_mhz = ind_clk_in_mhz
 
+        # Calculate reference frequency and channel offset once (see page 39 of the data sheet)
+        offset = 0 #we currently do not use an offset or dividers
+        reference_divider = 1
+        input_divider = 1
+        reference_frequency = self.clk_in_mhz * 1000000 / reference_divider
+        channel_offset = (offset / 2 ** 16) * reference_frequency
+        self.frequency_scale = input_divider * reference_frequency / 2 ** 28
+        self.frequency_offset = input_divider * reference_frequency * (channel_offset / 2 ** 16)
+
         self.ms_offset = None
         self.start_rx_time = None
 
+        # Every line consists of "uc_time, raw_cap_value, raw_ind0_value, raw_ind1_value, ind_channel_errors"
+        self.framer = DelimiterFramer(b"\n")
+        self.line_parser = LineParser(5)
+
         super().setup()
 
     def set_cap_conversion_time(self, time_level):
@@ -121,11 +137,13 @@ class IntegratedReceiver(ReceiverInterface):
             #Reset times for this transmission
             self.ms_offset = None
             self.start_rx_time = None
+            self.framer.clear()
 
         self.smp.write(write_cmd + b"\r\n")
         self.smp.readline()
         
     def convert_raw_cap_value(self, raw_value):
+        #Works on single values and arrays
         #Data is 0x000000 - 0xFFFFFF with 0x800000=0
         #max value is +4.096pF, min value is -4.096pF
 
@@ -134,22 +152,23 @@ class IntegratedReceiver(ReceiverInterface):
         return out_val
 
     def convert_timestamp(self, uc_time):
-        #uc_time is ms since the uc startup (will loop after about 40days)
+        #uc_time is ms since the uc startup (will loop after about 40days), works on single values and arrays
 
         if self.ms_offset == None:
             #Set initial offset
-            self.ms_offset = uc_time
+            self.ms_offset = np.ravel(uc_time)[0]
             self.start_rx_time = time.time()
         
         timestamp = (uc_time-self.ms_offset)/1000 + self.start_rx_time
         return timestamp
     
     def calculate_frequency(self, data, channel, err):
+        #Works on single values and arrays, errors of all values are reported once
 
-        errStat = err & 0b00001111
+        errStat = np.bitwise_or.reduce(np.ravel(err) & 0b00001111)
 
         if channel > 0:
-            errStat = (err & 0b11110000)>>4
+            errStat = np.bitwise_or.reduce((np.ravel(err) & 0b11110000)>>4)
 
         if errStat & (1<<1) > 0:
             Logging.warning(f"ERR_UR/OR{channel}: Channel {channel} Conversion Under/Over-range Error", repeat=False)
@@ -159,50 +178,29 @@ class IntegratedReceiver(ReceiverInterface):
             Logging.warning(f"ERR_AE{channel}: Channel {channel} Conversion Amplitude Error", repeat=False)
         if errStat & (1<<0) > 0:
             Logging.warning(f"ERR{channel}: Channel {channel} Conversion Error", repeat=False)
-        
-        # Calculate reference frequency and channel offset
-        offset = 0 #we currently do not use an offset or dividers
-        reference_divider = 1
-        input_divider = 1
-        reference_frequency = self.clk_in_mhz * 1000000 / reference_divider
-        channel_offset = (offset / 2 ** 16) * reference_frequency
 
         # Calculate frequency (see page 39 of the data sheet)
-        frequency = input_divider * reference_frequency * ((data / 2 ** 28) + (channel_offset / 2 ** 16))
+        frequency = data * self.frequency_scale + self.frequency_offset
         return frequency
 
 
+    def get_port(self):
+        return self.smp
+
     def shutdown(self):
         self.set_status(False)
         self.smp.close()
 
 
     def listen_step(self):
-
-        t1 = time.time()
-        t3 = 0
-        t4 = 0
-        t5 = 0
-        
-        if self.smp.in_waiting > 0:
-            t4 = time.time()
-            dataset = self.smp.readline().decode("ascii")
-            t5 = time.time()
-            elements = dataset.split(", ")
-            if len(elements) != 5:
-                Logging.warning("Unexpected receiver message: " + dataset)
-                return
-
-            uc_time = int(elements[0])
-            raw_cap_value = int(elements[1])
-            raw_ind0_value = int(elements[2])
-            raw_ind1_value = int(elements[3])
-            ind_channel_errors = int(elements[4])
-            t3 = time.time()
-            ind0_val = self.calculate_frequency(raw_ind0_value, 0, ind_channel_errors)
-            ind1_val = self.calculate_frequency(raw_ind1_value, 1, ind_channel_errors)
-            self.append_values([self.convert_raw_cap_value(raw_cap_value), ind0_val, ind1_val], self.convert_timestamp(uc_time))
-
-        t2 = time.time()
-
-        print((t5-t4)*1000)
\ No newline at end of file
+        lines, invalid = self.line_parser.parse(self.read_frames())
+        if invalid:
+            Logging.warning(f"Unexpected receiver message: {invalid[0].decode('ascii', 'replace')} ({len(invalid)} in total)")
+        if len(lines) == 0:
+            return
+
+        uc_time, raw_cap_value, raw_ind0_value, raw_ind1_value, ind_channel_errors = lines.T
+        ind0_val = self.calculate_frequency(raw_ind0_value, 0, ind_channel_errors)
+        ind1_val = self.calculate_frequency(raw_ind1_value, 1, ind_channel_errors)
+        values = np.column_stack((self.convert_raw_cap_value(raw_cap_value), ind0_val, ind1_val))
+        self.append_block(self.convert_timestamp(uc_time), values)
@@ -1,10 +1,12 @@
 
 # Install 'pyserial' for module 'serial'
+import numpy as np
 import serial
 import crcmod.predefined
 
 from Models.Interfaces.ReceiverInterface import ReceiverInterface
 from Utils import Logging
+from Utils.StreamFramer import HeaderCRCFramer
 
 
 crc8 = crcmod.predefined.mkCrcFun('crc-8')
@@ -42,6 +44,33 @@ START_STREAMING_COMMAND = "4C0501000601290404302AC1"
 STOP_STREAMING_COMMAND = "4C0601000101D2"
 # after set, MCU responds with 32 bytes - byte 4 is zero if command is correct
 
+# Layout of a streamed frame, the data of every channel consists of a big-endian MSB and LSB word
+STREAM_FRAME_LENGTH = 32
+# Streamed frames start like the response to the start streaming command (start byte and command)
+STREAM_FRAME_HEADER = bytes.fromhex("4C05")
+STREAM_FRAME_DTYPE = np.dtype([
+    ('header', 'u1', (7,)),
+    ('channels', [('msb', '>u2'), ('lsb', '>u2')], (4,)),
+    ('footer', 'u1', (9,))
+])
+
+# Error bits in the MSB word, the remaining 12 bits are the upper part of the conversion result
+ERROR_FLAGS = [
+    (1<<15, "ERR_UR{0}: Channel {0} Conversion Under-range Error"),
+    (1<<14, "ERR_OR{0}: Channel {0} Conversion Over-range Error"),
+    (1<<13, "ERR_WD{0}: Channel {0} Conversion Watchdog Timeout Error"),
+    (1<<12, "ERR_AE{0}: Channel {0} Conversion Amplitude Error")
+]
+
+
+def create_stream_framer():
+    """
+    Creates the framer of the streamed frames, it resynchronizes at the next header after lost or additional bytes.
+    The CRC of the frames is not checked.
+    :return: Framer.
+    """
+    return HeaderCRCFramer(STREAM_FRAME_HEADER, STREAM_FRAME_LENGTH - len(STREAM_FRAME_HEADER), None, 0)
+
 
 class LDC1614EVMReceiver(ReceiverInterface):
     """
@@ -52,6 +81,7 @@ class LDC1614EVMReceiver(ReceiverInterface):
     HARDWARE_ID = "2047:08F8" #LDC1614 EVM
     BAUDRATE = 115200
     TIMEOUT = 0.1 #s
+    DIRECT_WRITE = True
 
     def __init__(self, num_channels, clk_in_mhz, com_port, deglitch_filter, settle_count, reference_count):
         super().__init__()
@@ -62,6 +92,27 @@ class LDC1614EVMReceiver(ReceiverInterface):
         self.sensor_names = ["CH" + str(i) + " (MHz)" for i in range(4)]
         self.drop_first_measurements = 10
 
+        # Calculate reference frequency and channel offset once (see page 39 of the data sheet)
+        offset = 0 #we currently do not use an offset or dividers
+        reference_divider = 1
+        input_divider = 1
+        reference_frequency = self.clk_in_mhz * 1000000 / reference_divider
+        channel_offset = (offset / 2 ** 16) * reference_frequency
+        self.frequency_scale = input_divider * reference_frequency / 2 ** 28
+        self.frequency_offset = input_divider * reference_frequency * (channel_offset / 2 ** 16)
+        # The raw 28-bit conversion results are stored, they are converted to frequencies when they are read
+        self.storage_dtype = np.int32
+        self.value_scale = self.frequency_scale
+        self.value_offset = self.frequency_offset
+
+        # Conversion time of all active channels, used to timestamp frames that are read at once
+        t_count = reference_count*16/(clk_in_mhz*1000000)
+        t_settle = settle_count*16/(clk_in_mhz*1000000)
+        t_switchdelay = 0.000000754
+        self.sample_period = (t_count + t_settle + t_switchdelay)*num_channels
+
+        self.framer = create_stream_framer()
+
         super().setup()
 
         self.serial_port = serial.Serial()
@@ -130,84 +181,74 @@ class LDC1614EVMReceiver(ReceiverInterface):
 
     def set_streaming(self, on):
         if on:
+            self.framer.clear()
             self.send_command(START_STREAMING_COMMAND, False)
         else:
             self.send_command(STOP_STREAMING_COMMAND, False)
 
     def listen_step(self):
         """
-        Check if data ready flag is set (all channels have an unread conversion) and then read new values.
+        Reads all complete frames that have been streamed and decodes them at once.
         """
+        data = self.read_frames()
+        if len(data) == 0:
+            return
 
-        if self.serial_port.in_waiting >= 32:
-            ch0, ch1, ch2, ch3 = self.read_stream_line()
-
-            values = [ch0]
-            if self.active_channels > 1:
-                values.append(ch1)
-            if self.active_channels > 2:
-                values.append(ch2)
-            if self.active_channels > 3:
-                values.append(ch3)
-         
-            self.append_values(values)
+        conversions = self.read_stream_frames(data)
+        count = len(conversions)
+        # Frames read at once are assumed to be spaced by the conversion time, the last one being received now
+        timestamps = self.block_timestamps(count, self.sample_period)
+        self.append_block(timestamps, conversions[:, :self.active_channels])
 
     def is_data_ready(self, channel):
         status = self.read_register(STATUS)
         return status & (1<<(3-channel)) > 0
 
-    def read_stream_line(self):
-        read = self.serial_port.read(32)
-
-        ch0_msb, ch0_lsb = self.get_data_from_bytes(7, read)
-        ch0 = self.calculate_frequency(ch0_msb, ch0_lsb, 0)
-
-        ch1_msb, ch1_lsb = self.get_data_from_bytes(11, read)
-        ch1 = self.calculate_frequency(ch1_msb, ch1_lsb, 1)
-
-        ch2_msb, ch2_lsb = self.get_data_from_bytes(15, read)
-        ch2 = self.calculate_frequency(ch2_msb, ch2_lsb, 2)
-
-        ch3_msb, ch3_lsb = self.get_data_from_bytes(19, read)
-        ch3 = self.calculate_frequency(ch3_msb, ch3_lsb, 3)
+    def read_stream_frames(self, data):
+        """
+        Decodes streamed frames.
+        :param data: Bytes of complete frames.
+        :return: Conversion results of all channels, dimensions (frames, 4), see calculate_conversion.
+        """
+        frames = np.frombuffer(data, dtype=STREAM_FRAME_DTYPE, count=len(data) // STREAM_FRAME_LENGTH)
+        msb = frames['channels']['msb']
+        lsb = frames['channels']['lsb']
 
-        return ch0, ch1, ch2, ch3
+        # Report every error that occured in this block once
+        self.report_errors(np.bitwise_or.reduce(msb, axis=0))
 
-    def get_data_from_bytes(self, start_pos, raw):
-        msb = (raw[start_pos]<<8)+raw[start_pos+1]
-        lsb = (raw[start_pos+2]<<8)+raw[start_pos+3]
+        return self.calculate_conversion(msb, lsb)
 
-        return msb, lsb
+    def report_errors(self, data_msb):
+        """
+        Shows a warning for every error bit set in the MSB word of an active channel.
+        :param data_msb: MSB words of the channels.
+        """
+        for channel in range(min(self.active_channels, len(data_msb))):
+            for flag, message in ERROR_FLAGS:
+                if data_msb[channel] & flag > 0:
+                    Logging.warning(message.format(channel), repeat=False)
 
-    def calculate_frequency(self, data_msb, data_lsb, channel):
+    def calculate_conversion(self, data_msb, data_lsb):
+        """
+        Combines the data words to the 28-bit conversion results, works on single values and arrays.
+        :param data_msb: MSB word(s).
+        :param data_lsb: LSB word(s).
+        :return: Conversion result(s) (int32).
+        """
         # The leading 4 bits of the MSB are error bits and not part of the actual data
+        data = ((np.asarray(data_msb, dtype=np.uint32) & 0x0FFF) << 16) | np.asarray(data_lsb, dtype=np.uint32)
+        return data.astype(np.int32)
 
-        tes = data_msb & (1<<15)
-        if data_msb & (1<<15) > 0 and channel < self.active_channels:
-            Logging.warning(f"ERR_UR{channel}: Channel {channel} Conversion Under-range Error", repeat=False)
-        if data_msb & (1<<14) > 0 and channel < self.active_channels:
-            Logging.warning(f"ERR_OR{channel}: Channel {channel} Conversion Over-range Error", repeat=False)
-        if data_msb & (1<<13) > 0 and channel < self.active_channels:
-            Logging.warning(f"ERR_WD{channel}: Channel {channel} Conversion Watchdog Timeout Error", repeat=False)
-        if data_msb & (1<<12) > 0 and channel < self.active_channels:
-            Logging.warning(f"ERR_AE{channel}: Channel {channel} Conversion Amplitude Error", repeat=False)
-        
-        #Clear error bits for value calculation
-        data_msb &= 0b0000111111111111
-
-        # Combine values from MSB and LSB to final value
-        data = (data_msb<<16) + data_lsb
-
-        # Calculate reference frequency and channel offset
-        offset = 0 #we currently do not use an offset or dividers
-        reference_divider = 1
-        input_divider = 1
-        reference_frequency = self.clk_in_mhz * 1000000 / reference_divider
-        channel_offset = (offset / 2 ** 16) * reference_frequency
-
+    def calculate_frequency(self, data_msb, data_lsb):
+        """
+        Calculates frequencies from the data words, works on single values and arrays.
+        :param data_msb: MSB word(s).
+        :param data_lsb: LSB word(s).
+        :return: Frequency (Hz).
+        """
         # Calculate frequency (see page 39 of the data sheet)
-        frequency = input_divider * reference_frequency * ((data / 2 ** 28) + (channel_offset / 2 ** 16))
-        return frequency
+        return self.calculate_conversion(data_msb, data_lsb) * self.frequency_scale + self.frequency_offset
 
     def get_channel_frequency(self, channel):
         """
@@ -219,7 +260,14 @@ class LDC1614EVMReceiver(ReceiverInterface):
         data_lsb = self.read_register(DATA_LSB[channel])
         data_msb = self.read_register(DATA_MSB[channel])
 
-        return self.calculate_frequency(data_msb, data_lsb, channel)
+        if channel < self.active_channels:
+            errors = [0] * 4
+            errors[channel] = data_msb
+            self.report_errors(errors)
+        return float(self.calculate_frequency(data_msb, data_lsb))
+
+    def get_port(self):
+        return self.serial_port
 
     def shutdown(self):
         self.serial_port.close()
@@ -2,10 +2,40 @@
 
 from Models.Interfaces.ReceiverInterface import ReceiverInterface
 from Utils import Logging
+from Utils.StreamFramer import DelimiterFramer
 
+import numpy as np
 import serial
-import time
-import re
+
+# Every frame contains 6 values and a saturation flag for each of the two sensors and ends with a line break
+FRAME_TERMINATOR = b"\n"
+FRAME_FIELDS = 14
+VALUE_COLUMNS = [0, 1, 2, 3, 4, 5, 7, 8, 9, 10, 11, 12]
+SATURATION_COLUMNS = [6, 13]
+
+
+def parse_frames(data):
+    """
+    Parses a block of complete frames at once.
+    :param data: Complete frames, e.g., from a DelimiterFramer.
+    :return: Values of the frames (frames x 14) and number of frames that could not be parsed.
+    """
+    lines = data.split(FRAME_TERMINATOR)
+    fields = [line.split(b",")[:FRAME_FIELDS] for line in lines if line.strip()]
+    valid = [field for field in fields if len(field) == FRAME_FIELDS]
+    try:
+        values = np.array(valid, dtype=float).reshape((-1, FRAME_FIELDS))
+    except ValueError:
+        # At least one frame contains something else than numbers, parse frame by frame to drop only these
+        rows = []
+        for field in valid:
+            try:
+                rows.append([float(x) for x in field])
+            except ValueError:
+                pass
+        values = np.array(rows, dtype=float).reshape((-1, FRAME_FIELDS))
+    return values, len(fields) - len(values)
+
 
 class PocketLoCReceiver(ReceiverInterface):
 
@@ -13,6 +43,7 @@ class PocketLoCReceiver(ReceiverInterface):
     DEVICE_ID = "PocketLoCSensor"
     BAUDRATE = 115200
     TIMEOUT = 0.1 #s
+    DIRECT_WRITE = True
 
     def __init__(self, port, active_sensor_channels):
         super().__init__()
@@ -38,8 +69,9 @@ class PocketLoCReceiver(ReceiverInterface):
 
         self.set_mux(active_sensor_channels)
 
-        global error_flag
-        error_flag = False
+        self.framer = DelimiterFramer(FRAME_TERMINATOR)
+        self.sample_period = 0
+        self.saturation_error = False
 
         super().setup()
 
@@ -90,59 +122,44 @@ class PocketLoCReceiver(ReceiverInterface):
         time_command = "T" + str(sample_duration)
         self.send_command(time_command)
         self.read_response(1)
+        # The sensor measures four times per sample duration
+        self.sample_period = sample_duration * 4 / 1000
+
+    def check_saturation(self, saturation):
+        """
+        Reports saturation errors, a warning is only shown when an error newly occurs.
+        :param saturation: Saturation flags of the frames in a block.
+        """
+        previous = np.concatenate(([self.saturation_error], saturation[:-1]))
+        if np.any(saturation & ~previous):
+            Logging.warning("Sensor saturation error! You should probably reduce the gain.")
+        self.saturation_error = bool(saturation[-1])
 
-    def read_values(self):
-        # Get a line of data from the serial connection and parse it
-        raw = self.smp.read(188).decode('utf-8')
-        raw_items = re.split(",", raw)
-        
-        sensor0_vals = [0,0,0,0,0,0]
-        sensor1_vals = [0,0,0,0,0,0]
-        saturation_error = False
-        timestamp = time.time()
-        
-        try:
-            values = [float(x) for x in raw_items[0:14]]
-            sensor0_vals = values[0:6]
-            sensor1_vals = values[7:13]
-            saturation_error = values[6] > 0 or values[13] > 0
-        except Exception:
-            Logging.warning("Error parsing values:")
-            Logging.warning(raw)
-            return None, None, None, None
-        
-        global error_flag
-        
-        if saturation_error:
-            #Saturation error - only report if new
-            if not error_flag:
-                error_flag = True
-                Logging.warning("Sensor saturation error! You should probably reduce the gain.")
-        else:
-            error_flag = False
-
-        
-        return sensor0_vals, sensor1_vals, saturation_error, timestamp
-
-    
     def set_status(self, on):
         write_cmd = "STOP"
         if on:
             write_cmd = "START"
+            self.framer.clear()
 
         self.send_command(write_cmd)
         self.read_response(1)
         
+    def get_port(self):
+        return self.smp
+
     def shutdown(self):
         self.set_status(False)
         self.smp.close()
 
 
     def listen_step(self):
-        
-        while self.smp.in_waiting >= 188:
-            sensor0, sensor1, sat_err, timestamp = self.read_values()
-            if sensor0 is None:
-                return
-
-            self.append_values(sensor0 + sensor1, timestamp)
\ No newline at end of file
+        frames, invalid = parse_frames(self.read_frames())
+        if invalid > 0:
+            Logging.warning(f"Error parsing values, dropped {invalid} frame(s).")
+        if len(frames) == 0:
+            return
+
+        # Frames read at once are assumed to be spaced by the sample period, the last one being received now
+        timestamps = self.block_timestamps(len(frames), self.sample_period)
+        self.check_saturation(frames[:, SATURATION_COLUMNS].max(axis=1) > 0)
+        self.append_block(timestamps, frames[:, VALUE_COLUMNS])
@@ -45,27 +45,33 @@ class BartelsTransmitter(TransmitterInterface):
         self.smp.readline().decode("ascii")
         self.micropump_set_state(False)
 
+        self.start_listening()
+
+    def get_port(self):
+        return self.smp
+
     def shutdown(self):
         self.micropump_set_state(False)
 
+        self.stop_listening()
         self.smp.close()
 
     def micropump_set_state(self, on):
         if on:
             BartelsTransmitter.stopped = False
-            self.smp.write(b"PON\r\n")
-            self.smp.readline().decode("ascii")
+            self.write_command(b"PON\r\n")
+            self.read_response()
         else:
             BartelsTransmitter.stopped = True
-            self.smp.write(b"POFF\r\n")
-            self.smp.readline().decode("ascii")
-            self.smp.write(b"PA000#000#000#000\r\n")
-            self.smp.readline().decode("ascii")
+            self.write_command(b"POFF\r\n")
+            self.read_response()
+            self.write_command(b"PA000#000#000#000\r\n")
+            self.read_response()
             time.sleep(0.1)
-            self.smp.write(b"POFF\r\n")
-            self.smp.readline().decode("ascii")
-            self.smp.write(b"PA000#000#000#000\r\n")
-            self.smp.readline().decode("ascii")
+            self.write_command(b"POFF\r\n")
+            self.read_response()
+            self.write_command(b"PA000#000#000#000\r\n")
+            self.read_response()
         
 
     def micropump_set_all_voltages(self, channel_voltages):
@@ -74,8 +80,8 @@ class BartelsTransmitter(TransmitterInterface):
         # Set the voltage of all four pumps (<aaa> for pump 1, <bbb> for pump 2, ...). Each value must be zero-padded to exactly three characters.
         command = "PA{:03d}#{:03d}#{:03d}#{:03d}\r\n".format(channel_voltages[0], channel_voltages[1], channel_voltages[2], channel_voltages[3])
 
-        self.smp.write(str.encode(command))
-        self.smp.readline().decode("ascii")
+        self.write_command(str.encode(command))
+        self.read_response()
 
     def micropump_set_voltage_duration(self, channel1, channel2, channel3, channel4, voltage, duration_ms):
         """
@@ -165,5 +171,5 @@ class BartelsTransmitter(TransmitterInterface):
             parameters:
             frequency (int):  0-850
         """
-        self.smp.write(b"F" + str.encode(str(frequency)) + b"\r\n")
+        self.write_command(b"F" + str.encode(str(frequency)) + b"\r\n")
 
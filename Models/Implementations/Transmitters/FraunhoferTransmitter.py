@@ -36,10 +36,15 @@ class FraunhoferTransmitter(TransmitterInterface):
                 return
 
         self.hv_off()
-        
+
+        self.start_listening()
+
+    def get_port(self):
+        return self.smp
 
     def shutdown(self):
         self.hv_off()
+        self.stop_listening()
         self.smp.close()
 
     def set_frequency(self, frequency):
@@ -38,12 +38,23 @@ class IsmatecTransmitter(TransmitterInterface):
 
         for channel in range(1, 5):
             self.pump_stop(channel)
-        
+
+        self.start_listening()
+
+    def get_port(self):
+        return self.smp
+
+    def handle_input(self):
+        #Pump acknowledges every command with "*" and answers "#" if a command was not executed
+        response = self.smp.read(self.smp.in_waiting)
+        if b"#" in response:
+            Logging.warning("Pump did not execute a command.")
 
     def shutdown(self):
         for channel in range(1, 5):
             self.pump_stop(channel)
 
+        self.stop_listening()
         self.smp.close()
 
     def to_bytes(input):
@@ -1,3 +1,4 @@
+import datetime
 import importlib
 import threading
 import numpy as np
@@ -5,8 +6,32 @@ import time
 import os
 import csv
 
+from Models.DecodeWorker import DataEvent
 from Utils import Logging
+from Utils.Aggregates import Aggregates
+from Utils.IOReactor import reactor
+from Utils.Resampler import Resampler
+from Utils.RunningStatistics import RunningStatistics
+from Utils.SampleStore import MemmapSampleStore, RollingSampleStore, SampleStore, open_session
 from Utils.Settings import SettingsStore
+from Utils.StreamingFilter import Pipeline
+
+# Number of published versions for which get_changes_since can compute changes
+SNAPSHOT_HISTORY_LENGTH = 100
+
+
+def read_only(array, length):
+    """
+    Creates a read-only view of the valid part of an array.
+    :param array: Array, may be None.
+    :param length: Number of valid entries.
+    :return: Read-only view, None if the array is None.
+    """
+    if array is None:
+        return None
+    view = array[:length]
+    view.flags.writeable = False
+    return view
 
 
 class DecoderInterface:
@@ -15,6 +40,8 @@ class DecoderInterface:
     collects data from the receivers and stores them. A decoder may also
     provide more functionality, as it allows for further processing to retrieve
     information from the data generated by the receivers.
+    The arrays in received hold the values in the storage dtype of the receiver (e.g., raw integer codes), get_received
+    converts them into physical values.
     """
     def __init__(self, parameters, parameter_values):
         """
@@ -27,8 +54,16 @@ class DecoderInterface:
 
         self.active = False
         self.additional_datalines = []
+        # Aggregate tables of every receiver (minimum, maximum and mean per time bucket) for the overview of long sessions
+        self.aggregates = []
+        # Incremented on every clear, changes cannot be computed across a clear
+        self.clear_count = 0
         self.additional_datalines_names = None
+        # Set by the receivers when new measurements are available (see Models/DecodeWorker.py)
+        self.data_event = DataEvent()
         self.decoded = None
+        # Counts of samples, symbols and characters for the recently published versions
+        self.history = {}
         self.info = None
         self.landmarks = []
         self.landmark_names = None
@@ -39,14 +74,40 @@ class DecoderInterface:
         self.num_additional_datalines = 0
         self.num_landmarks = 0
         self.num_receivers = 0
+        self.offsets = []
         self.plot_settings = {}
+        # Filter stages of every receiver (see Utils/StreamingFilter.py) that pre_processing applies to new
+        # measurements, enabled by setting a list of stages (or None) per receiver before setup
+        self.pre_processing_stages = None
+        self.pipelines = []
+        # Output of the pipeline of every receiver (see get_processed)
+        self.processed = []
+        # Number of measurements of every receiver that have been processed by its pipeline
+        self.processed_counts = []
         self.received = []
         self.receivers = []
         self.receiver_names = None
+        # Statistics of the first reference_length seconds of every receiver, enabled by setting a length before setup
+        self.reference_length = None
+        self.reference_statistics = []
+        # Common time base of all receivers (see get_resampled), enabled by setting a rate before setup
+        self.resampler = None
+        self.resampling_method = 'linear'
+        self.resampling_rate = None
         self.sequence = ""
+        self.session_directory = None
+        # Statistics of all measurements of every receiver (see RunningStatistics)
+        self.statistics = []
+        # Number of measurements of every receiver that are included in the statistics and aggregate tables
+        self.statistics_counts = []
+        # Statistics of the last statistics_window seconds of every receiver, enabled by setting a length before setup
+        self.statistics_window = None
+        self.stores = []
         self.symbol_intervals = []
         self.symbol_values = []
         self.timestamps = []
+        self.version = 0
+        self.window_statistics = []
 
     def setup(self):
         """
@@ -87,14 +148,20 @@ class DecoderInterface:
             }
         }
 
+        self.session_directory = self.create_session_directory()
         for receiver_index in range(self.num_receivers):
+            self.stores.append(self.create_store(receiver_index))
             self.timestamps.append(None)
             self.received.append(None)
             self.lengths.append(0)
+            self.offsets.append(0)
             self.info['receivers']['sensor_names'].append(self.receivers[receiver_index].sensor_names)
 
         self.additional_datalines = [None] * self.num_additional_datalines
         self.landmarks = [None] * self.num_landmarks
+        self.resampler = self.create_resampler()
+        self.create_statistics()
+        self.create_pipelines()
 
     def append(self, receiver_index, timestamp, values):
         """
@@ -103,32 +170,77 @@ class DecoderInterface:
         :param timestamp: New timestamp.
         :param values: New measurement values.
         """
-        if self.lengths[receiver_index] == 0:
-            self.timestamps[receiver_index] = np.empty((SettingsStore.settings['DECODER_ARRAY_LENGTH'],))
-            self.timestamps[receiver_index][0] = timestamp
-            self.received[receiver_index] = np.empty((SettingsStore.settings['DECODER_ARRAY_LENGTH'], len(values)))
-            self.received[receiver_index][0] = np.array(values)
-        else:
-            if self.lengths[receiver_index] == len(self.timestamps[receiver_index]):
-                self.timestamps[receiver_index] = np.concatenate((self.timestamps[receiver_index], np.empty((SettingsStore.settings['DECODER_ARRAY_LENGTH'],))))
-                self.received[receiver_index] = np.vstack((self.received[receiver_index], np.empty((SettingsStore.settings['DECODER_ARRAY_LENGTH'], len(values)))))
-
-            self.timestamps[receiver_index][self.lengths[receiver_index]] = timestamp
-            self.received[receiver_index][self.lengths[receiver_index]] = values
-
-        min_timestamp = None
-        max_timestamp = None
-        for i in range(len(self.timestamps)):
-            if self.lengths[i] > 0:
-                min_tmp = np.min(self.timestamps[i][:self.lengths[i]])
-                max_tmp = np.max(self.timestamps[i][:self.lengths[i]])
-                if min_timestamp is None or min_tmp < min_timestamp:
-                    min_timestamp = min_tmp
-                if max_timestamp is None or max_tmp > max_timestamp:
-                    max_timestamp = max_tmp
-
-        self.min_timestamp = min_timestamp if min_timestamp is not None else time.time()
-        self.max_timestamp = max_timestamp if max_timestamp is not None else time.time()
+        self.stores[receiver_index].append(timestamp, values)
+        self.update_received(receiver_index)
+
+    def append_batch(self, receiver_index, timestamps, values):
+        """
+        Appends a block of measurements for a given receiver.
+        :param receiver_index: Receiver index.
+        :param timestamps: New timestamps, dimensions (time).
+        :param values: New measurement values, dimensions (time, sensors).
+        """
+        self.stores[receiver_index].extend(timestamps, values)
+        self.update_received(receiver_index)
+
+    def update_received(self, receiver_index):
+        """
+        Updates timestamps/received/lengths of a given receiver from its store.
+        :param receiver_index: Receiver index.
+        """
+        # The store may have moved its data to larger arrays, arrays and length are taken from one published state
+        timestamps, values, length, offset = self.stores[receiver_index].published
+        self.timestamps[receiver_index] = timestamps
+        self.received[receiver_index] = values
+        self.lengths[receiver_index] = length
+        self.offsets[receiver_index] = offset
+
+        self.update_timestamp_bounds()
+
+    def update_statistics(self):
+        """
+        Includes the measurements that have been appended since the last step in the statistics and aggregate tables of
+        every receiver.
+        Both are calculated from the physical values, so statistics of receivers with a compact storage dtype (e.g., raw
+        integer codes) are in the same units as get_received, missing values become NaN and are ignored.
+        """
+        for receiver_index in range(self.num_receivers):
+            offset, length = self.offsets[receiver_index], self.lengths[receiver_index]
+            start = max(0, self.statistics_counts[receiver_index] - offset)
+            self.statistics_counts[receiver_index] = offset + length
+            if length <= start:
+                continue
+            timestamps = self.timestamps[receiver_index][start:length]
+            values = self.stores[receiver_index].to_physical(self.received[receiver_index][start:length])
+            self.aggregates[receiver_index].update(timestamps, values)
+            for statistics in (self.statistics, self.reference_statistics, self.window_statistics):
+                if statistics[receiver_index] is not None:
+                    statistics[receiver_index].update(timestamps, values)
+
+    def update_processed(self):
+        """
+        Processes the measurements that have been appended since the last step with the pipeline of every receiver.
+        The pipelines get physical values, their output is appended to processed.
+        """
+        for receiver_index in range(self.num_receivers):
+            pipeline = self.pipelines[receiver_index]
+            if pipeline is None:
+                continue
+            offset, length = self.offsets[receiver_index], self.lengths[receiver_index]
+            start = max(0, self.processed_counts[receiver_index] - offset)
+            self.processed_counts[receiver_index] = offset + length
+            if length <= start:
+                continue
+            timestamps = self.timestamps[receiver_index][start:length]
+            values = self.stores[receiver_index].to_physical(self.received[receiver_index][start:length])
+            self.processed[receiver_index].extend(*pipeline.process(timestamps, values))
+
+    def update_resampled(self):
+        """
+        Extends the common time base of all receivers by the interval that has been covered since the last step.
+        """
+        if self.resampler is not None:
+            self.resampler.update(self.stores)
 
     def calculate_additional_datalines(self):
         """
@@ -191,29 +303,176 @@ class DecoderInterface:
     def clear(self):
         """
         Clears all data from the decoder and its receivers.
-        This is called when the user presses the clear button for the decoder.
+        This is called when the user presses the clear button for the decoder. It empties the receiver buffers, so while
+        the decoder is running, it must be called from the thread that drains them (see DecodeWorker.clear).
         """
         # Clear received
         self.additional_datalines = [None] * self.num_additional_datalines
         self.lengths = [0] * self.num_receivers
+        self.offsets = [0] * self.num_receivers
         self.received = [None] * self.num_receivers
         self.timestamps = [None] * self.num_receivers
         self.symbol_intervals = []
         self.symbol_values = []
         self.sequence = ""
         self.landmarks = [None] * self.num_landmarks
+        self.session_directory = self.create_session_directory()
+        self.stores = [self.create_store(receiver_index) for receiver_index in range(self.num_receivers)]
+        # The store of the resampled values is created again in the new session directory
+        self.resampler = self.create_resampler()
+        self.create_statistics()
+        self.create_processed()
 
         self.min_timestamp = time.time()
         self.max_timestamp = time.time()
 
-        for receiver in self.receivers:
-            receiver.buffer = []
+        for receiver_index in range(self.num_receivers):
+            receiver = self.receivers[receiver_index]
+            receiver.buffer.clear()
+            if receiver.store is not None:
+                # The receiver finishes a running write into its previous store and writes into the new one afterwards
+                receiver.store = self.stores[receiver_index]
+
+        self.clear_count += 1
+        self.publish()
+
+    def create_store(self, receiver_index):
+        """
+        Creates the sample store for a given receiver.
+        Depending on the storage mode in the settings, the samples are kept in RAM or in files of the session directory.
+        :param receiver_index: Receiver index.
+        :return: Sample store.
+        """
+        receiver = self.receivers[receiver_index]
+        info = {
+            'decoder': type(self).__name__,
+            'receiver_index': receiver_index,
+            'receiver_name': self.receiver_names[receiver_index],
+            'sensor_names': receiver.sensor_names
+        }
+        return self.create_sample_store(f"receiver{receiver_index:02d}", receiver.num_sensors, info,
+                                        receiver.storage_dtype, receiver.value_scale, receiver.value_offset)
+
+    def create_sample_store(self, name, num_sensors, info=None, dtype=float, scale=None, offset=None):
+        """
+        Creates a sample store in the storage mode of the settings, for received and derived (e.g., resampled) values.
+        Depending on the storage mode, the samples are kept in RAM or in files of the session directory.
+        :param name: Name of the store, used as prefix of the file names.
+        :param num_sensors: Number of sensors.
+        :param info: Dictionary with information about the receiver, only stores of receivers have one.
+        :param dtype: Storage dtype of the values.
+        :param scale: Scale from stored to physical values, scalar or one per sensor, None for 1.
+        :param offset: Offset from stored to physical values, scalar or one per sensor, None for 0.
+        :return: Sample store.
+        """
+        if SettingsStore.settings['STORAGE_MODE'] == 'memmap':
+            return MemmapSampleStore(self.session_directory, name, SettingsStore.settings['DECODER_ARRAY_LENGTH'],
+                                     num_sensors, info, dtype, scale, offset)
+        if SettingsStore.settings['STORAGE_MODE'] == 'rolling':
+            return RollingSampleStore(self.session_directory, name, SettingsStore.settings['ROLLING_WINDOW_LENGTH'],
+                                      num_sensors, dtype, scale, offset)
+        return SampleStore(SettingsStore.settings['DECODER_ARRAY_LENGTH'], num_sensors, dtype, scale, offset)
+
+    def create_resampler(self):
+        """
+        Creates the resampler for the common time base of all receivers, if a resampling rate is set.
+        :return: Resampler, None if resampling is disabled.
+        """
+        if self.resampling_rate is None:
+            return None
+        num_sensors = [receiver.num_sensors for receiver in self.receivers]
+        return Resampler(self.resampling_rate, num_sensors, self.resampling_method,
+                         store=self.create_sample_store("resampled", sum(num_sensors)))
+
+    def create_statistics(self):
+        """
+        Creates empty statistics and aggregate tables for every receiver, reference and window statistics only if their
+        lengths are set.
+        """
+        num_sensors = [receiver.num_sensors for receiver in self.receivers]
+        self.aggregates = [Aggregates(n) for n in num_sensors]
+        self.statistics_counts = [0] * self.num_receivers
+        self.statistics = [RunningStatistics(n) for n in num_sensors]
+        self.reference_statistics = [None if self.reference_length is None else
+                                     RunningStatistics(n, duration=self.reference_length) for n in num_sensors]
+        self.window_statistics = [None if self.statistics_window is None else
+                                  RunningStatistics(n, window=self.statistics_window) for n in num_sensors]
+
+    def create_pipelines(self):
+        """
+        Creates the pipelines of the receivers from pre_processing_stages and empty stores for their output.
+        """
+        stages = self.pre_processing_stages
+        if stages is None:
+            stages = [None] * self.num_receivers
+        if len(stages) != self.num_receivers:
+            Logging.error(f"pre_processing_stages has {len(stages)} entries, but the decoder has {self.num_receivers} "
+                          f"receivers, pre-processing is disabled.")
+            stages = [None] * self.num_receivers
+        self.pipelines = [None if not receiver_stages else Pipeline(receiver_stages) for receiver_stages in stages]
+        self.create_processed()
+
+    def create_processed(self):
+        """
+        Resets the pipelines and creates empty stores for their output, in the storage mode of the settings.
+        """
+        for pipeline in self.pipelines:
+            if pipeline is not None:
+                pipeline.reset()
+        self.processed = [None if self.pipelines[receiver_index] is None else
+                          self.create_sample_store(f"processed{receiver_index:02d}",
+                                                   self.receivers[receiver_index].num_sensors)
+                          for receiver_index in range(self.num_receivers)]
+        self.processed_counts = [0] * self.num_receivers
+
+    def create_session_directory(self):
+        """
+        Creates the path of a new session directory for memmap and rolling stores, the directory itself is created by
+        the stores when they write the first samples.
+        :return: Path of the session directory.
+        """
+        name = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f") + "_" + type(self).__name__
+        return os.path.join(SettingsStore.settings['SESSION_DIRECTORY'], name)
+
+    def load_session(self, directory):
+        """
+        Loads the measurements of a session that was recorded with storage mode memmap, e.g., after a crash.
+        The decoder must be stopped, since running receivers write into the stores of the decoder. The measurements are
+        decoded in one decode step, which also publishes them.
+        :param directory: Session directory.
+        :return: Whether the session has been loaded.
+        """
+        if self.active:
+            Logging.error("Stop the decoder before loading a session.")
+            return False
+        # Stores of derived values (e.g., resampled) are calculated again from the stores of the receivers
+        stores = [store for store in open_session(directory) if 'receiver_index' in store.info]
+        if len(stores) != self.num_receivers:
+            Logging.error(f"Session contains {len(stores)} receiver(s), but the decoder has {self.num_receivers}.")
+            return False
+        self.clear()
+        self.stores = stores
+        for receiver_index in range(self.num_receivers):
+            self.update_received(receiver_index)
+        self.decode()
+        return True
+
+    def update_timestamp_bounds(self):
+        """
+        Updates min_timestamp/max_timestamp from the bounds that the stores track for every receiver.
+        """
+        min_timestamps = [store.min_timestamp for store in self.stores if store.min_timestamp is not None]
+        max_timestamps = [store.max_timestamp for store in self.stores if store.max_timestamp is not None]
+        self.min_timestamp = min(min_timestamps) if min_timestamps else time.time()
+        self.max_timestamp = max(max_timestamps) if max_timestamps else time.time()
 
     def decode(self):
         """
         Main functionality of the decoder that is executed in every step of the main program loop as long as the decode is active.
         It consists of the following steps:
             - Empty receiver buffers.
+            - Resample new measurements to the common time base, if enabled.
+            - Include new measurements in the statistics and aggregate tables.
             - Optionally apply pre-processing.
             - Optionally calculate additional datalines (derivatives, etc.).
             - Optionally calculate landmarks (edges, peaks, etc.).
@@ -223,6 +482,8 @@ class DecoderInterface:
             - If the debug flag is set, perform some error checks.
         """
         self.empty_receiver_buffers()
+        self.update_resampled()
+        self.update_statistics()
         self.pre_processing()
         self.calculate_additional_datalines()
         self.calculate_landmarks()
@@ -233,6 +494,8 @@ class DecoderInterface:
         if __debug__:
             self.check()
 
+        self.publish()
+
     def decoder_removed(self):
         """
         Do stuff when decoder is removed.
@@ -265,30 +528,35 @@ class DecoderInterface:
     def empty_receiver_buffers(self):
         """
         Checks if there is new measurement data in the receiver buffers and possibly stores them in timestamps/values.
+        Receivers that write directly into their store do not use a buffer, only the published length is taken over.
         """
         for receiver_index in range(len(self.receivers)):
-            available_count = self.receivers[receiver_index].get_available()
-            for available in range(available_count):
-                measurement = self.receivers[receiver_index].get(0)
-                timestamp, values = measurement['timestamp'], measurement['values']
-                self.append(receiver_index, timestamp, values)
-                self.lengths[receiver_index] += 1
+            receiver = self.receivers[receiver_index]
+            if receiver.store is not None:
+                self.update_received(receiver_index)
+                continue
+            timestamps, values = receiver.drain()
+            if len(timestamps) > 0:
+                self.append_batch(receiver_index, timestamps, values)
 
     def export_custom(self, directory):
         """
         Exports received data by creating a new table for every receiver and all additional datalines.
+        The received data includes the samples that have been archived by rolling stores, they are written block by
+        block.
         :param directory: Directory for .csv files to be stored.
         """
         # Export received
-        received = self.decoded['received']
-        lengths, timestamps, values = received['lengths'], received['timestamps'], received['values']
         for r in range(self.num_receivers):
             filename = os.path.join(directory, "received" + str(r))
+            store = self.stores[r]
             with open(filename, 'w', encoding='UTF8', newline='') as f:
                 writer = csv.writer(f)
-                for t in range(lengths[r]):
-                    row = [timestamps[r][t]] + list(values[r][t, :])
-                    writer.writerow(row)
+                for timestamps, values in store.get_blocks():
+                    physical = store.to_physical(values)
+                    for t in range(len(timestamps)):
+                        row = [timestamps[t]] + list(physical[t, :])
+                        writer.writerow(row)
 
         # Export additional datalines
         additional_datalines = self.decoded['additional_datalines']
@@ -298,7 +566,7 @@ class DecoderInterface:
             length, timestamps, values = dataline['length'], dataline['timestamps'], dataline['values']
             with open(filename, 'w', encoding='UTF8', newline='') as f:
                 writer = csv.writer(f)
-                for i in length:
+                for i in range(length):
                     row = [timestamps[i], values[i]]
                     writer.writerow(row)
 
@@ -322,39 +590,216 @@ class DecoderInterface:
                 symbol_values_str = symbol_values_str.replace("[", "").replace("]", "").replace("'", "").replace(" ", "")
                 file.write(symbol_values_str)
 
+    def get_changes_since(self, version):
+        """
+        Gets the current snapshot together with the changes since a previous version, so that consumers only have to
+        process new measurements, symbol intervals, symbol values and characters.
+        Decoders are expected to only append to these between two clears. If the previous version is unknown (e.g., too
+        old) or the decoder has been cleared since, everything is reported as new and reset is True.
+        :param version: Version of the last snapshot that was processed by the consumer, 0 for none.
+        :return: Dictionary with the snapshot, whether the consumer has to reset, the new measurements of every receiver
+                 and the new symbol intervals, symbol values and characters with the indices of the first new entry.
+        """
+        snapshot = self.get_decoded()
+        counts = snapshot['counts']
+        previous = self.history.get(version)
+        reset = previous is None or previous['clear_count'] != counts['clear_count']
+        if reset:
+            previous = {'received': [0] * self.num_receivers, 'symbol_intervals': 0, 'symbol_values': 0, 'sequence': 0}
+
+        received = snapshot['received']
+        starts, timestamps, values = [], [], []
+        for receiver_index in range(self.num_receivers):
+            # Measurements that have been archived in the meantime are not reported
+            start = max(0, previous['received'][receiver_index] - received['offsets'][receiver_index])
+            starts.append(start)
+            if received['timestamps'][receiver_index] is None:
+                timestamps.append(None)
+                values.append(None)
+            else:
+                timestamps.append(received['timestamps'][receiver_index][start:])
+                values.append(received['values'][receiver_index][start:])
+
+        return {
+            'version': snapshot['version'],
+            'snapshot': snapshot,
+            'reset': reset,
+            'received': {
+                'starts': starts,
+                'timestamps': timestamps,
+                'values': values
+            },
+            'symbol_intervals_start': previous['symbol_intervals'],
+            'symbol_intervals': snapshot['symbol_intervals'][previous['symbol_intervals']:],
+            'symbol_values_start': previous['symbol_values'],
+            'symbol_values': snapshot['symbol_values'][previous['symbol_values']:],
+            'sequence_start': previous['sequence'],
+            'sequence': snapshot['sequence'][previous['sequence']:]
+        }
+
     def get_decoded(self):
         """
-        Returns current decoder values.
+        Returns the last published snapshot of the decoder values.
+        The snapshot is not modified afterwards, arrays are read-only views of the valid measurements in the storage
+        dtype of the receivers, physical values are calculated with to_physical and the scales and value offsets.
         :return: Current decoder values.
         """
-        self.decoded = {
+        if self.decoded is None:
+            self.publish()
+        return self.decoded
+
+    def publish(self):
+        """
+        Publishes the current decoder values as a new snapshot under an incremented version.
+        This is called after every decode step, so that other threads (e.g., the GUI) never see values of an
+        unfinished step.
+        """
+        counts = {
+            'clear_count': self.clear_count,
+            'received': [self.offsets[i] + self.lengths[i] for i in range(self.num_receivers)],
+            'symbol_intervals': len(self.symbol_intervals),
+            'symbol_values': len(self.symbol_values),
+            'sequence': len(self.sequence)
+        }
+        version = self.version + 1
+        decoded = {
+            'version': version,
+            'counts': counts,
             'received': {
-                'lengths': self.lengths,
-                'timestamps': self.timestamps,
-                'values': self.received
+                'lengths': list(self.lengths),
+                'offsets': list(self.offsets),
+                'timestamps': [read_only(self.timestamps[i], self.lengths[i]) for i in range(self.num_receivers)],
+                'values': [read_only(self.received[i], self.lengths[i]) for i in range(self.num_receivers)],
+                'scales': [store.scale for store in self.stores],
+                'value_offsets': [store.value_offset for store in self.stores]
             },
-            'additional_datalines': self.additional_datalines,
-            'landmarks': self.landmarks,
+            'additional_datalines': list(self.additional_datalines),
+            'landmarks': list(self.landmarks),
             'min_timestamp': self.min_timestamp,
             'max_timestamp': self.max_timestamp,
-            'symbol_intervals': self.symbol_intervals,
-            'symbol_values': self.symbol_values,
+            'statistics': [statistics.get() for statistics in self.statistics],
+            'window_statistics': [None if statistics is None else statistics.get()
+                                  for statistics in self.window_statistics],
+            'symbol_intervals': list(self.symbol_intervals),
+            'symbol_values': list(self.symbol_values),
             'sequence': self.sequence
         }
-        return self.decoded
+        self.history[version] = counts
+        self.history.pop(version - SNAPSHOT_HISTORY_LENGTH, None)
+        self.version = version
+        self.decoded = decoded
 
-    def get_received(self, receiver_index, sensor_index=-1):
+    def get_range(self, receiver_index, start_time, end_time):
         """
-        Gets receiver values.
-        :param receiver_index: Index of desired receiver.
-        :param sensor_index: Index of desired sensor, set to -1 to get all sensor values.
-        :return: Received values, dimensions (time, sensors) or (time).
+        Gets the measurements of a receiver within a time interval, using binary search on the valid timestamps.
+        Timestamps are expected to be sorted.
+        Unlike SampleStore.get_range, which includes both ends, the start of the interval is exclusive: consecutive
+        symbol intervals share their boundaries, and a measurement at a boundary belongs to the earlier interval only.
+        :param receiver_index: Receiver index.
+        :param start_time: Start of the interval (exclusive).
+        :param end_time: End of the interval (inclusive).
+        :return: Timestamps, dimensions (time), and values in the storage dtype, dimensions (time, sensors).
+        """
+        start_index = self.index_of(receiver_index, start_time)
+        end_index = max(start_index, self.index_of(receiver_index, end_time))
+        if self.timestamps[receiver_index] is None:
+            return np.empty((0,)), np.empty((0, self.receivers[receiver_index].num_sensors))
+        return (self.timestamps[receiver_index][start_index:end_index],
+                self.received[receiver_index][start_index:end_index])
+
+    def index_of(self, receiver_index, timestamp):
+        """
+        Gets the index of the first measurement of a receiver strictly after a given time, using binary search on the
+        valid timestamps. Timestamps are expected to be sorted.
+        :param receiver_index: Receiver index.
+        :param timestamp: Time.
+        :return: Index, equals lengths[receiver_index] if there is no measurement after the given time.
+        """
+        if self.timestamps[receiver_index] is None:
+            return 0
+        return int(np.searchsorted(self.timestamps[receiver_index][:self.lengths[receiver_index]], timestamp, side='right'))
+
+    def get_reference_range(self, receiver_index=0, sensor_index=0):
+        """
+        Gets the physical minimum and maximum of a sensor in the reference period (the first reference_length seconds),
+        e.g., to derive a detection threshold from the quiet start of a transmission.
+        :param receiver_index: Receiver index.
+        :param sensor_index: Sensor index.
+        :return: Minimum and maximum, None if there are no reference statistics or the reference period is not over.
         """
-        received = self.decoded['received']
-        lengths, timestamps, values = received['lengths'], received['timestamps'], received['values']
-        if lengths[0] == 0:
+        statistics = self.reference_statistics[receiver_index]
+        if statistics is None or self.max_timestamp - self.min_timestamp < self.reference_length:
             return None
-        return values[receiver_index][:lengths[receiver_index], :] if sensor_index == -1 else values[receiver_index][:lengths[receiver_index], sensor_index]
+        return statistics.minimum[sensor_index], statistics.maximum[sensor_index]
+
+    def get_aggregates(self, receiver_index, start_time, end_time, max_buckets):
+        """
+        Gets the minimum, maximum and mean of the measurements of a receiver per time bucket, using the finest aggregate
+        level with at most max_buckets buckets in the time range.
+        :param receiver_index: Receiver index.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :param max_buckets: Maximum number of buckets.
+        :return: Bucket centers, dimensions (buckets), and physical minimum, maximum and mean, dimensions
+                 (buckets, sensors).
+        """
+        return self.aggregates[receiver_index].get_range(start_time, end_time, max_buckets)
+
+    def get_resampled(self, start_time=None, end_time=None):
+        """
+        Gets the physical values of all receivers on the common time base, for vectorised processing across receivers.
+        The columns are ordered by receiver and then by sensor.
+        :param start_time: Start of the time range (inclusive), None for the first sample in RAM (archived samples of a
+                           rolling store are only read for an explicit start time).
+        :param end_time: End of the time range (inclusive), None for the last sample.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, all sensors), None if resampling is
+                 disabled.
+        """
+        if self.resampler is None:
+            return None
+        return self.resampler.store.get_range(start_time, end_time)
+
+    def get_processed(self, receiver_index, start_time=None, end_time=None):
+        """
+        Gets the output of the pre-processing pipeline of a receiver.
+        :param receiver_index: Receiver index.
+        :param start_time: Start of the time range (inclusive), None for the first sample in RAM (archived samples of a
+                           rolling store are only read for an explicit start time).
+        :param end_time: End of the time range (inclusive), None for no upper limit.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors), None if the receiver has no
+                 pipeline.
+        """
+        if self.processed[receiver_index] is None:
+            return None
+        return self.processed[receiver_index].get_range(start_time, end_time)
+
+    def get_received(self, receiver_index, sensor_index=-1, start_time=None, end_time=None, return_timestamps=False):
+        """
+        Gets physical receiver values.
+        Without a start time, the values in the arrays of the decoder are returned. With a start time, values that have
+        already been archived by a rolling store are read from disk as well.
+        Values of receivers with a compact storage dtype are converted, otherwise they are views of the arrays.
+        :param receiver_index: Index of desired receiver.
+        :param sensor_index: Index of desired sensor, set to -1 to get all sensor values.
+        :param start_time: Start of the time range (inclusive), None for the first sample in RAM.
+        :param end_time: End of the time range (inclusive), None for no upper limit.
+        :param return_timestamps: Whether to return the timestamps as well.
+        :return: Received values, dimensions (time, sensors) or (time), optionally preceded by the timestamps.
+        """
+        store = self.stores[receiver_index]
+        if start_time is None and end_time is None:
+            timestamps, values, length, offset = store.published
+            if length == 0:
+                return None
+            timestamps, values = timestamps[:length], values[:length]
+        else:
+            timestamps, values = store.get_range(start_time, end_time)
+            if len(timestamps) == 0:
+                return None
+        if sensor_index != -1:
+            values = values[:, sensor_index]
+        values = store.to_physical(values, sensor_index)
+        return (timestamps, values) if return_timestamps else values
 
     def parameters_edited(self):
         """
@@ -366,19 +811,37 @@ class DecoderInterface:
     def pre_processing(self):
         """
         Pre-process input from receivers, e.g., apply filters.
+        By default, the new measurements are processed with the pipelines declared in pre_processing_stages, e.g.,
+        [[MovingMedian(5), butterworth(2.0, 100), Decimation(4)], None] for a decoder with two receivers.
+        May be overriden in the concrete implementation.
         """
-        Logging.info("pre_processing is not implemented in your selected decoder.", repeat=False)
+        if self.pre_processing_stages is None:
+            Logging.info("pre_processing is not implemented in your selected decoder.", repeat=False)
+            return
+        self.update_processed()
 
     def start(self):
         """
         Starts the decoder.
-        Runs the listen function of the receiver in a new (daemon) thread.
+        Receivers with a serial port are served by the I/O reactor thread (if enabled in the settings), the listen
+        function of all other receivers runs in a new (daemon) thread.
+        Receivers that support it get the store of the decoder to write their measurements directly into it.
         """
         self.decoder_started()
+        # Measurements that are still buffered are taken over first to keep the order
+        self.empty_receiver_buffers()
         for receiver_index in range(self.num_receivers):
-            self.receivers[receiver_index].running = True
-            thread = threading.Thread(target=self.receivers[receiver_index].listen, daemon=True)
-            thread.start()
+            receiver = self.receivers[receiver_index]
+            receiver.data_event = self.data_event
+            if receiver.DIRECT_WRITE:
+                receiver.store = self.stores[receiver_index]
+            receiver.running = True
+            port = receiver.get_port()
+            if port is not None and SettingsStore.settings['IO_REACTOR']:
+                reactor.register(port, receiver.listen_step)
+            else:
+                thread = threading.Thread(target=receiver.listen, daemon=True)
+                thread.start()
         self.active = True
         
 
@@ -389,4 +852,10 @@ class DecoderInterface:
         self.active = False
         for receiver in self.receivers:
             receiver.running = False
+            port = receiver.get_port()
+            if port is not None:
+                reactor.unregister(port)
+            receiver.store = None
+        for store in self.stores:
+            store.flush()
         self.decoder_stopped()
\ No newline at end of file
@@ -1,7 +1,13 @@
+import numpy as np
+import select
 import time
 from Utils import Logging
+from Utils.RingBuffer import RingBuffer
 from Utils.Settings import SettingsStore
 
+# Minimum spacing (s) of the timestamps of consecutive blocks, see block_timestamps
+MIN_TIMESTAMP_STEP = 1e-6
+
 
 class ReceiverInterface:
     """
@@ -9,19 +15,37 @@ class ReceiverInterface:
     Each receiver can have multiple sensors where each sensor stores the
     measured values as a  foating point value. For example, a receiver can be a
     color sensor, where the multiple sensors are the measured colors.
+    To save memory, a receiver may declare a compact storage dtype (e.g., float32) or append raw integer codes (e.g.,
+    int32) together with value_scale and value_offset, the physical values are calculated when they are read.
     """
+    # Whether the receiver writes its measurements directly into the store of the decoder while the decoder is running,
+    # should only be enabled if all measurements are appended from a single thread (e.g., the I/O reactor thread)
+    DIRECT_WRITE = False
+
     def __init__(self, decoder=None):
         """
         Initializes the receiver.
         """
         self.decoder = decoder
 
-        self.buffer = []
+        self.buffer = None
+        self.data_event = None
         self.drop_first_measurements = 0
+        # Framer of the serial protocol (see Utils/StreamFramer.py), used by read_frames
+        self.framer = None
+        # Timestamp of the last measurement of the last block, see block_timestamps
+        self.last_timestamp = None
         self.num_sensors = None
         self.running = False
         self.sensor_names = None
         self.sleep_time = 0.001
+        # Dtype of the stored values, physical values are value * value_scale + value_offset (scalar or one per sensor)
+        self.storage_dtype = np.float64
+        # Store of the decoder that measurements are written to directly (see DIRECT_WRITE), None if the buffer is used
+        self.store = None
+        self.value_offset = None
+        self.value_scale = None
+        self.wait_timeout = 0.1
 
     def setup(self):
         """
@@ -35,13 +59,15 @@ class ReceiverInterface:
             Logging.warning("Sensor names do not match number of sensors!")
             self.sensor_names = ["Sensor" + str(i + 1) for i in range(self.num_sensors)]
 
+        self.buffer = RingBuffer(SettingsStore.settings['RECEIVER_BUFFER_LENGTH'], self.num_sensors, self.storage_dtype)
+
     def listen(self):
         """
         Runs an infinite loop of calling listen_step to check for new measurement values.
         """
         while self.running:
             self.listen_step()
-            time.sleep(self.sleep_time)
+            self.wait_for_data()
 
     def listen_step(self):
         """
@@ -51,24 +77,98 @@ class ReceiverInterface:
         """
         Logging.warning("listen_step not implemented in your receiver!", repeat=False)
 
+    def get_port(self):
+        """
+        Gets the serial port the receiver reads from.
+        Should be overridden in receiver implementations that use a serial port to enable waiting for data.
+        :return: Serial port, None if the receiver does not use a serial port.
+        """
+        return None
+
+    def read_frames(self):
+        """
+        Reads all bytes waiting on the serial port and passes them to the framer of the receiver.
+        Bytes of an incomplete frame are kept in the framer until the rest arrives.
+        :return: Complete frames as one contiguous block of bytes.
+        """
+        port = self.get_port()
+        return self.framer.feed(port.read(port.in_waiting))
+
+    def block_timestamps(self, count, sample_period):
+        """
+        Timestamps a block of measurements that were read at once. They are assumed to be spaced by the sample period,
+        the last one being received now. The timestamps are kept above the last timestamp of the previous block, so
+        they increase across blocks even if a block arrives early or the sample period is inaccurate.
+        :param count: Number of measurements of the block.
+        :param sample_period: Time between two measurements (s).
+        :return: Timestamps, dimensions (count).
+        """
+        timestamps = time.time() - sample_period * np.arange(count - 1, -1, -1)
+        if self.last_timestamp is not None:
+            timestamps = np.maximum(timestamps, self.last_timestamp + MIN_TIMESTAMP_STEP * np.arange(1, count + 1))
+        if count > 0:
+            self.last_timestamp = timestamps[-1]
+        return timestamps
+
+    def wait_for_data(self):
+        """
+        Blocks until new data may be available, this is executed after every listen_step.
+        Receivers with a serial port wait until bytes arrive (at most wait_timeout), other receivers sleep for sleep_time.
+        May be overridden in the concrete receiver implementation.
+        """
+        port = self.get_port()
+        if port is None:
+            time.sleep(self.sleep_time)
+        else:
+            self.wait_for_serial(port)
+
+    def wait_for_serial(self, port):
+        """
+        Blocks until a serial port has bytes waiting or wait_timeout has passed.
+        If the port cannot be waited on (e.g., on Windows), it falls back to sleeping for sleep_time.
+        :param port: Serial port.
+        """
+        try:
+            if port.in_waiting > 0:
+                return
+            select.select([port.fileno()], [], [], self.wait_timeout)
+        except (AttributeError, OSError, ValueError):
+            time.sleep(self.sleep_time)
+
+    def notify(self):
+        """
+        Signals the decoder that new measurements are available.
+        """
+        if self.data_event is not None:
+            self.data_event.set()
+
     def get_available(self):
         """
         Get how many measurements are available in the buffer.
         :return: length of the buffer.
         """
-        return len(self.buffer)
+        return self.buffer.available
+
+    def get(self):
+        """
+        Removes and returns the oldest measurement of the buffer.
+        :return: removed measurement, None if the buffer is empty.
+        """
+        sample = self.buffer.pop()
+        if sample is None:
+            return None
+        return {'timestamp': sample[0], 'values': sample[1]}
 
-    def get(self, idx):
+    def drain(self):
         """
-        Removes and returns a measurement of the buffer.
-        :param idx: index of the measurement to be removed from the buffer.
-        :return: removed measurement.
+        Removes all measurements from the buffer and returns them as numpy blocks.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
         """
-        return self.buffer.pop(idx)
+        return self.buffer.drain()
 
     def append_values(self, values, timestamp=None):
         """
-        Appends values to the buffer with a timestamp.
+        Appends values to the buffer (or the store of the decoder, see DIRECT_WRITE) with a timestamp.
         :param values: values to be appended, should be list or tuple.
         :param timestamp: timestamp when the values were measured, if None, current time is used.
         """
@@ -82,7 +182,32 @@ class ReceiverInterface:
 
         if timestamp is None:
             timestamp = time.time()
-        self.buffer.append({'timestamp': timestamp, 'values': values})
+        store = self.store
+        if store is not None:
+            store.append(timestamp, values)
+        elif not self.buffer.push(timestamp, values):
+            Logging.warning("Receiver buffer overflow, measurements are dropped. Is the decoder running?", repeat=False)
+        self.notify()
+
+    def append_block(self, timestamps, values):
+        """
+        Appends a block of measurements to the buffer (or the store of the decoder, see DIRECT_WRITE).
+        :param timestamps: timestamps of the measurements, dimensions (time).
+        :param values: values of the measurements, dimensions (time, sensors).
+        """
+        if self.drop_first_measurements > 0:
+            dropped = min(self.drop_first_measurements, len(timestamps))
+            self.drop_first_measurements -= dropped
+            timestamps, values = timestamps[dropped:], values[dropped:]
+
+        if len(timestamps) == 0:
+            return
+        store = self.store
+        if store is not None:
+            store.extend(timestamps, values)
+        elif self.buffer.push_block(timestamps, values) < len(timestamps):
+            Logging.warning("Receiver buffer overflow, measurements are dropped. Is the decoder running?", repeat=False)
+        self.notify()
 
     def shutdown(self):
         #Allow for any closing stuff
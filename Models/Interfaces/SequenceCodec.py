@@ -0,0 +1,79 @@
+import numpy as np
+
+"""
+This module implements the conversion of received symbol values to the characters of a sequence, shared by the decoders.
+"""
+
+
+def gray_decoding_table(bits_per_symbol):
+    """
+    Gets the table that maps Gray-coded symbol values to their binary values.
+    :param bits_per_symbol: Number of bits per symbol.
+    :return: Array with the binary value at the index of every Gray code.
+    """
+    values = np.arange(2 ** bits_per_symbol)
+    table = np.empty_like(values)
+    table[values ^ (values >> 1)] = values
+    return table
+
+
+class SequenceCodec:
+    """
+    Scheme that maps fixed-length groups of symbol values to characters.
+    A transmission starts with sync_symbols synchronization symbols, followed by the characters. Every character
+    consists of bits_per_character bits (most significant bit first), every data symbol carries bits_per_symbol bits
+    (M-ary symbols with M = 2 ** bits_per_symbol, optionally Gray-coded). With a symbol stride, only every stride-th
+    symbol carries data, e.g., when symbols are separated by a neutral symbol.
+    """
+    def __init__(self, bits_per_character, bits_per_symbol=1, gray=False, sync_symbols=0, symbol_stride=1,
+                 symbol_offset=0, character_offset=0):
+        """
+        Initializes the codec.
+        :param bits_per_character: Number of bits per character, padded with leading zero bits to whole symbols.
+        :param bits_per_symbol: Number of bits per data symbol.
+        :param gray: Whether the data symbols are Gray-coded.
+        :param sync_symbols: Number of synchronization symbols before the first character.
+        :param symbol_stride: Every symbol_stride-th symbol (starting with the first one) carries data.
+        :param symbol_offset: Symbol value that stands for the bits 0...0.
+        :param character_offset: Code of the character that stands for the bits 0...0.
+        """
+        self.bits_per_symbol = bits_per_symbol
+        self.gray = gray
+        self.sync_symbols = sync_symbols
+        self.symbol_stride = symbol_stride
+        self.symbol_offset = symbol_offset
+        self.character_offset = character_offset
+
+        self.data_symbols_per_character = -(-bits_per_character // bits_per_symbol)
+        self.symbols_per_character = self.data_symbols_per_character * symbol_stride
+        self.gray_table = gray_decoding_table(bits_per_symbol) if gray else None
+        # Shifts of the bits of a symbol, most significant bit first
+        self.shifts = np.arange(bits_per_symbol - 1, -1, -1)
+
+    def decode(self, symbol_values, num_characters, end=None):
+        """
+        Decodes all characters after the already decoded ones whose symbols are complete, in one vectorized step.
+        :param symbol_values: All symbol values of the transmission.
+        :param num_characters: Number of characters that have already been decoded.
+        :param end: Number of symbol values that may be used, None for all.
+        :return: String of the new characters.
+        """
+        end = len(symbol_values) if end is None else end
+        start = self.sync_symbols + num_characters * self.symbols_per_character
+        count = (end - start) // self.symbols_per_character
+        if count <= 0:
+            return ""
+
+        values = np.asarray(symbol_values[start:start + count * self.symbols_per_character], dtype=np.int64)
+        values = values.reshape((count, self.symbols_per_character))[:, ::self.symbol_stride] - self.symbol_offset
+        # Invalid symbol values keep their lower bits
+        values &= 2 ** self.bits_per_symbol - 1
+        if self.gray:
+            values = self.gray_table[values]
+        bits = ((values[:, :, None] >> self.shifts) & 1).reshape((count, -1)).astype(np.uint8)
+
+        # Characters are packed into whole bytes (padded with leading zero bits) and combined big-endian
+        padding = -bits.shape[1] % 8
+        packed = np.packbits(np.pad(bits, ((0, 0), (padding, 0))), axis=1).astype(np.int64)
+        codes = packed @ (256 ** np.arange(packed.shape[1] - 1, -1, -1)) + self.character_offset
+        return "".join(map(chr, codes))
@@ -1,6 +1,8 @@
+import queue
 import time
 
 from Utils import Logging
+from Utils.IOReactor import reactor
 from Utils.Settings import SettingsStore
 
 
@@ -10,9 +12,111 @@ class TransmitterInterface:
     For instance, a transmitter may regulate the pressure of a pump or
     the amount of background flow in the case of fluids.
     """
+    # Terminator of the responses sent by the device
+    RESPONSE_TERMINATOR = b"\n"
+    # Maximum time in seconds that read_response waits for a response consumed by the I/O reactor thread
+    RESPONSE_TIMEOUT = 1.0
+    # Maximum number of unread responses, older responses are dropped (e.g., of transmitters that never read them)
+    RESPONSE_QUEUE_LENGTH = 16
+
     def __init__(self):
+        self.response_buffer = bytearray()
+        # Responses consumed by the I/O reactor thread that have not been read by read_response yet
+        self.responses = queue.Queue(self.RESPONSE_QUEUE_LENGTH)
+
+    def get_port(self):
+        """
+        Gets the serial port the transmitter writes to.
+        Should be overridden in transmitter implementations that use a serial port.
+        :return: Serial port, None if the transmitter does not use a serial port.
+        """
+        return None
+
+    def start_listening(self):
+        """
+        Lets the I/O reactor thread consume the responses of the device (if enabled in the settings), so that commands
+        do not have to wait for them. This should be called at the end of the initialization.
+        """
+        port = self.get_port()
+        if port is not None and port.is_open and SettingsStore.settings['IO_REACTOR']:
+            reactor.register(port, self.handle_input)
+
+    def stop_listening(self):
+        """
+        Stops consuming responses in the I/O reactor thread, this must be called before the port is closed.
+        """
+        port = self.get_port()
+        if port is not None:
+            reactor.unregister(port)
+
+    def handle_input(self):
+        """
+        Reads waiting bytes from the serial port and passes every complete response to response_received.
+        This is called in the I/O reactor thread.
+        """
+        port = self.get_port()
+        self.response_buffer += port.read(port.in_waiting)
+        *responses, rest = self.response_buffer.split(self.RESPONSE_TERMINATOR)
+        self.response_buffer = bytearray(rest)
+        for response in responses:
+            response = bytes(response).strip()
+            self.queue_response(response)
+            self.response_received(response)
+
+    def queue_response(self, response):
+        """
+        Queues a response for read_response, the oldest response is dropped if the queue is full.
+        This is called in the I/O reactor thread.
+        :param response: Response without terminator.
+        """
+        while True:
+            try:
+                self.responses.put_nowait(response)
+                return
+            except queue.Full:
+                try:
+                    self.responses.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def write_command(self, command):
+        """
+        Writes a command to the serial port, unread responses to previous commands (e.g., responses that arrived after
+        the timeout of read_response) are discarded, so read_response returns the response to this command.
+        :param command: Command including terminator.
+        """
+        while True:
+            try:
+                self.responses.get_nowait()
+            except queue.Empty:
+                break
+        self.get_port().write(command)
+
+    def read_response(self):
+        """
+        Reads the response to a command.
+        If the responses are consumed by the I/O reactor thread, this waits until the reactor thread has received the
+        next response (at most RESPONSE_TIMEOUT seconds). Commands should be written with write_command.
+        :return: Response, None if no response has been received in time.
+        """
+        port = self.get_port()
+        if reactor.is_registered(port):
+            try:
+                return self.responses.get(timeout=self.RESPONSE_TIMEOUT)
+            except queue.Empty:
+                Logging.warning("No response received from transmitter.", repeat=False)
+                return None
+        return port.readline()
+
+    def response_received(self, response):
+        """
+        Handles a response of the device, this is called in the I/O reactor thread in addition to passing the response
+        to read_response.
+        May be overridden in the concrete implementation.
+        :param response: Response without terminator.
+        """
         pass
 
     def shutdown(self):
         #Allow for any closing stuff
-        pass
\ No newline at end of file
+        pass
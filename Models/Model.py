@@ -1,7 +1,9 @@
 import importlib
 import os
 
+from Models.DecodeWorker import DecodeWorker
 from Utils import Logging
+from Utils.Settings import SettingsStore
 
 
 class Model:
@@ -15,6 +17,8 @@ class Model:
         """
         self.encoder = None
         self.decoder = None
+        # Runs the decode steps while the decoder is active
+        self.decode_worker = None
 
     def add_decoder(self, decoder_type, parameters, parameter_values):
         """
@@ -78,6 +82,32 @@ class Model:
         else:
             return None
 
+    def get_changes_since(self, version):
+        """
+        Gets the current decoder snapshot together with the changes since a previous version.
+        Note: Do not use is_decoder_available, since this also gets executed when the plot is not active (stopped).
+        :param version: Version of the last snapshot that was processed.
+        :return: Changes if a decoder is available, else None.
+        """
+        if self.decoder is not None:
+            return self.decoder.get_changes_since(version)
+        else:
+            return None
+
+    def get_aggregates(self, receiver_index, start_time, end_time, max_buckets):
+        """
+        Gets the minimum, maximum and mean of the measurements of a receiver per time bucket.
+        :param receiver_index: Index of the receiver.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :param max_buckets: Maximum number of buckets.
+        :return: Bucket centers, minimum, maximum and mean if a decoder exists, else None.
+        """
+        if self.decoder is not None:
+            return self.decoder.get_aggregates(receiver_index, start_time, end_time, max_buckets)
+        else:
+            return None
+
     def get_decoder_info(self):
         """
         Gets information about decoder.
@@ -131,6 +161,20 @@ class Model:
         else:
             return None
 
+    def get_received(self, receiver_index, start_time, end_time):
+        """
+        Gets the measurements of a receiver within a time range, including archived ones.
+        :param receiver_index: Index of the receiver.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :return: Timestamps and values if a decoder exists and there are measurements in the range, else None.
+        """
+        if self.decoder is not None:
+            return self.decoder.get_received(receiver_index, start_time=start_time, end_time=end_time,
+                                             return_timestamps=True)
+        else:
+            return None
+
     def is_decoder_active(self):
         """
         Checks whether a decoder is available.
@@ -163,14 +207,39 @@ class Model:
         self.decoder.decoder_removed()
         self.decoder = None
 
+    def clear_decoder(self):
+        """
+        Clears the decoder, while it is running, this is done by the decode worker.
+        """
+        if self.decode_worker is not None:
+            self.decode_worker.clear()
+        else:
+            self.decoder.clear()
+
+    def load_session(self, directory):
+        """
+        Loads a session that was recorded with storage mode memmap into the decoder, e.g., after a crash.
+        :param directory: Session directory.
+        :return: Whether the session has been loaded.
+        """
+        if self.decoder is None:
+            Logging.error("Select a decoder before opening a session.")
+            return False
+        return self.decoder.load_session(directory)
+
     def start_decoder(self):
         """
-        Starts the decoder.
+        Starts the decoder and the worker that runs its decode steps.
         """
         self.decoder.start()
+        self.decode_worker = DecodeWorker(self.decoder, SettingsStore.settings['DECODE_MIN_INTERVAL'])
+        self.decode_worker.start()
 
     def stop_decoder(self):
         """
-        Stops the decoder.
+        Stops the worker that runs the decode steps and the decoder.
         """
+        if self.decode_worker is not None:
+            self.decode_worker.stop()
+            self.decode_worker = None
         self.decoder.stop()
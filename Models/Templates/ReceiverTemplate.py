@@ -17,4 +17,8 @@ class ExampleReceiver(ReceiverInterface):
 
     def listen_step(self):
         # Implement: Listen for new measurement values
-        pass
\ No newline at end of file
+        pass
+
+    def get_port(self):
+        # Optional: Return the serial port to wait for incoming bytes instead of polling
+        return None
\ No newline at end of file
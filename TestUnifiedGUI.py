@@ -2,6 +2,33 @@ import unittest
 import os
 import importlib
 import sys
+import tempfile
+import time
+import numpy as np
+import scipy.ndimage
+import serial
+
+from Models.DecodeWorker import DecodeWorker
+from Models.Implementations.Decoders.AD7746Decoder import AD7746Decoder
+from Models.Implementations.Examples.ExampleDecoder import ExampleDecoder
+from Models.Implementations.Examples.ExampleDecoder2 import ExampleDecoder2
+from Models.Implementations.Receivers.LDC1614EVMReceiver import LDC1614EVMReceiver, STREAM_FRAME_HEADER, \
+    STREAM_FRAME_LENGTH, create_stream_framer
+from Models.Implementations.Receivers.PocketLoCReceiver import FRAME_TERMINATOR, VALUE_COLUMNS, PocketLoCReceiver, \
+    parse_frames
+from Models.Interfaces.ReceiverInterface import ReceiverInterface
+from Models.Implementations.Examples.ExampleEncoder import ExampleEncoder
+from Models.Interfaces.SequenceCodec import SequenceCodec
+from Models.Interfaces.TransmitterInterface import TransmitterInterface
+from Utils.Aggregates import Aggregates
+from Utils.IOReactor import IOReactor, reactor
+from Utils.LineProtocol import LineParser
+from Utils.Resampler import Resampler
+from Utils.RingBuffer import RingBuffer
+from Utils.RunningStatistics import RunningStatistics
+from Utils.StreamingFilter import Decimation, MovingAverage, MovingMedian, Pipeline, StreamingGaussianFilter, butterworth
+from Utils.StreamFramer import DelimiterFramer, FixedLengthFramer, HeaderCRCFramer
+from Utils.SampleStore import MemmapSampleStore, RollingSampleStore, SampleStore, open_session
 
 
 def is_same_shape2(l1, l2):
@@ -107,6 +134,596 @@ class TestTransmitters(unittest.TestCase):
     pass
 
 
+class TestSampleStore(unittest.TestCase):
+    def test_append(self):
+        store = SampleStore(4)
+        for i in range(100):
+            store.append(float(i), [i, 2 * i])
+        self.assertEqual(store.length, 100)
+        self.assertGreaterEqual(store.capacity, 100)
+        self.assertTrue(np.array_equal(store.get_timestamps(), np.arange(100)))
+        self.assertTrue(np.array_equal(store.get_values(1), 2 * np.arange(100)))
+        self.assertEqual(store.min_timestamp, 0.0)
+        self.assertEqual(store.max_timestamp, 99.0)
+
+    def test_clear(self):
+        store = SampleStore(4)
+        store.append(1.0, [1])
+        store.clear()
+        self.assertEqual(store.length, 0)
+        self.assertEqual(len(store.get_values()), 0)
+        self.assertIsNone(store.min_timestamp)
+        self.assertIsNone(store.max_timestamp)
+        store.append(3.0, [3])
+        store.append(2.0, [2])
+        self.assertEqual((store.min_timestamp, store.max_timestamp), (2.0, 3.0))
+        self.assertEqual(store.published[2], 2)
+
+    def test_published(self):
+        store = SampleStore(2, 3)
+        store.extend(np.arange(5.0), np.ones((5, 2)))
+        timestamps, values, length, offset = store.published
+        self.assertEqual(length, 5)
+        self.assertIs(values, store.values)
+        self.assertTrue(np.all(np.isnan(values[:length, 2])))
+
+    def test_compact_dtype(self):
+        store = SampleStore(4, 2, np.int32, [0.5, 2.0], 1.0)
+        store.extend(np.arange(1.0, 4.0), np.array([[2], [4], [6]]))
+        self.assertEqual(store.values.dtype, np.int32)
+        physical = store.to_physical(store.get_values())
+        self.assertTrue(np.array_equal(physical[:, 0], [2.0, 3.0, 4.0]))
+        self.assertTrue(np.all(np.isnan(physical[:, 1])))
+        self.assertTrue(np.array_equal(store.to_physical(store.get_values(0), 0), [2.0, 3.0, 4.0]))
+
+    def test_memmap_recovery(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = MemmapSampleStore(directory, "receiver00", 4, 2)
+            for i in range(10):
+                store.append(float(i + 1), [i, -i])
+            store.flush()
+            recovered = open_session(directory)[0]
+            self.assertEqual(recovered.length, 10)
+            self.assertTrue(np.array_equal(recovered.get_values(1), -np.arange(10)))
+            del store, recovered
+
+    def test_load_session(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = MemmapSampleStore(directory, "receiver00", 4, 1, {'receiver_index': 0})
+            for i in range(5):
+                store.append(float(i + 1), [i])
+            store.flush()
+            decoder = ExampleDecoder(None, None)
+            # Running receivers would write into the loaded stores
+            decoder.active = True
+            self.assertFalse(decoder.load_session(directory))
+            self.assertEqual(decoder.stores[0].length, 0)
+            decoder.active = False
+            self.assertTrue(decoder.load_session(directory))
+            self.assertEqual(decoder.stores[0].length, 5)
+            self.assertEqual(decoder.get_decoded()['received']['lengths'], [5])
+            del store, decoder
+
+    def test_rolling(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = RollingSampleStore(directory, "receiver00", 10, 1)
+            for i in range(100):
+                store.append(float(i), [i])
+            self.assertLessEqual(store.capacity, 20)
+            self.assertEqual(store.offset + store.length, 100)
+            timestamps, values = store.get_range(5, 95)
+            self.assertTrue(np.array_equal(timestamps, np.arange(5, 96)))
+            self.assertTrue(np.array_equal(values[:, 0], np.arange(5, 96)))
+            # An open range only returns the samples in RAM, the blocks include the archive
+            timestamps, values = store.get_range()
+            self.assertEqual(len(timestamps), store.length)
+            self.assertEqual(timestamps[0], store.offset)
+            blocks = list(store.get_blocks(7))
+            self.assertTrue(all(len(block[0]) <= 7 for block in blocks))
+            self.assertTrue(np.array_equal(np.concatenate([block[0] for block in blocks]), np.arange(100)))
+            self.assertTrue(np.array_equal(np.concatenate([block[1] for block in blocks])[:, 0], np.arange(100)))
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wrap_around(self):
+        buffer = RingBuffer(8, 2)
+        for i in range(6):
+            buffer.push(float(i), [i, i])
+        buffer.drain()
+        buffer.push_block(np.arange(6, 12, dtype=float), np.ones((6, 1)))
+        self.assertEqual(buffer.available, 6)
+        timestamps, values = buffer.drain()
+        self.assertTrue(np.array_equal(timestamps, np.arange(6, 12)))
+        self.assertTrue(np.all(np.isnan(values[:, 1])))
+        self.assertEqual(buffer.available, 0)
+
+    def test_overflow(self):
+        buffer = RingBuffer(4, 1)
+        for i in range(6):
+            buffer.push(float(i), [i])
+        self.assertEqual(buffer.overflow_count, 2)
+        self.assertTrue(np.array_equal(buffer.drain()[0], np.arange(4)))
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), "Pseudo terminals are not available.")
+class TestIOReactor(unittest.TestCase):
+    def setUp(self):
+        # The reactor reads from the slave side of a pseudo terminal, the test writes to the master side
+        self.master, self.slave = os.openpty()
+        self.port = serial.Serial(os.ttyname(self.slave), timeout=0)
+
+    def tearDown(self):
+        self.port.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def test_dispatch(self):
+        io_reactor = IOReactor()
+        received = bytearray()
+        io_reactor.register(self.port, lambda: received.extend(self.port.read(self.port.in_waiting)))
+        os.write(self.master, b"data\n")
+        for _ in range(100):
+            if received:
+                break
+            time.sleep(0.01)
+        self.assertEqual(bytes(received), b"data\n")
+        io_reactor.unregister(self.port)
+        self.assertFalse(io_reactor.is_registered(self.port))
+        os.write(self.master, b"more\n")
+        time.sleep(0.05)
+        self.assertEqual(bytes(received), b"data\n")
+
+    def test_read_response(self):
+        transmitter = TransmitterInterface()
+        transmitter.get_port = lambda: self.port
+        reactor.register(self.port, transmitter.handle_input)
+        os.write(self.master, b"OK\r\n")
+        self.assertEqual(transmitter.read_response(), b"OK")
+        reactor.unregister(self.port)
+
+    def test_unread_responses(self):
+        transmitter = TransmitterInterface()
+        transmitter.get_port = lambda: self.port
+        for i in range(transmitter.RESPONSE_QUEUE_LENGTH + 5):
+            transmitter.queue_response(str(i).encode())
+        self.assertEqual(transmitter.responses.qsize(), transmitter.RESPONSE_QUEUE_LENGTH)
+        self.assertEqual(transmitter.responses.get_nowait(), b"5")
+        # Responses that were not read before the next command are discarded
+        transmitter.write_command(b"command\n")
+        self.assertTrue(transmitter.responses.empty())
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), "Pseudo terminals are not available.")
+class TestReceiverTimestamps(unittest.TestCase):
+    def setUp(self):
+        self.master, self.slave = os.openpty()
+        self.port = serial.Serial(os.ttyname(self.slave), timeout=0)
+
+    def tearDown(self):
+        self.port.close()
+        os.close(self.master)
+        os.close(self.slave)
+
+    def read_blocks(self, receiver, blocks):
+        receiver.get_port = lambda: self.port
+        receiver.setup()
+        for block in blocks:
+            os.write(self.master, block)
+            time.sleep(0.05)
+            receiver.listen_step()
+        return receiver.buffer.drain()[0]
+
+    def test_pocketloc(self):
+        # The receiver is not initialized with a device, it reads the blocks from the pseudo terminal
+        receiver = PocketLoCReceiver.__new__(PocketLoCReceiver)
+        ReceiverInterface.__init__(receiver)
+        receiver.num_sensors = 12
+        receiver.framer = DelimiterFramer(FRAME_TERMINATOR)
+        receiver.saturation_error = False
+        # A sample period that is too long back-dates the second block before the first one
+        receiver.sample_period = 1.0
+        frame = (",".join(["1"] * 14) + "\r\n").encode()
+        timestamps = self.read_blocks(receiver, [5 * frame, 5 * frame])
+        self.assertEqual(len(timestamps), 10)
+        self.assertTrue(np.all(np.diff(timestamps) > 0))
+
+    def test_ldc1614(self):
+        receiver = LDC1614EVMReceiver.__new__(LDC1614EVMReceiver)
+        ReceiverInterface.__init__(receiver)
+        receiver.num_sensors = 4
+        receiver.active_channels = 4
+        receiver.framer = create_stream_framer()
+        receiver.sample_period = 1.0
+        frame = STREAM_FRAME_HEADER + bytes(STREAM_FRAME_LENGTH - len(STREAM_FRAME_HEADER))
+        timestamps = self.read_blocks(receiver, [3 * frame, 3 * frame])
+        self.assertEqual(len(timestamps), 6)
+        self.assertTrue(np.all(np.diff(timestamps) > 0))
+
+
+class TestDecoderRange(unittest.TestCase):
+    def test_range(self):
+        decoder = ExampleDecoder(None, None)
+        self.assertEqual(decoder.index_of(0, 1.0), 0)
+        for i in range(10):
+            decoder.append(0, float(i), (i,))
+        self.assertEqual(decoder.index_of(0, 4.5), 5)
+        self.assertEqual(decoder.index_of(0, 20.0), 10)
+        timestamps, values = decoder.get_range(0, 2.0, 5.0)
+        self.assertTrue(np.array_equal(timestamps, [3.0, 4.0, 5.0]))
+        self.assertTrue(np.array_equal(values[:, 0], [3, 4, 5]))
+
+    def test_range_boundaries(self):
+        # The start is exclusive and the end inclusive, so adjacent intervals do not share measurements
+        decoder = ExampleDecoder(None, None)
+        for i in range(10):
+            decoder.append(0, float(i), (i,))
+        self.assertEqual(decoder.index_of(0, 3.0), 4)
+        first, _ = decoder.get_range(0, 0.0, 3.0)
+        second, _ = decoder.get_range(0, 3.0, 6.0)
+        self.assertTrue(np.array_equal(first, [1.0, 2.0, 3.0]))
+        self.assertTrue(np.array_equal(second, [4.0, 5.0, 6.0]))
+        # SampleStore.get_range includes both ends
+        timestamps, values = decoder.stores[0].get_range(3.0, 6.0)
+        self.assertTrue(np.array_equal(timestamps, [3.0, 4.0, 5.0, 6.0]))
+
+
+class TestAD7746SymbolSync(unittest.TestCase):
+    PARAMETERS = {'port': "", 'conversion time': '11.0ms', 'excitation level': 'Vdd/2', 'active channel': '2',
+                  'differential mode': False, 'detection threshold factor': 5.0, 'symbol duration [s]': 1}
+
+    def transmission(self):
+        # 3 sync symbols and two characters, symbols with value 1 are dips in the middle of their interval
+        symbols = [1, 1, 1] + [int(bit) for character in "Az" for bit in format(ord(character), '08b')]
+        timestamps = np.arange(0, len(symbols) + 4.2, 0.01)
+        values = 5000000 + np.random.default_rng(0).integers(-100, 100, len(timestamps))
+        for i in range(len(symbols)):
+            values[np.abs(timestamps - (3.5 + i)) < 0.1] -= symbols[i] * 100000
+        return timestamps, values
+
+    def decode(self, step, timestamps=None, values=None):
+        if timestamps is None:
+            timestamps, values = self.transmission()
+        decoder = AD7746Decoder(None, self.PARAMETERS)
+        for start in range(0, len(timestamps), step):
+            decoder.append_batch(0, timestamps[start:start + step], values[start:start + step, None])
+            decoder.update_statistics()
+            decoder.calculate_symbol_intervals()
+            decoder.calculate_symbol_values()
+            decoder.calculate_sequence()
+        return decoder
+
+    def test_catch_up(self):
+        streamed = self.decode(5)
+        self.assertEqual(streamed.sequence, "Az")
+        # A single step with all samples decodes all pending symbols at once
+        stalled = self.decode(100000)
+        self.assertEqual(stalled.sequence, "Az")
+        self.assertEqual(stalled.symbol_values, streamed.symbol_values)
+        # Statistics and the detection threshold are physical values (pF), not raw conversion results
+        minimum, maximum = streamed.get_reference_range()
+        self.assertAlmostEqual(maximum, (5000000 - 8388608) * 4096 / 8388607, delta=0.1)
+        self.assertLess(abs(streamed.abs_detection_threshold - minimum), 1.0)
+
+    def test_next_dip(self):
+        # The minimum after the first threshold pass is at the start of the dip of the second symbol
+        timestamps, values = self.transmission()
+        values[(timestamps > 4.25) & (timestamps < 4.45)] -= 200000
+        decoder = self.decode(100000, timestamps, values)
+        self.assertLess(abs(decoder.first_symbol_edge - 3.0), 0.1)
+
+
+class TestSequenceCodec(unittest.TestCase):
+    def test_example_encoder(self):
+        symbol_values = ExampleEncoder(None, {'Sleep time [s]': 0.1}).encode("Hello")
+        codec = SequenceCodec(7, symbol_stride=2, symbol_offset=1)
+        sequence = ""
+        for end in range(len(symbol_values) + 1):
+            sequence += codec.decode(symbol_values, len(sequence), end)
+        self.assertEqual(sequence, "Hello")
+
+    def test_gray(self):
+        codec = SequenceCodec(8, bits_per_symbol=2, gray=True, sync_symbols=1)
+        # 'A' = 01 00 00 01, Gray codes of 0, 1, 2, 3 are 0, 1, 3, 2
+        self.assertEqual(codec.decode([3, 1, 0, 0, 1, 1], 0), "A")
+        self.assertEqual(codec.decode([3, 1, 0, 0, 1, 2, 2, 2, 2], 0), "A\xff")
+
+
+class TestExampleDecoder(unittest.TestCase):
+    def test_loopback(self):
+        # The transmitter is idle (0) before the transmission
+        symbol_values = [0] + ExampleEncoder(None, {'Sleep time [s]': 0.1}).encode("Hi")
+        decoder = ExampleDecoder(None, None)
+        for i in range(len(symbol_values)):
+            for j in range(3):
+                decoder.append(0, 0.3 * i + 0.1 * j, (symbol_values[i],))
+            decoder.calculate_symbol_intervals()
+            decoder.calculate_symbol_values()
+            decoder.calculate_sequence()
+        self.assertEqual(len(decoder.symbol_intervals), len(symbol_values) - 1)
+        self.assertEqual(decoder.sequence, "Hi")
+
+
+class TestExampleDecoder2(unittest.TestCase):
+    def test_resampled_mean(self):
+        decoder = ExampleDecoder2(None, None)
+        self.assertEqual(len(set(map(id, decoder.receivers))), 3)
+        timestamps = np.arange(0.0, 2.0, 0.1)
+        for start in range(0, 20, 5):
+            for r in range(3):
+                decoder.append_batch(r, timestamps[start:start + 5], np.tile([r, r + 10.0], (5, 1)))
+            decoder.update_resampled()
+            decoder.calculate_additional_datalines()
+        dataline = decoder.additional_datalines[0]
+        self.assertIsNotNone(dataline)
+        # Every resampled row gets its mean once
+        self.assertEqual(dataline['length'], decoder.resampler.store.length)
+        self.assertTrue(np.all(np.diff(dataline['timestamps']) > 0))
+        self.assertTrue(np.allclose(dataline['values'], 6.0))
+        decoder.clear()
+        self.assertEqual(decoder.mean.length, 0)
+
+
+class TestDecoderSnapshot(unittest.TestCase):
+    def test_changes_since(self):
+        decoder = ExampleDecoder(None, None)
+        for i in range(5):
+            decoder.append(0, float(i), (i,))
+        decoder.publish()
+        changes = decoder.get_changes_since(0)
+        self.assertTrue(changes['reset'])
+        self.assertEqual(len(changes['received']['timestamps'][0]), 5)
+        decoder.append(0, 5.0, (5,))
+        decoder.publish()
+        changes = decoder.get_changes_since(changes['version'])
+        self.assertFalse(changes['reset'])
+        self.assertEqual(changes['received']['starts'], [5])
+        self.assertTrue(np.array_equal(changes['received']['timestamps'][0], [5.0]))
+        self.assertFalse(changes['snapshot']['received']['values'][0].flags.writeable)
+
+
+class TestDecodeWorker(unittest.TestCase):
+    def test_data_event(self):
+        decoder = ExampleDecoder(None, None)
+        worker = DecodeWorker(decoder, 0.01)
+        worker.start()
+        for i in range(5):
+            decoder.append(0, float(i), (i,))
+        decoder.data_event.set()
+        for _ in range(100):
+            if worker.latency is not None:
+                break
+            time.sleep(0.01)
+        worker.stop()
+        self.assertIsNone(worker.thread)
+        self.assertEqual(worker.latency_statistics.count[0], 1)
+        self.assertFalse(decoder.data_event.is_set())
+
+    def test_clear(self):
+        decoder = ExampleDecoder(None, None)
+        worker = DecodeWorker(decoder, 0.01)
+        worker.start()
+        decoder.append(0, 0.0, (1,))
+        worker.clear()
+        self.assertTrue(worker.clear_done.is_set())
+        self.assertEqual(decoder.stores[0].length, 0)
+        worker.stop()
+
+
+class TestAggregates(unittest.TestCase):
+    def test_update(self):
+        aggregates = Aggregates(1, [1, 10])
+        timestamps = np.arange(0.0, 30.0, 0.1)
+        values = np.sin(timestamps).reshape((-1, 1))
+        for start in range(0, 300, 7):
+            aggregates.update(timestamps[start:start + 7], values[start:start + 7])
+        centers, minimum, maximum, mean = aggregates.get_range(0.0, 30.0, 50)
+        self.assertEqual(len(centers), 30)
+        self.assertEqual(maximum[5, 0], np.max(values[(timestamps >= 5) & (timestamps < 6)]))
+        centers, minimum, maximum, mean = aggregates.get_range(0.0, 30.0, 10)
+        self.assertTrue(np.array_equal(centers, [5.0, 15.0, 25.0]))
+        self.assertAlmostEqual(mean[0, 0], np.mean(values[:100]))
+
+    def test_open_bucket(self):
+        aggregates = Aggregates(1, [1])
+        aggregates.update([0.1, 0.2], [[1.0], [3.0]])
+        centers, minimum, maximum, mean = aggregates.get_range(0.0, 1.0, 10)
+        rows = aggregates.tables[0].open_bucket[1]
+        aggregates.update([0.3, 1.5], [[5.0], [7.0]])
+        # Rows that have been read are not changed by later updates
+        self.assertTrue(np.array_equal(rows, [2, 4.0, 1.0, 3.0]))
+        self.assertEqual(mean[0, 0], 2.0)
+        centers, minimum, maximum, mean = aggregates.get_range(0.0, 2.0, 10)
+        self.assertTrue(np.array_equal(centers, [0.5, 1.5]))
+        self.assertTrue(np.array_equal(mean[:, 0], [3.0, 7.0]))
+        self.assertEqual(aggregates.tables[0].store.length, 1)
+
+
+class TestResampler(unittest.TestCase):
+    def test_incremental(self):
+        first, second = SampleStore(4, 1), SampleStore(4, 2)
+        first.extend(np.arange(0.0, 10.0), np.arange(10.0))
+        second.extend(np.arange(0.5, 5.0), np.ones((5, 2)))
+        resampler = Resampler(2, [1, 2])
+        self.assertEqual(resampler.update([first, second]), 9)
+        second.extend(np.arange(5.5, 10.0), np.ones((5, 2)))
+        self.assertEqual(resampler.update([first, second]), 9)
+        timestamps, values = resampler.store.get_range()
+        self.assertTrue(np.array_equal(timestamps, np.arange(0.5, 9.1, 0.5)))
+        self.assertTrue(np.allclose(values[:, 0], timestamps))
+        self.assertEqual(values.shape, (18, 3))
+        hold = Resampler(2, [1, 2], 'hold')
+        hold.update([first, second])
+        self.assertTrue(np.array_equal(hold.store.get_values(0)[:3], [0.0, 1.0, 1.0]))
+
+    def test_rolling_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SampleStore(4, 1)
+            resampler = Resampler(1, [1], store=RollingSampleStore(directory, "resampled", 5))
+            for start in range(0, 100, 10):
+                store.extend(np.arange(start, start + 10.0), np.arange(start, start + 10.0))
+                resampler.update([store])
+            self.assertLessEqual(resampler.store.capacity, 10)
+            timestamps, values = resampler.store.get_range(0, None)
+            self.assertTrue(np.array_equal(values[:, 0], np.arange(100.0)))
+
+
+class TestStreamingFilter(unittest.TestCase):
+    def test_matches_full_filter(self):
+        values = np.random.rand(300, 2)
+        store = SampleStore(16, 2)
+        gaussian_filter = StreamingGaussianFilter(3.0, 2, initial_capacity=16)
+        previous = []
+        for start in range(0, 300, 7):
+            store.extend(np.arange(start, min(start + 7, 300)), values[start:start + 7])
+            timestamps, filtered, settled = gaussian_filter.update(store)
+            full = scipy.ndimage.gaussian_filter1d(values[:store.length], 3.0, axis=0)
+            self.assertTrue(np.array_equal(filtered[:settled], full[:settled]))
+            # Returned values are never changed afterwards
+            for previous_filtered, previous_settled, values_copy in previous:
+                self.assertTrue(np.array_equal(previous_filtered[:previous_settled], values_copy))
+            previous.append((filtered, settled, filtered[:settled].copy()))
+        self.assertEqual(settled, 300 - gaussian_filter.radius)
+
+
+class TestFilterStages(unittest.TestCase):
+    def test_chunks(self):
+        timestamps, values = np.arange(200.0), np.random.rand(200, 2)
+        pipeline = Pipeline([MovingMedian(4), MovingAverage(3), butterworth(5.0, 100.0), Decimation(3)])
+        whole = pipeline.process(timestamps, values)
+        pipeline.reset()
+        chunks = [pipeline.process(timestamps[start:start + 7], values[start:start + 7]) for start in range(0, 200, 7)]
+        self.assertTrue(np.array_equal(np.concatenate([chunk[0] for chunk in chunks]), whole[0]))
+        self.assertTrue(np.allclose(np.concatenate([chunk[1] for chunk in chunks]), whole[1]))
+        self.assertEqual(len(whole[0]), 67)
+
+    def test_decoder(self):
+        decoder = ExampleDecoder(None, None)
+        decoder.pre_processing_stages = [[MovingAverage(2)]]
+        decoder.create_pipelines()
+        for i in range(4):
+            decoder.append(0, float(i), (i,))
+            decoder.pre_processing()
+        timestamps, values = decoder.get_processed(0)
+        self.assertTrue(np.array_equal(values[:, 0], [0, 0.5, 1.5, 2.5]))
+        decoder.clear()
+        self.assertEqual(len(decoder.get_processed(0)[0]), 0)
+
+
+class TestRunningStatistics(unittest.TestCase):
+    def test_update(self):
+        values = np.random.rand(100, 2)
+        values[10, 1] = np.nan
+        statistics = RunningStatistics(2)
+        window = RunningStatistics(2, window=45)
+        reference = RunningStatistics(2, duration=9)
+        for block in range(10):
+            timestamps = np.arange(block * 10, (block + 1) * 10, dtype=float)
+            for s in (statistics, window, reference):
+                s.update(timestamps, values[block * 10:(block + 1) * 10])
+        self.assertTrue(np.array_equal(statistics.count, [100, 99]))
+        self.assertTrue(np.allclose(statistics.mean, np.nanmean(values, axis=0)))
+        self.assertTrue(np.allclose(statistics.variance, np.nanvar(values, axis=0)))
+        self.assertTrue(np.array_equal(statistics.maximum, np.nanmax(values, axis=0)))
+        self.assertTrue(np.allclose(window.mean, np.mean(values[50:], axis=0)))
+        self.assertTrue(np.array_equal(window.minimum, np.min(values[50:], axis=0)))
+        self.assertTrue(np.array_equal(reference.count, [10, 10]))
+
+    def test_window(self):
+        # The window statistics match the statistics of the blocks in the window after every update
+        values = np.random.rand(500, 2)
+        window = RunningStatistics(2, window=20)
+        for block in range(100):
+            timestamps = np.arange(block * 5, (block + 1) * 5, dtype=float)
+            window.update(timestamps, values[block * 5:(block + 1) * 5])
+            expected = values[max(0, block * 5 - 20):(block + 1) * 5]
+            self.assertTrue(np.array_equal(window.count, [len(expected)] * 2))
+            self.assertTrue(np.allclose(window.mean, np.mean(expected, axis=0)))
+            self.assertTrue(np.allclose(window.variance, np.var(expected, axis=0)))
+            self.assertTrue(np.array_equal(window.minimum, np.min(expected, axis=0)))
+            self.assertTrue(np.array_equal(window.maximum, np.max(expected, axis=0)))
+
+
+class TestLineParser(unittest.TestCase):
+    def test_parse(self):
+        parser = LineParser(2)
+        values, invalid = parser.parse(b"1, 10\r\n2, 20\r\nfoo\r\n3, x\r\n")
+        self.assertTrue(np.array_equal(values, [[1, 10], [2, 20]]))
+        self.assertEqual(len(invalid), 2)
+
+    def test_pocketloc_frames(self):
+        lines = [",".join(str(100 * i + j) for j in range(14)) + "\r\n" for i in range(3)]
+        stream = "".join(lines).encode()
+        framer = DelimiterFramer(FRAME_TERMINATOR)
+        # The last frame arrives in two parts
+        blocks = [framer.feed(stream[:-20]), framer.feed(stream[-20:])]
+        values = np.concatenate([parse_frames(block)[0] for block in blocks])
+        # Values of the former line by line parsing
+        expected = []
+        for line in lines:
+            items = [float(x) for x in line.split(",")[0:14]]
+            expected.append(items[0:6] + items[7:13])
+        self.assertEqual(len(parse_frames(blocks[0])[0]), 2)
+        self.assertTrue(np.array_equal(values[:, VALUE_COLUMNS], expected))
+        values, invalid = parse_frames(b"1,2\r\n" + stream[:len(lines[0])])
+        self.assertEqual((len(values), invalid), (1, 1))
+
+    def test_ldc1614_frames(self):
+        rng = np.random.default_rng(0)
+        frames = rng.integers(0, 256, (3, STREAM_FRAME_LENGTH), dtype=np.uint8)
+        frames[:, :len(STREAM_FRAME_HEADER)] = list(STREAM_FRAME_HEADER)
+        stream = frames.tobytes()
+        # The receiver is not connected, only the decoding of the frames is used
+        receiver = LDC1614EVMReceiver.__new__(LDC1614EVMReceiver)
+        receiver.active_channels = 0
+        framer = create_stream_framer()
+        # The last frame arrives in two parts
+        blocks = [framer.feed(stream[:-10]), framer.feed(stream[-10:])]
+        conversions = np.concatenate([receiver.read_stream_frames(block) for block in blocks])
+        # Conversion results of the former frame by frame decoding
+        expected = []
+        for start in range(0, len(stream), STREAM_FRAME_LENGTH):
+            raw = stream[start:start + STREAM_FRAME_LENGTH]
+            row = []
+            for position in range(7, 23, 4):
+                msb = (raw[position] << 8) + raw[position + 1]
+                lsb = (raw[position + 2] << 8) + raw[position + 3]
+                row.append(((msb & 0b0000111111111111) << 16) + lsb)
+            expected.append(row)
+        self.assertEqual(len(blocks[0]), 2 * STREAM_FRAME_LENGTH)
+        self.assertTrue(np.array_equal(conversions, expected))
+
+
+class TestStreamFramer(unittest.TestCase):
+    def test_partial_frames(self):
+        framer = FixedLengthFramer(4)
+        self.assertEqual(framer.feed(b"abcdef"), b"abcd")
+        self.assertEqual(framer.feed(b"gh"), b"efgh")
+        framer = DelimiterFramer(b"\r\n")
+        self.assertEqual(framer.feed(b"1\r\n2\r"), b"1\r\n")
+        self.assertEqual(framer.feed(b"\n"), b"2\r\n")
+
+    def test_resync(self):
+        framer = HeaderCRCFramer(b"\xaa", 2, lambda data: sum(data) % 256, 1)
+        frame = b"\xaa\x01\x02" + bytes([(0xaa + 3) % 256])
+        corrupted = b"\xaa\x01\x03" + bytes([(0xaa + 3) % 256])
+        self.assertEqual(framer.feed(b"\x00" + corrupted + frame + frame[:2]), frame)
+        self.assertEqual(framer.feed(frame[2:]), frame)
+        self.assertEqual(framer.invalid_frames, 1)
+
+    def test_ldc1614_resync(self):
+        frames = np.zeros((3, STREAM_FRAME_LENGTH), dtype=np.uint8)
+        frames[:, :len(STREAM_FRAME_HEADER)] = list(STREAM_FRAME_HEADER)
+        frames[:, 7] = [1, 2, 3]
+        framer = create_stream_framer()
+        # An additional byte after the first frame and a corrupted header of the second frame
+        corrupted = frames[1].copy()
+        corrupted[0] = 0
+        stream = frames[0].tobytes() + b"\x4c" + corrupted.tobytes() + frames[2].tobytes()
+        self.assertEqual(framer.feed(stream[:40]), frames[0].tobytes())
+        self.assertEqual(framer.feed(stream[40:]), frames[2].tobytes())
+        self.assertEqual(framer.dropped_bytes, 1 + STREAM_FRAME_LENGTH)
+
+
 if __name__ == '__main__':
     if len(sys.argv) == 3:
         file = sys.argv.pop()
@@ -0,0 +1,131 @@
+import numpy as np
+
+from Utils.SampleStore import SampleStore
+
+"""
+This module implements tables of aggregated measurements (minimum, maximum and mean per time bucket) of a receiver,
+which are used to show long sessions without processing every single measurement.
+"""
+
+# Bucket lengths of the aggregate levels (s), from fine to coarse
+AGGREGATE_LEVELS = [1, 10, 60]
+
+
+class AggregateTable:
+    """
+    Count, sum, minimum and maximum of every sensor per time bucket of a fixed length.
+    Buckets start at multiples of the bucket length, measurements are expected to be appended in order of time. The
+    rows are kept in a SampleStore (timestamps are the bucket starts) with the columns count, sum, minimum and maximum
+    of every sensor. The last bucket may still receive measurements, it is kept outside the store in open_bucket until
+    a later bucket starts. Rows are never changed once they are visible, so the table can be read by another thread
+    while it is updated: open_bucket is replaced instead of updated and closed buckets are appended to the store first.
+    """
+    def __init__(self, bucket_length, num_sensors, initial_capacity=1000):
+        """
+        Initializes the table.
+        :param bucket_length: Length of a bucket (s).
+        :param num_sensors: Number of sensors.
+        :param initial_capacity: Initial number of buckets of the store.
+        """
+        self.bucket_length = bucket_length
+        self.num_sensors = num_sensors
+
+        # Bucket index and row of the last bucket, replaced as a whole
+        self.open_bucket = None
+        self.store = SampleStore(initial_capacity, 4 * num_sensors)
+
+    def get_range(self, start_time, end_time):
+        """
+        Gets the aggregates of the buckets that overlap a time range.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :return: Bucket centers, dimensions (buckets), and minimum, maximum and mean, dimensions (buckets, sensors),
+                 NaN for sensors without measurements in a bucket.
+        """
+        # The open bucket is read first, it is dropped if it has been closed and appended to the store in the meantime
+        open_bucket = self.open_bucket
+        starts, rows = self.store.get_range(start_time - self.bucket_length, end_time)
+        if open_bucket is not None:
+            bucket, row = open_bucket
+            start = bucket * self.bucket_length
+            if start_time - self.bucket_length <= start <= end_time and (len(starts) == 0 or starts[-1] < start):
+                starts = np.append(starts, start)
+                rows = np.vstack((rows, row))
+        n = self.num_sensors
+        count = rows[:, :n]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(count > 0, rows[:, n:2 * n] / count, np.nan)
+        minimum = np.where(count > 0, rows[:, 2 * n:3 * n], np.nan)
+        maximum = np.where(count > 0, rows[:, 3 * n:], np.nan)
+        return starts + self.bucket_length / 2, minimum, maximum, mean
+
+    def update(self, timestamps, values):
+        """
+        Includes new measurements, the cost only depends on the number of new measurements.
+        :param timestamps: Timestamps of the measurements (sorted), dimensions (time).
+        :param values: Physical values, dimensions (time, sensors), NaN values are ignored.
+        """
+        if len(timestamps) == 0:
+            return
+        buckets = np.floor(np.asarray(timestamps) / self.bucket_length).astype(np.int64)
+        # Start of every run of measurements in the same bucket
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        valid = ~np.isnan(values)
+        rows = np.hstack((np.add.reduceat(valid, starts, axis=0),
+                          np.add.reduceat(np.where(valid, values, 0), starts, axis=0),
+                          np.minimum.reduceat(np.where(valid, values, np.inf), starts, axis=0),
+                          np.maximum.reduceat(np.where(valid, values, -np.inf), starts, axis=0)))
+        buckets = buckets[starts]
+
+        open_bucket = self.open_bucket
+        if open_bucket is not None:
+            bucket, row = open_bucket
+            if buckets[0] == bucket:
+                # The first run continues the open bucket, the merged row is a new row
+                n = self.num_sensors
+                rows[0, :2 * n] += row[:2 * n]
+                rows[0, 2 * n:3 * n] = np.minimum(rows[0, 2 * n:3 * n], row[2 * n:3 * n])
+                rows[0, 3 * n:] = np.maximum(rows[0, 3 * n:], row[3 * n:])
+            else:
+                rows = np.vstack((row, rows))
+                buckets = np.concatenate(([bucket], buckets))
+        # All but the last bucket are closed
+        if len(buckets) > 1:
+            self.store.extend(buckets[:-1] * self.bucket_length, rows[:-1])
+        self.open_bucket = (buckets[-1], rows[-1])
+
+
+class Aggregates:
+    """
+    Aggregate tables of a receiver for all aggregate levels.
+    """
+    def __init__(self, num_sensors, levels=None):
+        """
+        Initializes the tables.
+        :param num_sensors: Number of sensors.
+        :param levels: Bucket lengths (s) from fine to coarse, AGGREGATE_LEVELS if None.
+        """
+        self.tables = [AggregateTable(level, num_sensors) for level in (AGGREGATE_LEVELS if levels is None else levels)]
+
+    def get_range(self, start_time, end_time, max_buckets):
+        """
+        Gets the aggregates of the finest level that has at most max_buckets buckets in a time range (or the coarsest
+        level). The cost depends on the number of returned buckets, not on the number of measurements.
+        :param start_time: Start of the time range.
+        :param end_time: End of the time range.
+        :param max_buckets: Maximum number of buckets.
+        :return: Bucket centers, minimum, maximum and mean, see AggregateTable.get_range.
+        """
+        for table in self.tables:
+            if (end_time - start_time) / table.bucket_length <= max_buckets:
+                break
+        return table.get_range(start_time, end_time)
+
+    def update(self, timestamps, values):
+        """
+        Includes new measurements in all tables.
+        :param timestamps: Timestamps of the measurements (sorted), dimensions (time).
+        :param values: Physical values, dimensions (time, sensors), NaN values are ignored.
+        """
+        for table in self.tables:
+            table.update(timestamps, values)
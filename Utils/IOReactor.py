@@ -0,0 +1,163 @@
+import selectors
+import threading
+import time
+
+from Utils import Logging
+
+"""
+This module implements a single I/O thread that serves the serial ports of all receivers and transmitters.
+"""
+
+
+class Registration:
+    """
+    A serial port registered in the reactor together with the handler that reads from it.
+    """
+    def __init__(self, port, handler):
+        self.port = port
+        self.handler = handler
+        # Bytes left on the port after the last call of the handler, e.g. an incomplete frame
+        self.waiting = 0
+        self.parked = False
+        try:
+            self.fileno = port.fileno()
+        except (AttributeError, OSError, ValueError):
+            self.fileno = None
+
+
+class IOReactor:
+    """
+    Waits for incoming bytes on all registered serial ports in one thread and calls the handler of a port when bytes
+    arrive. The handler is expected to read the bytes from the port.
+    Ports with a file descriptor are multiplexed with selectors. Ports without one (e.g., on Windows) and ports whose
+    handler left an incomplete frame on the port are polled via in_waiting every poll_interval.
+    """
+    def __init__(self, poll_interval=0.001, timeout=0.1):
+        """
+        Initializes the reactor, the thread is started when the first port is registered.
+        :param poll_interval: Time in seconds between two checks of polled ports.
+        :param timeout: Maximum time in seconds to wait for bytes before registrations are updated.
+        """
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.registrations = {}
+        self.selector = selectors.DefaultSelector()
+        self.thread = None
+
+    def register(self, port, handler):
+        """
+        Registers a serial port.
+        :param port: Serial port.
+        :param handler: Function without arguments that is called in the reactor thread when bytes are waiting.
+        """
+        with self.lock:
+            self.pending.append((port, handler, None))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def unregister(self, port, wait=True):
+        """
+        Unregisters a serial port.
+        :param port: Serial port.
+        :param wait: Whether to wait until the handler is not called anymore, e.g., before the port is closed.
+        """
+        done = threading.Event()
+        with self.lock:
+            self.pending.append((port, None, done))
+            running = self.thread is not None and self.thread is not threading.current_thread()
+        if wait and running:
+            done.wait(2 * self.timeout)
+
+    def is_registered(self, port):
+        """
+        Checks whether a serial port is registered (or about to be registered).
+        :param port: Serial port.
+        :return: Whether the port is registered.
+        """
+        with self.lock:
+            pending = [handler for pending_port, handler, done in self.pending if pending_port is port]
+            if pending:
+                return pending[-1] is not None
+            return id(port) in self.registrations
+
+    def update_registrations(self):
+        """
+        Applies registrations and unregistrations requested by other threads.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+        for port, handler, done in pending:
+            registration = self.registrations.pop(id(port), None)
+            if registration is not None and registration.fileno is not None and not registration.parked:
+                self.selector.unregister(registration.fileno)
+            if done is not None:
+                done.set()
+            if handler is not None:
+                registration = Registration(port, handler)
+                self.registrations[id(port)] = registration
+                if registration.fileno is not None:
+                    self.selector.register(registration.fileno, selectors.EVENT_READ, registration)
+                else:
+                    registration.parked = True
+
+    def dispatch(self, registration):
+        """
+        Calls the handler of a port and parks the port if the handler left bytes on it.
+        :param registration: Registration of the port.
+        """
+        try:
+            registration.handler()
+            registration.waiting = registration.port.in_waiting
+        except Exception as e:
+            Logging.warning("Error while reading from serial port: " + str(e), repeat=False)
+            self.unregister(registration.port, wait=False)
+            return
+
+        if registration.fileno is None:
+            return
+        # A selector would report the left bytes again immediately, so the port is polled until more bytes arrive
+        if registration.waiting > 0 and not registration.parked:
+            self.selector.unregister(registration.fileno)
+            registration.parked = True
+        elif registration.waiting == 0 and registration.parked:
+            self.selector.register(registration.fileno, selectors.EVENT_READ, registration)
+            registration.parked = False
+
+    def run(self):
+        """
+        Main loop of the reactor thread.
+        """
+        while True:
+            self.update_registrations()
+            parked = [registration for registration in self.registrations.values() if registration.parked]
+            timeout = self.poll_interval if parked else self.timeout
+
+            if self.selector.get_map():
+                try:
+                    ready = [key.data for key, events in self.selector.select(timeout)]
+                except (OSError, ValueError):
+                    # A port has been closed before it was unregistered
+                    for registration in list(self.registrations.values()):
+                        if not registration.port.is_open:
+                            self.unregister(registration.port, wait=False)
+                    ready = []
+            else:
+                time.sleep(timeout)
+                ready = []
+
+            for registration in parked:
+                try:
+                    if registration.port.in_waiting > registration.waiting:
+                        ready.append(registration)
+                except Exception:
+                    self.unregister(registration.port, wait=False)
+
+            for registration in ready:
+                self.dispatch(registration)
+
+
+reactor = IOReactor()
@@ -0,0 +1,55 @@
+import numpy as np
+
+"""
+This module implements parsing of line based serial protocols, e.g., "uc_time, raw_value\r\n".
+"""
+
+
+class LineParser:
+    """
+    Parses lines of integer fields.
+    All lines of a block are converted into one integer array at once. Use a DelimiterFramer to get blocks of complete
+    lines from a stream.
+    """
+    def __init__(self, num_fields, separator=b",", terminator=b"\n"):
+        """
+        Initializes the parser.
+        :param num_fields: Number of fields of a valid line.
+        :param separator: Separator between the fields, surrounding whitespace is ignored.
+        :param terminator: End of a line, surrounding whitespace (e.g., "\r") is ignored.
+        """
+        self.num_fields = num_fields
+        self.separator = separator
+        self.terminator = terminator
+
+    def parse(self, data):
+        """
+        Parses all lines.
+        :param data: Block of complete lines.
+        :return: Fields of the valid lines, dimensions (lines, num_fields), and the invalid lines.
+        """
+        lines = data.split(self.terminator)
+
+        fields = []
+        invalid = []
+        for line in lines:
+            if not line.strip():
+                continue
+            line_fields = line.split(self.separator)
+            if len(line_fields) == self.num_fields:
+                fields.append(line_fields)
+            else:
+                invalid.append(bytes(line))
+
+        try:
+            values = np.array(fields, dtype=np.int64).reshape((-1, self.num_fields))
+        except ValueError:
+            # At least one line contains something else than integers, parse line by line to drop only these
+            rows = []
+            for line_fields in fields:
+                try:
+                    rows.append([int(x) for x in line_fields])
+                except ValueError:
+                    invalid.append(self.separator.join(line_fields))
+            values = np.array(rows, dtype=np.int64).reshape((-1, self.num_fields))
+        return values, invalid
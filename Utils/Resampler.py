@@ -0,0 +1,93 @@
+import numpy as np
+
+from Utils import Logging
+from Utils.SampleStore import SampleStore
+
+"""
+This module implements the alignment of the measurements of several receivers to a common time base.
+"""
+
+# Interpolation methods of the resampler
+RESAMPLING_METHODS = ['linear', 'hold']
+
+
+class Resampler:
+    """
+    Resamples the measurements of several receivers incrementally to a common time base with a fixed rate.
+    The time base starts at the first time all receivers have measurements, its samples are start_time + k / rate.
+    On every update, only the samples between the last resampled time and the latest time that all receivers have
+    measurements for are calculated, from the measurements around this interval.
+    The resampled values of all sensors of all receivers are stored as one (time, sensors) matrix in a SampleStore,
+    the columns are ordered by receiver and then by sensor.
+    """
+    def __init__(self, rate, num_sensors, method='linear', initial_capacity=10000, store=None):
+        """
+        Initializes the resampler.
+        :param rate: Rate of the common time base (Hz).
+        :param num_sensors: Number of sensors of every receiver.
+        :param method: Interpolation method, 'linear' or 'hold' (last measurement before the sample time).
+        :param initial_capacity: Initial capacity of the store of the resampled values.
+        :param store: Empty store of the resampled values (e.g., a RollingSampleStore), None for a SampleStore with
+                      initial_capacity.
+        """
+        if method not in RESAMPLING_METHODS:
+            Logging.error(f"Unknown resampling method {method}, using linear interpolation.")
+            method = 'linear'
+        self.rate = rate
+        self.num_sensors = list(num_sensors)
+        self.method = method
+
+        self.next_index = 0
+        self.start_time = None
+        self.store = SampleStore(initial_capacity, sum(self.num_sensors)) if store is None else store
+
+    def clear(self):
+        """
+        Removes all resampled values, the time base starts again with the next update.
+        """
+        self.next_index = 0
+        self.start_time = None
+        self.store.clear()
+
+    def interpolate(self, timestamps, values, times):
+        """
+        Interpolates the measurements of a single receiver at given times.
+        Times outside the measurements get the first or last measurement.
+        :param timestamps: Timestamps of the measurements, dimensions (time).
+        :param values: Physical values of the measurements, dimensions (time, sensors).
+        :param times: Times to interpolate at.
+        :return: Interpolated values, dimensions (times, sensors).
+        """
+        if self.method == 'hold':
+            indices = np.maximum(np.searchsorted(timestamps, times, side='right') - 1, 0)
+            return values[indices]
+        return np.column_stack([np.interp(times, timestamps, values[:, sensor_index])
+                                for sensor_index in range(values.shape[1])])
+
+    def update(self, stores):
+        """
+        Resamples the newly covered interval.
+        :param stores: Sample stores of the receivers, in the same order as num_sensors.
+        :return: Number of new samples of the time base.
+        """
+        published = [store.published for store in stores]
+        if any(length == 0 for timestamps, values, length, offset in published):
+            return 0
+        if self.start_time is None:
+            self.start_time = max(timestamps[0] for timestamps, values, length, offset in published)
+        end_time = min(timestamps[length - 1] for timestamps, values, length, offset in published)
+        stop_index = int(np.floor((end_time - self.start_time) * self.rate)) + 1
+        if stop_index <= self.next_index:
+            return 0
+
+        times = self.start_time + np.arange(self.next_index, stop_index) / self.rate
+        columns = []
+        for store, (timestamps, values, length, offset) in zip(stores, published):
+            timestamps = timestamps[:length]
+            # Only the measurements around the new interval are converted and interpolated
+            first = max(0, np.searchsorted(timestamps, times[0], side='right') - 1)
+            last = np.searchsorted(timestamps, times[-1], side='left') + 1
+            columns.append(self.interpolate(timestamps[first:last], store.to_physical(values[first:last]), times))
+        self.store.extend(times, np.hstack(columns))
+        self.next_index = stop_index
+        return len(times)
@@ -0,0 +1,118 @@
+import numpy as np
+
+from Utils.SampleStore import missing_value
+
+"""
+This module implements the buffer between the listen thread of a receiver and its decoder.
+"""
+
+
+class RingBuffer:
+    """
+    Preallocated single-producer/single-consumer ring buffer of timestamps and values.
+    The producer (listen thread) only modifies write_count and overflow_count, the consumer (decoder) only modifies
+    read_count. Samples are written before write_count is advanced, so the consumer never sees incomplete samples and
+    no lock is needed.
+    If the buffer is full, new samples are dropped and counted in overflow_count.
+    Values are kept in the storage dtype of the receiver (see SampleStore).
+    """
+    def __init__(self, capacity, num_sensors, dtype=float):
+        """
+        Initializes the ring buffer.
+        :param capacity: Maximum number of samples in the buffer.
+        :param num_sensors: Number of values per sample.
+        :param dtype: Storage dtype of the values.
+        """
+        self.capacity = int(capacity)
+        self.num_sensors = num_sensors
+        self.missing = missing_value(dtype)
+
+        self.timestamps = np.empty((self.capacity,))
+        self.values = np.empty((self.capacity, num_sensors), dtype=dtype)
+
+        # Total number of samples written/read since creation, the positions in the arrays are the counts modulo capacity
+        self.write_count = 0
+        self.read_count = 0
+        self.overflow_count = 0
+
+    @property
+    def available(self):
+        return self.write_count - self.read_count
+
+    def push(self, timestamp, values):
+        """
+        Appends a single sample (producer side).
+        Samples with fewer values than num_sensors are padded with missing values (NaN for floating point dtypes).
+        :param timestamp: Timestamp of the sample.
+        :param values: Values of the sample.
+        :return: Whether the sample was stored.
+        """
+        write_count = self.write_count
+        if write_count - self.read_count >= self.capacity:
+            self.overflow_count += 1
+            return False
+        index = write_count % self.capacity
+        self.timestamps[index] = timestamp
+        row = self.values[index]
+        row[:len(values)] = values
+        row[len(values):] = self.missing
+        self.write_count = write_count + 1
+        return True
+
+    def push_block(self, timestamps, values):
+        """
+        Appends a block of samples (producer side).
+        Samples that do not fit into the buffer are dropped.
+        :param timestamps: Timestamps of the samples, dimensions (time).
+        :param values: Values of the samples, dimensions (time, sensors).
+        :return: Number of stored samples.
+        """
+        write_count = self.write_count
+        count = min(len(timestamps), self.capacity - (write_count - self.read_count))
+        self.overflow_count += len(timestamps) - count
+        if count <= 0:
+            return 0
+        timestamps, values = np.asarray(timestamps), np.asarray(values).reshape((len(timestamps), -1))
+        indices = np.arange(write_count, write_count + count) % self.capacity
+        self.timestamps[indices] = timestamps[:count]
+        self.values[indices, :values.shape[1]] = values[:count]
+        self.values[indices, values.shape[1]:] = self.missing
+        self.write_count = write_count + count
+        return count
+
+    def pop(self):
+        """
+        Removes the oldest sample (consumer side).
+        :return: Timestamp and values of the sample, None if the buffer is empty.
+        """
+        read_count = self.read_count
+        if self.write_count == read_count:
+            return None
+        index = read_count % self.capacity
+        sample = self.timestamps[index], self.values[index].copy()
+        self.read_count = read_count + 1
+        return sample
+
+    def drain(self):
+        """
+        Removes all available samples (consumer side).
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
+        """
+        read_count, write_count = self.read_count, self.write_count
+        start, stop = read_count % self.capacity, write_count % self.capacity
+        if write_count == read_count:
+            timestamps, values = self.timestamps[:0].copy(), self.values[:0].copy()
+        elif start < stop:
+            timestamps, values = self.timestamps[start:stop].copy(), self.values[start:stop].copy()
+        else:
+            # Available samples wrap around the end of the arrays
+            timestamps = np.concatenate((self.timestamps[start:], self.timestamps[:stop]))
+            values = np.concatenate((self.values[start:], self.values[:stop]))
+        self.read_count = write_count
+        return timestamps, values
+
+    def clear(self):
+        """
+        Discards all available samples (consumer side).
+        """
+        self.read_count = self.write_count
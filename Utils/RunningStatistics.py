@@ -0,0 +1,166 @@
+import numpy as np
+
+"""
+This module implements statistics of the measurements of a receiver that are updated incrementally.
+"""
+
+
+def summarize(values):
+    """
+    Calculates the statistics of a block of measurements for every sensor, NaN values (missing sensors) are ignored.
+    :param values: Measurement values, dimensions (time, sensors).
+    :return: Count, mean, sum of squared deviations from the mean, minimum and maximum for every sensor.
+             Without values, mean is 0, minimum is inf and maximum is -inf.
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, np.where(valid, values, 0).sum(axis=0) / count, 0)
+    m2 = (np.where(valid, values - mean, 0) ** 2).sum(axis=0)
+    minimum = np.where(valid, values, np.inf).min(axis=0)
+    maximum = np.where(valid, values, -np.inf).max(axis=0)
+    return count, mean, m2, minimum, maximum
+
+
+def merge(counts, means, m2s, minima, maxima):
+    """
+    Combines the statistics of several blocks (parallel algorithm of Chan et al.).
+    :param counts: Counts of the blocks, dimensions (blocks, sensors).
+    :param means: Means of the blocks, dimensions (blocks, sensors).
+    :param m2s: Sums of squared deviations of the blocks, dimensions (blocks, sensors).
+    :param minima: Minima of the blocks, dimensions (blocks, sensors).
+    :param maxima: Maxima of the blocks, dimensions (blocks, sensors).
+    :return: Count, mean, sum of squared deviations, minimum and maximum of all blocks together.
+    """
+    count = counts.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(count > 0, (counts * means).sum(axis=0) / count, 0)
+    m2 = (m2s + counts * (means - mean) ** 2).sum(axis=0)
+    return count, mean, m2, minima.min(axis=0), maxima.max(axis=0)
+
+
+def combine(first, second):
+    """
+    Combines the statistics of two blocks, see merge.
+    :param first: Count, mean, sum of squared deviations, minimum and maximum of the first block.
+    :param second: Count, mean, sum of squared deviations, minimum and maximum of the second block.
+    :return: Count, mean, sum of squared deviations, minimum and maximum of both blocks together.
+    """
+    return merge(*[np.stack(pair) for pair in zip(first, second)])
+
+
+def empty(num_sensors):
+    """
+    :param num_sensors: Number of sensors.
+    :return: Statistics without measurements (see summarize).
+    """
+    return (np.zeros(num_sensors, dtype=int), np.zeros(num_sensors), np.zeros(num_sensors),
+            np.full(num_sensors, np.inf), np.full(num_sensors, -np.inf))
+
+
+class RunningStatistics:
+    """
+    Count, mean, variance, minimum and maximum of every sensor of a receiver, updated with every appended block of
+    measurements, so they can be queried without scanning the measurements again.
+    Without window and duration, all measurements are included. With a duration, only the measurements of the first
+    duration seconds are included (e.g., a reference period at the start of a transmission). With a window, only the
+    measurements of the last window seconds are included, measurements are removed in the blocks they were appended in.
+    """
+    def __init__(self, num_sensors, window=None, duration=None):
+        """
+        Initializes the statistics.
+        :param num_sensors: Number of sensors.
+        :param window: Length of the sliding window (s), None to include all measurements.
+        :param duration: Length of the period from the first measurement that is included (s), None for no limit.
+        """
+        self.num_sensors = num_sensors
+        self.window = window
+        self.duration = duration
+
+        # The blocks in the window are kept in two stacks, so every block is merged a constant number of times on
+        # average instead of merging all blocks of the window with every update: new blocks are pushed onto back, whose
+        # combined statistics are kept in back_totals, old blocks are popped from front, where every entry holds the
+        # combined statistics of the block and all newer blocks in front (the oldest block is the last entry)
+        self.back = []
+        self.back_totals = empty(num_sensors)
+        self.front = []
+        self.start_time = None
+        self.totals = empty(num_sensors)
+
+    @property
+    def count(self):
+        return self.totals[0]
+
+    @property
+    def maximum(self):
+        return np.where(self.count > 0, self.totals[4], np.nan)
+
+    @property
+    def mean(self):
+        return np.where(self.count > 0, self.totals[1], np.nan)
+
+    @property
+    def minimum(self):
+        return np.where(self.count > 0, self.totals[3], np.nan)
+
+    @property
+    def std(self):
+        return np.sqrt(self.variance)
+
+    @property
+    def variance(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 0, self.totals[2] / self.count, np.nan)
+
+    def get(self):
+        """
+        Gets a copy of the current statistics.
+        :return: Dictionary with count, mean, variance, minimum and maximum of every sensor.
+        """
+        return {
+            'count': self.count.copy(),
+            'mean': self.mean,
+            'variance': self.variance,
+            'minimum': self.minimum,
+            'maximum': self.maximum
+        }
+
+    def update(self, timestamps, values):
+        """
+        Includes a block of measurements.
+        :param timestamps: Timestamps of the measurements (sorted), dimensions (time).
+        :param values: Measurement values, dimensions (time, sensors), NaN values are ignored.
+        """
+        if len(timestamps) == 0:
+            return
+        if self.start_time is None:
+            self.start_time = timestamps[0]
+        if self.duration is not None:
+            stop = np.searchsorted(timestamps, self.start_time + self.duration, side='right')
+            timestamps, values = timestamps[:stop], values[:stop]
+            if len(timestamps) == 0:
+                return
+        if self.window is None:
+            self.totals = combine(self.totals, summarize(values))
+            return
+
+        # Measurements of the block that are already outside the window are not included at all
+        last_time = timestamps[-1]
+        start = np.searchsorted(timestamps, last_time - self.window, side='left')
+        block = summarize(values[start:])
+        self.back.append((last_time, block))
+        self.back_totals = combine(self.back_totals, block)
+        while True:
+            if not self.front:
+                # The blocks of back are moved to front from the newest to the oldest
+                totals = None
+                while self.back:
+                    time, block = self.back.pop()
+                    totals = block if totals is None else combine(block, totals)
+                    self.front.append((time, totals))
+                self.back_totals = empty(self.num_sensors)
+            # The new block always stays in the window, so the loop ends with at least one block in front
+            if self.front[-1][0] >= last_time - self.window:
+                break
+            self.front.pop()
+        self.totals = combine(self.front[-1][1], self.back_totals) if self.back else self.front[-1][1]
@@ -0,0 +1,497 @@
+import glob
+import json
+import numpy as np
+import os
+
+"""
+This module implements the storage for the measurement values of a single receiver.
+Values are stored in the storage dtype of the receiver, e.g., float32 or raw integer codes of an ADC. Physical values
+are calculated as value * scale + offset with to_physical when they are read.
+"""
+
+
+def missing_value(dtype):
+    """
+    Gets the value that marks missing sensor values in arrays of a given dtype.
+    :param dtype: Storage dtype.
+    :return: NaN for floating point dtypes, the smallest representable value for integer dtypes.
+    """
+    dtype = np.dtype(dtype)
+    return np.iinfo(dtype).min if dtype.kind in 'iu' else np.nan
+
+
+def to_physical(values, scale=None, offset=None):
+    """
+    Converts stored values into physical values (float64), missing values of integer dtypes become NaN.
+    :param values: Stored values, dimensions (time, sensors) or (time).
+    :param scale: Scale, scalar or one per sensor, None for 1.
+    :param offset: Offset, scalar or one per sensor, None for 0.
+    :return: Physical values, the stored values themselves if they are float64 and neither scale nor offset is set.
+    """
+    if values is None or (scale is None and offset is None and values.dtype == np.float64):
+        return values
+    physical = values.astype(float)
+    if values.dtype.kind in 'iu':
+        physical[values == missing_value(values.dtype)] = np.nan
+    if scale is not None:
+        physical *= scale
+    if offset is not None:
+        physical += offset
+    return physical
+
+
+def select_range(published, num_sensors, start_time, end_time):
+    """
+    Selects the samples within a time range from a published state of a store.
+    :param published: Timestamps, values, length and offset of a store.
+    :param num_sensors: Number of sensors of the store.
+    :param start_time: Start of the range (inclusive), None for the first sample.
+    :param end_time: End of the range (inclusive), None for the last sample.
+    :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
+    """
+    timestamps, values, length, offset = published
+    if timestamps is None:
+        return np.empty((0,)), np.empty((0, num_sensors or 0))
+    timestamps, values = timestamps[:length], values[:length]
+    start = 0 if start_time is None else np.searchsorted(timestamps, start_time, side='left')
+    stop = length if end_time is None else np.searchsorted(timestamps, end_time, side='right')
+    return timestamps[start:stop], values[start:stop]
+
+
+class SampleStore:
+    """
+    Stores timestamps and values of a receiver in contiguous numpy arrays.
+    When the arrays are full, their capacity is doubled, which results in amortised constant cost per appended sample.
+    Only the first length entries of the arrays are valid, the remaining entries are uninitialized.
+    A store may be written by one thread (e.g., a receiver writing directly into it) while another thread reads it.
+    After every write, arrays, length and offset are published together in published, so readers should use published
+    (or get_timestamps/get_values) and never see a length that does not match the arrays. Arrays and offset are
+    published with a length cell of their own that single appends update in place, while the arrays stay the same.
+    Values are kept in the storage dtype, missing sensor values are marked with missing_value(dtype). A compact dtype
+    (float32, or int32 with scale and offset) halves the memory, the conversion is done by to_physical on read.
+    """
+    def __init__(self, initial_capacity, num_sensors=None, dtype=float, scale=None, offset=None):
+        """
+        Initializes the store.
+        :param initial_capacity: Number of samples that can be stored before the arrays are grown for the first time.
+        :param num_sensors: Number of sensors, if None, it is determined by the first appended values.
+        :param dtype: Storage dtype of the values.
+        :param scale: Scale from stored to physical values, scalar or one per sensor, None for 1.
+        :param offset: Offset from stored to physical values, scalar or one per sensor, None for 0.
+        """
+        self.initial_capacity = max(1, int(initial_capacity))
+        self.num_sensors = num_sensors
+        self.dtype = np.dtype(dtype)
+        self.missing = missing_value(self.dtype)
+        self.scale = scale
+        self.value_offset = offset
+
+        self.length = 0
+        self.min_timestamp = None
+        self.max_timestamp = None
+        self.timestamps = None
+        self.values = None
+        # Number of samples of the session that are not in the arrays anymore (see RollingSampleStore)
+        self.offset = 0
+        # Arrays, offset and length cell that are consistent with each other, replaced as a whole when the arrays change
+        self.published_state = (None, None, 0, [0])
+        # Length cell of the published state, updated in place by append while the arrays stay the same
+        self.published_length = self.published_state[3]
+
+    @property
+    def capacity(self):
+        return 0 if self.timestamps is None else len(self.timestamps)
+
+    def allocate(self, capacity):
+        """
+        Allocates new arrays with the given capacity and copies the valid samples into them.
+        :param capacity: New capacity.
+        """
+        timestamps = np.empty((capacity,))
+        values = np.empty((capacity, self.num_sensors), dtype=self.dtype)
+        if self.length > 0:
+            timestamps[:self.length] = self.timestamps[:self.length]
+            values[:self.length] = self.values[:self.length]
+        self.timestamps = timestamps
+        self.values = values
+
+    def reserve(self, count):
+        """
+        Makes sure that count more samples fit into the arrays, grows them geometrically if necessary.
+        :param count: Number of samples to be appended.
+        """
+        required = self.length + count
+        if required > self.capacity:
+            capacity = max(self.capacity, self.initial_capacity)
+            while capacity < required:
+                capacity *= 2
+            self.allocate(capacity)
+
+    @property
+    def published(self):
+        """
+        :return: Timestamps, values, length and offset that are consistent with each other.
+        """
+        timestamps, values, offset, length = self.published_state
+        return timestamps, values, length[0], offset
+
+    def append(self, timestamp, values):
+        """
+        Appends a single sample.
+        :param timestamp: Timestamp of the sample.
+        :param values: Measurement values of the sample.
+        """
+        length = self.length
+        timestamps = self.timestamps
+        # The first sample and samples that do not fit into the arrays take the path of blocks, which also publishes
+        # the new arrays, all other samples only update the length cell of the published state
+        if timestamps is None or not 0 < length < len(timestamps):
+            self.extend((timestamp,), (values,))
+            return
+        # Values are written before the timestamp, a sample with a timestamp is complete (see MemmapSampleStore.load)
+        if len(values) == self.num_sensors:
+            self.values[length] = values
+        else:
+            row = self.values[length]
+            row[:len(values)] = values
+            row[len(values):] = self.missing
+        timestamps[length] = timestamp
+        length += 1
+        self.length = length
+
+        if timestamp > self.max_timestamp:
+            self.max_timestamp = timestamp
+        elif timestamp < self.min_timestamp:
+            self.min_timestamp = timestamp
+        self.published_length[0] = length
+
+    def extend(self, timestamps, values):
+        """
+        Appends a block of samples with a single slice assignment.
+        :param timestamps: Timestamps of the samples, dimensions (time).
+        :param values: Measurement values of the samples, dimensions (time, sensors), missing sensors are marked as
+                       missing.
+        """
+        timestamps = np.asarray(timestamps, dtype=float)
+        count = len(timestamps)
+        if count == 0:
+            return
+        values = np.asarray(values).reshape((count, -1))
+        if self.num_sensors is None:
+            self.num_sensors = values.shape[1]
+        self.reserve(count)
+        self.values[self.length:self.length + count, :values.shape[1]] = values
+        self.values[self.length:self.length + count, values.shape[1]:] = self.missing
+        self.timestamps[self.length:self.length + count] = timestamps
+        self.length += count
+
+        min_timestamp, max_timestamp = np.min(timestamps), np.max(timestamps)
+        if self.min_timestamp is None or min_timestamp < self.min_timestamp:
+            self.min_timestamp = min_timestamp
+        if self.max_timestamp is None or max_timestamp > self.max_timestamp:
+            self.max_timestamp = max_timestamp
+        self.publish()
+
+    def clear(self):
+        """
+        Removes all samples, the arrays are kept to be reused.
+        """
+        self.length = 0
+        self.min_timestamp = None
+        self.max_timestamp = None
+        self.publish()
+
+    def flush(self):
+        """
+        Writes the samples to persistent storage, nothing to do for stores in RAM.
+        """
+        pass
+
+    def publish(self):
+        """
+        Publishes the current arrays, offset and length to readers in other threads.
+        """
+        self.published_length = [self.length]
+        self.published_state = (self.timestamps, self.values, self.offset, self.published_length)
+
+    def get_range(self, start_time=None, end_time=None):
+        """
+        Gets the samples within a time range, timestamps are expected to be sorted.
+        :param start_time: Start of the range (inclusive), None for the first sample.
+        :param end_time: End of the range (inclusive), None for the last sample.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
+        """
+        return select_range(self.published, self.num_sensors, start_time, end_time)
+
+    def get_blocks(self, block_length=65536):
+        """
+        Gets all samples of the store block by block, e.g., to export them without copying them at once.
+        :param block_length: Maximum number of samples per block.
+        :return: Generator of timestamps, dimensions (time), and values, dimensions (time, sensors), of the blocks.
+        """
+        timestamps, values, length, offset = self.published
+        for start in range(0, length, block_length):
+            stop = min(start + block_length, length)
+            yield timestamps[start:stop], values[start:stop]
+
+    def get_timestamps(self):
+        """
+        Gets the valid timestamps.
+        :return: View of the valid timestamps, dimensions (time).
+        """
+        timestamps, values, length, offset = self.published
+        return None if timestamps is None else timestamps[:length]
+
+    def get_values(self, sensor_index=-1):
+        """
+        Gets the valid measurement values in the storage dtype.
+        :param sensor_index: Index of desired sensor, set to -1 to get all sensor values.
+        :return: View of the valid values, dimensions (time, sensors) or (time).
+        """
+        timestamps, values, length, offset = self.published
+        if values is None:
+            return None
+        return values[:length, :] if sensor_index == -1 else values[:length, sensor_index]
+
+    def to_physical(self, values, sensor_index=-1):
+        """
+        Converts values read from the store into physical values.
+        :param values: Values in the storage dtype, dimensions (time, sensors) or (time).
+        :param sensor_index: Index of the sensor if values only contains a single sensor, -1 for all sensors.
+        :return: Physical values (float64).
+        """
+        scale, offset = self.scale, self.value_offset
+        if sensor_index != -1:
+            scale = scale if np.ndim(scale) == 0 else scale[sensor_index]
+            offset = offset if np.ndim(offset) == 0 else offset[sensor_index]
+        return to_physical(values, scale, offset)
+
+
+class MemmapSampleStore(SampleStore):
+    """
+    Sample store whose arrays are backed by files in a session directory (np.memmap), so the measurements survive a
+    crash of the program and recordings are not limited by the RAM.
+    Every store consists of the files <name>_timestamps.bin (raw float64) and <name>_values.bin (raw storage dtype) and
+    <name>.json with information about the receiver and the storage dtype, scale and offset. The files are created when
+    the first sample is appended and grow like the arrays of a SampleStore, the data is not copied when they grow. The
+    arrays are ordinary ndarray views of the files.
+    The number of valid samples is recovered from the last non-zero timestamp, so timestamps must not be zero. The
+    values of a sample are written before its timestamp, so a crash while appending never recovers incomplete values.
+    """
+    def __init__(self, directory, name, initial_capacity, num_sensors=None, info=None, dtype=float, scale=None,
+                 offset=None):
+        """
+        Initializes the store.
+        :param directory: Session directory, created when the first sample is appended.
+        :param name: Name of the store, used as prefix of the file names.
+        :param initial_capacity: Number of samples that fit into the files before they are grown for the first time.
+        :param num_sensors: Number of sensors, if None, it is determined by the first appended values.
+        :param info: Dictionary with information about the receiver that is stored in <name>.json.
+        :param dtype: Storage dtype of the values.
+        :param scale: Scale from stored to physical values, scalar or one per sensor, None for 1.
+        :param offset: Offset from stored to physical values, scalar or one per sensor, None for 0.
+        """
+        super().__init__(initial_capacity, num_sensors, dtype, scale, offset)
+        self.directory = directory
+        self.name = name
+        self.info = {} if info is None else info
+        self.timestamps_path = os.path.join(directory, name + "_timestamps.bin")
+        self.values_path = os.path.join(directory, name + "_values.bin")
+        self.maps = []
+
+    def allocate(self, capacity):
+        """
+        Grows the files to the given capacity and maps them again, valid samples stay in the files.
+        :param capacity: New capacity.
+        """
+        if self.timestamps is None:
+            os.makedirs(self.directory, exist_ok=True)
+            info = dict(self.info, name=self.name, num_sensors=self.num_sensors, dtype=self.dtype.name,
+                        scale=None if self.scale is None else np.asarray(self.scale).tolist(),
+                        offset=None if self.value_offset is None else np.asarray(self.value_offset).tolist())
+            with open(os.path.join(self.directory, self.name + ".json"), 'w') as file:
+                json.dump(info, file, indent=4)
+
+        for path, size in ((self.timestamps_path, capacity * np.dtype(float).itemsize),
+                           (self.values_path, capacity * self.num_sensors * self.dtype.itemsize)):
+            with open(path, 'ab') as file:
+                if file.tell() < size:
+                    file.truncate(size)
+        self.map(capacity)
+
+    def map(self, capacity):
+        """
+        Maps the files with the given capacity.
+        Previous maps stay valid, since readers may still use views of them.
+        :param capacity: Capacity of the files.
+        """
+        timestamps = np.memmap(self.timestamps_path, dtype=float, mode='r+', shape=(capacity,))
+        values = np.memmap(self.values_path, dtype=self.dtype, mode='r+', shape=(capacity, self.num_sensors))
+        self.maps = [timestamps, values]
+        self.timestamps = timestamps.view(np.ndarray)
+        self.values = values.view(np.ndarray)
+
+    def load(self):
+        """
+        Maps existing files of the store, e.g., after a crash, and recovers the number of valid samples.
+        """
+        capacity = os.path.getsize(self.timestamps_path) // np.dtype(float).itemsize
+        self.map(capacity)
+        non_zero = np.flatnonzero(self.timestamps)
+        self.length = 0 if len(non_zero) == 0 else int(non_zero[-1]) + 1
+        if self.length > 0:
+            self.min_timestamp = np.min(self.timestamps[:self.length])
+            self.max_timestamp = np.max(self.timestamps[:self.length])
+        self.publish()
+
+    def clear(self):
+        """
+        Removes all samples, the timestamps in the files are reset so they are not recovered.
+        """
+        if self.timestamps is not None:
+            self.timestamps[:self.length] = 0
+        super().clear()
+
+    def flush(self):
+        """
+        Writes changes of the mapped files to disk.
+        """
+        for memmap in self.maps:
+            memmap.flush()
+
+
+class RollingSampleStore(SampleStore):
+    """
+    Sample store that keeps only the most recent samples in RAM, so the memory footprint does not depend on the length
+    of the session.
+    The arrays hold up to 2 * window samples. When they are full, all but the last window samples are appended to the
+    archive files <name>_archive_timestamps.bin and <name>_archive_values.bin (raw float64 and raw storage dtype) in the
+    session directory
+    and the remaining samples are moved to new arrays. Only these are visible in timestamps/values, older samples can be
+    read from the archive with get_range.
+    """
+    def __init__(self, directory, name, window, num_sensors=None, dtype=float, scale=None, offset=None):
+        """
+        Initializes the store.
+        :param directory: Session directory, created when the first samples are archived.
+        :param name: Name of the store, used as prefix of the file names.
+        :param window: Minimum number of samples kept in RAM.
+        :param num_sensors: Number of sensors, if None, it is determined by the first appended values.
+        :param dtype: Storage dtype of the values.
+        :param scale: Scale from stored to physical values, scalar or one per sensor, None for 1.
+        :param offset: Offset from stored to physical values, scalar or one per sensor, None for 0.
+        """
+        super().__init__(2 * window, num_sensors, dtype, scale, offset)
+        self.window = max(1, int(window))
+        self.directory = directory
+        self.name = name
+        self.archive_timestamps_path = os.path.join(directory, name + "_archive_timestamps.bin")
+        self.archive_values_path = os.path.join(directory, name + "_archive_values.bin")
+
+    def reserve(self, count):
+        """
+        Makes sure that count more samples fit into the arrays, archives the oldest samples if necessary.
+        :param count: Number of samples to be appended.
+        """
+        if self.length > 0 and self.length + count > max(self.capacity, 2 * self.window):
+            self.spill(min(self.length, self.length + count - self.window))
+        super().reserve(count)
+
+    def spill(self, count):
+        """
+        Appends the oldest samples to the archive and moves the remaining samples to new arrays.
+        New arrays are used instead of moving the samples within the arrays, since readers may still use the old ones.
+        :param count: Number of samples to be archived.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.archive_timestamps_path, 'ab') as file:
+            file.write(self.timestamps[:count].tobytes())
+        with open(self.archive_values_path, 'ab') as file:
+            file.write(self.values[:count].tobytes())
+        self.offset += count
+
+        remaining = self.length - count
+        timestamps = np.empty((2 * self.window,))
+        values = np.empty((2 * self.window, self.num_sensors), dtype=self.dtype)
+        timestamps[:remaining] = self.timestamps[count:self.length]
+        values[:remaining] = self.values[count:self.length]
+        self.timestamps, self.values, self.length = timestamps, values, remaining
+
+    def read_archive(self, start_time=None, end_time=None):
+        """
+        Reads archived samples within a time range.
+        :param start_time: Start of the range (inclusive), None for the first archived sample.
+        :param end_time: End of the range (inclusive), None for the last archived sample.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
+        """
+        count = self.offset
+        if count == 0:
+            return np.empty((0,)), np.empty((0, self.num_sensors or 0), dtype=self.dtype)
+        # Only the pages touched by the binary search and the requested range are read from disk
+        timestamps = np.memmap(self.archive_timestamps_path, dtype=float, mode='r', shape=(count,))
+        start = 0 if start_time is None else np.searchsorted(timestamps, start_time, side='left')
+        stop = count if end_time is None else np.searchsorted(timestamps, end_time, side='right')
+        values = np.memmap(self.archive_values_path, dtype=self.dtype, mode='r', shape=(count, self.num_sensors))
+        return np.array(timestamps[start:stop]), np.array(values[start:stop])
+
+    def get_range(self, start_time=None, end_time=None):
+        """
+        Gets the samples within a time range, archived samples are read from disk.
+        Archived samples are only read for an explicit start time, so an open range never reads the whole archive.
+        :param start_time: Start of the range (inclusive), None for the first sample in RAM.
+        :param end_time: End of the range (inclusive), None for the last sample.
+        :return: Timestamps, dimensions (time), and values, dimensions (time, sensors).
+        """
+        # The same published state is used for both parts, since the arrays are replaced when samples are archived
+        published = self.published
+        timestamps, values = select_range(published, self.num_sensors, start_time, end_time)
+        first_timestamp = published[0][0] if published[2] > 0 else None
+        if start_time is None or first_timestamp is not None and start_time >= first_timestamp:
+            # The range begins within the samples in RAM
+            return timestamps, values
+
+        archived_timestamps, archived_values = self.read_archive(start_time, end_time)
+        if first_timestamp is not None:
+            # Samples that are being archived may still be in the arrays as well, only older ones are taken
+            count = np.searchsorted(archived_timestamps, first_timestamp, side='left')
+            archived_timestamps, archived_values = archived_timestamps[:count], archived_values[:count]
+        if len(archived_timestamps) == 0:
+            return timestamps, values
+        return np.concatenate((archived_timestamps, timestamps)), np.concatenate((archived_values, values))
+
+    def get_blocks(self, block_length=65536):
+        """
+        Gets all samples of the session block by block, the archived samples first.
+        :param block_length: Maximum number of samples per block.
+        :return: Generator of timestamps, dimensions (time), and values, dimensions (time, sensors), of the blocks.
+        """
+        # The published offset is the number of archived samples before the published arrays
+        published = self.published
+        count = published[3]
+        if count > 0:
+            timestamps = np.memmap(self.archive_timestamps_path, dtype=float, mode='r', shape=(count,))
+            values = np.memmap(self.archive_values_path, dtype=self.dtype, mode='r', shape=(count, self.num_sensors))
+            for start in range(0, count, block_length):
+                stop = min(start + block_length, count)
+                yield np.array(timestamps[start:stop]), np.array(values[start:stop])
+        timestamps, values, length, offset = published
+        for start in range(0, length, block_length):
+            stop = min(start + block_length, length)
+            yield timestamps[start:stop], values[start:stop]
+
+
+def open_session(directory):
+    """
+    Opens the stores of a session that was recorded with memmap stores, e.g., after a crash.
+    :param directory: Session directory.
+    :return: Stores, sorted by their names.
+    """
+    stores = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(path, 'r') as file:
+            info = json.load(file)
+        store = MemmapSampleStore(directory, info['name'], 1, info['num_sensors'], info, info.get('dtype', 'float64'),
+                                  info.get('scale'), info.get('offset'))
+        store.load()
+        stores.append(store)
+    return stores
@@ -0,0 +1,151 @@
+from Utils import Logging
+
+"""
+This module implements framing of serial byte streams.
+A framer accumulates received bytes, which may contain partial frames, and returns all complete frames at once as one
+contiguous block. Frames are not copied individually, so the block can be parsed in one pass, e.g., with np.frombuffer.
+"""
+
+
+class StreamFramer:
+    """
+    Base class of the framers.
+    Bytes that do not belong to a valid frame are dropped and counted in dropped_bytes. If no frame boundary is found
+    within max_buffer bytes, the accumulated bytes are dropped as well, so a stream of garbage cannot grow the buffer.
+    """
+    def __init__(self, max_buffer=1 << 20):
+        """
+        Initializes the framer.
+        :param max_buffer: Maximum number of accumulated bytes.
+        """
+        self.max_buffer = max_buffer
+        self.buffer = bytearray()
+        self.dropped_bytes = 0
+
+    def feed(self, data):
+        """
+        Appends received bytes and extracts all complete frames.
+        :param data: Received bytes.
+        :return: Complete frames as one contiguous block of bytes.
+        """
+        self.buffer += data
+        frames, end = self.extract_frames()
+        del self.buffer[:end]
+        if len(self.buffer) > self.max_buffer:
+            self.dropped_bytes += len(self.buffer)
+            self.buffer = bytearray()
+        return frames
+
+    def extract_frames(self):
+        """
+        Finds the complete frames in the buffer.
+        Should be overridden in the concrete implementation.
+        :return: Complete frames as one block of bytes and the position in the buffer up to which bytes are consumed.
+        """
+        Logging.error("extract_frames not implemented in your framer!")
+        return b"", 0
+
+    def clear(self):
+        """
+        Discards accumulated bytes, e.g., when a new transmission starts.
+        """
+        self.buffer = bytearray()
+
+
+class FixedLengthFramer(StreamFramer):
+    """
+    Frames of a fixed number of bytes without a recognizable header.
+    """
+    def __init__(self, frame_length, max_buffer=1 << 20):
+        """
+        Initializes the framer.
+        :param frame_length: Number of bytes per frame.
+        :param max_buffer: Maximum number of accumulated bytes.
+        """
+        super().__init__(max_buffer)
+        self.frame_length = frame_length
+
+    def extract_frames(self):
+        end = len(self.buffer) - len(self.buffer) % self.frame_length
+        with memoryview(self.buffer) as view:
+            return bytes(view[:end]), end
+
+
+class DelimiterFramer(StreamFramer):
+    """
+    Frames that end with a delimiter, e.g., lines. The returned block still contains the delimiters.
+    """
+    def __init__(self, delimiter=b"\n", max_buffer=1 << 20):
+        """
+        Initializes the framer.
+        :param delimiter: Bytes at the end of each frame.
+        :param max_buffer: Maximum number of accumulated bytes.
+        """
+        super().__init__(max_buffer)
+        self.delimiter = delimiter
+
+    def extract_frames(self):
+        end = self.buffer.rfind(self.delimiter) + 1
+        if end == 0:
+            return b"", 0
+        end += len(self.delimiter) - 1
+        with memoryview(self.buffer) as view:
+            return bytes(view[:end]), end
+
+
+class HeaderCRCFramer(StreamFramer):
+    """
+    Frames that start with a header, followed by a payload of fixed length and a big-endian CRC (optional).
+    Frames with an invalid CRC are counted in invalid_frames and the framer resynchronizes at the next header. Without a
+    CRC, a frame is accepted whenever it starts with the header, so the framer resynchronizes after lost or additional
+    bytes, but cannot detect corrupted payloads.
+    """
+    def __init__(self, header, payload_length, crc_function, crc_length, max_buffer=1 << 20):
+        """
+        Initializes the framer.
+        :param header: Bytes at the start of each frame.
+        :param payload_length: Number of bytes between header and CRC.
+        :param crc_function: Function that calculates the CRC of header and payload (e.g., from crcmod), None without
+                             CRC.
+        :param crc_length: Number of bytes of the CRC, 0 without CRC.
+        :param max_buffer: Maximum number of accumulated bytes.
+        """
+        super().__init__(max_buffer)
+        self.header = header
+        self.payload_length = payload_length
+        self.crc_function = crc_function
+        self.crc_length = crc_length
+        self.frame_length = len(header) + payload_length + crc_length
+        self.invalid_frames = 0
+
+    def extract_frames(self):
+        frames = []
+        position = 0
+        with memoryview(self.buffer) as view:
+            while True:
+                start = self.buffer.find(self.header, position)
+                if start < 0:
+                    # Keep a possible beginning of the header at the end of the buffer
+                    end = max(position, len(self.buffer) - len(self.header) + 1)
+                    self.dropped_bytes += end - position
+                    position = end
+                    break
+                self.dropped_bytes += start - position
+                position = start
+                if start + self.frame_length > len(self.buffer):
+                    break
+
+                crc_start = start + self.frame_length - self.crc_length
+                crc = int.from_bytes(view[crc_start:start + self.frame_length], 'big')
+                if self.crc_function is None or self.crc_function(view[start:crc_start]) == crc:
+                    frames.append(view[start:start + self.frame_length])
+                    position = start + self.frame_length
+                else:
+                    # The header may have been part of the payload of a frame, search for the next one
+                    self.invalid_frames += 1
+                    self.dropped_bytes += 1
+                    position = start + 1
+            block = b"".join(frames)
+            for frame in frames:
+                frame.release()
+        return block, position
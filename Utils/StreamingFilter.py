@@ -0,0 +1,283 @@
+import numpy as np
+import scipy.ndimage
+import scipy.signal
+
+from Utils import Logging
+
+"""
+This module implements filters of the measurements of a receiver that only process the newly appended measurements:
+the streaming Gaussian filter and the causal filter stages that are chained to pipelines for pre-processing.
+"""
+
+
+class StreamingGaussianFilter:
+    """
+    Gaussian filter (scipy.ndimage.gaussian_filter1d along time) of all sensors of a receiver, updated incrementally.
+    A filtered value depends on the measurements up to radius samples before and after it. Values that have radius
+    measurements after them are settled and never calculated again. On every update, only the unsettled values and the
+    new measurements are filtered, together with radius measurements before them, so the cost only depends on the
+    number of new measurements. The result equals filtering all measurements at once (reflected at both ends).
+    The filtered values are kept in preallocated arrays with the same indices as the arrays of the sample store. Only
+    settled values are returned, they are never changed afterwards, so readers in other threads can keep using them.
+    The filtered values therefore lag radius measurements behind the store.
+    """
+    def __init__(self, sigma, num_sensors, initial_capacity=10000, truncate=4.0):
+        """
+        Initializes the filter.
+        :param sigma: Standard deviation of the Gaussian kernel (samples).
+        :param num_sensors: Number of sensors, the first num_sensors sensors of the store are filtered.
+        :param initial_capacity: Initial number of filtered values per sensor.
+        :param truncate: Kernel radius in standard deviations, like in scipy.ndimage.gaussian_filter1d.
+        """
+        self.sigma = sigma
+        self.num_sensors = num_sensors
+        self.truncate = truncate
+        # Same radius as the kernel of scipy.ndimage.gaussian_filter1d
+        self.radius = int(truncate * sigma + 0.5)
+
+        self.filtered = np.empty((initial_capacity, num_sensors))
+        self.length = 0
+        self.offset = 0
+        self.settled = 0
+
+    def clear(self):
+        """
+        Removes all filtered values, new arrays are used since readers may still use the previous ones.
+        """
+        self.filtered = np.empty_like(self.filtered)
+        self.length = 0
+        self.offset = 0
+        self.settled = 0
+
+    def update(self, store):
+        """
+        Filters the measurements that have been appended to a sample store since the last update.
+        :param store: Sample store of the receiver, cleared stores require clear to be called.
+        :return: Timestamps of the store, filtered values, dimensions (capacity, sensors), and number of settled values.
+                 The arrays are only valid up to the returned number.
+        """
+        timestamps, values, length, offset = store.published
+        if offset > self.offset:
+            # The store has archived measurements, the filtered values are moved along to new arrays
+            dropped = min(offset - self.offset, self.length)
+            filtered = np.empty_like(self.filtered)
+            filtered[:self.length - dropped] = self.filtered[dropped:self.length]
+            self.filtered = filtered
+            self.length -= dropped
+            self.settled = max(0, self.settled - dropped)
+            self.offset = offset
+        if length <= self.length:
+            return timestamps, self.filtered, self.settled
+
+        if length > len(self.filtered):
+            filtered = np.empty((max(length, 2 * len(self.filtered)), self.num_sensors))
+            filtered[:self.length] = self.filtered[:self.length]
+            self.filtered = filtered
+        start = max(0, self.settled - self.radius)
+        window = store.to_physical(values[start:length])[:, :self.num_sensors].astype(float, copy=False)
+        # Only values after the returned settled values are written
+        filtered = scipy.ndimage.gaussian_filter1d(window, self.sigma, axis=0, truncate=self.truncate)
+        self.filtered[self.settled:length] = filtered[self.settled - start:]
+        self.length = length
+        self.settled = max(self.settled, length - self.radius)
+        return timestamps, self.filtered, self.settled
+
+
+class FilterStage:
+    """
+    Causal filter stage that processes the measurements of a receiver chunk by chunk.
+    A stage keeps the state that it needs from previous chunks, so processing the measurements in several chunks gives
+    the same result as processing them at once. Stages expect complete measurements (no missing sensor values).
+    """
+    def process(self, timestamps, values):
+        """
+        Processes the next chunk of measurements.
+        Should be overridden in the concrete implementation.
+        :param timestamps: Timestamps of the measurements, dimensions (time).
+        :param values: Physical values, dimensions (time, sensors).
+        :return: Timestamps and values of the output.
+        """
+        return timestamps, values
+
+    def reset(self):
+        """
+        Removes the state of previous chunks.
+        May be overridden in the concrete implementation.
+        """
+        pass
+
+
+class WindowStage(FilterStage):
+    """
+    Base of the stages that calculate every output value from a window of the last length measurements.
+    The last length - 1 measurements are kept for the next chunk, the first outputs use the measurements so far.
+    """
+    def __init__(self, length):
+        """
+        Initializes the stage.
+        :param length: Number of measurements per window.
+        """
+        self.length = length
+
+        self.history = None
+
+    def process(self, timestamps, values):
+        if len(timestamps) == 0:
+            return timestamps, values
+        extended = values if self.history is None else np.concatenate((self.history, values))
+        num_history = len(extended) - len(values)
+        self.history = extended[max(0, len(extended) - self.length + 1):]
+        return timestamps, self.reduce(extended, num_history)
+
+    def reduce(self, extended, num_history):
+        """
+        Calculates the output values of a chunk.
+        Should be overridden in the concrete implementation.
+        :param extended: Kept measurements followed by the measurements of the chunk, dimensions (time, sensors).
+        :param num_history: Number of kept measurements.
+        :return: Output value of every measurement of the chunk, dimensions (time, sensors).
+        """
+        Logging.error("reduce not implemented in your window stage!", repeat=False)
+        return extended[num_history:]
+
+    def reset(self):
+        self.history = None
+
+
+class MovingAverage(WindowStage):
+    """
+    Mean of the last length measurements.
+    """
+    def reduce(self, extended, num_history):
+        ends = np.arange(num_history, len(extended)) + 1
+        starts = np.maximum(0, ends - self.length)
+        # Sums of the windows from the cumulative sum of the chunk only, so rounding errors do not accumulate
+        sums = np.concatenate((np.zeros((1, extended.shape[1])), np.cumsum(extended, axis=0)))
+        return (sums[ends] - sums[starts]) / (ends - starts)[:, None]
+
+
+class MovingMedian(WindowStage):
+    """
+    Median of the last length measurements, e.g., to remove spikes.
+    """
+    def reduce(self, extended, num_history):
+        # Outputs before the first complete window use the measurements so far
+        num_partial = max(0, min(self.length - 1, len(extended)) - num_history)
+        partial = [np.median(extended[:end + 1], axis=0) for end in range(num_history, num_history + num_partial)]
+        partial = np.reshape(partial, (-1, extended.shape[1]))
+        if len(extended) < self.length:
+            return partial
+        windows = np.lib.stride_tricks.sliding_window_view(extended, self.length, axis=0)
+        return np.concatenate((partial, np.median(windows[max(0, num_history - self.length + 1):], axis=-1)))
+
+
+class IIRFilter(FilterStage):
+    """
+    IIR filter (scipy.signal.lfilter) with the filter state carried from chunk to chunk.
+    The state is initialized with the steady state of the first measurement, so offsets cause no transient.
+    """
+    def __init__(self, b, a):
+        """
+        Initializes the filter.
+        :param b: Numerator coefficients.
+        :param a: Denominator coefficients.
+        """
+        self.b = np.atleast_1d(b)
+        self.a = np.atleast_1d(a)
+
+        self.zi = None
+
+    def process(self, timestamps, values):
+        if len(timestamps) == 0:
+            return timestamps, values
+        if self.zi is None:
+            self.zi = scipy.signal.lfilter_zi(self.b, self.a)[:, None] * values[0]
+        filtered, self.zi = scipy.signal.lfilter(self.b, self.a, values, axis=0, zi=self.zi)
+        return timestamps, filtered
+
+    def reset(self):
+        self.zi = None
+
+
+def butterworth(cutoff, rate, order=2, btype='lowpass'):
+    """
+    Creates a Butterworth filter stage, order 2 is a single biquad.
+    :param cutoff: Cutoff frequency (Hz), two frequencies for band filters.
+    :param rate: Sample rate of the measurements (Hz).
+    :param order: Filter order.
+    :param btype: 'lowpass', 'highpass', 'bandpass' or 'bandstop'.
+    :return: IIR filter stage.
+    """
+    b, a = scipy.signal.butter(order, cutoff, btype=btype, fs=rate)
+    return IIRFilter(b, a)
+
+
+class BaselineRemoval(IIRFilter):
+    """
+    Removes slow drift by subtracting an exponential moving average (time constant of length measurements) as baseline.
+    """
+    def __init__(self, length):
+        """
+        Initializes the stage.
+        :param length: Time constant of the baseline in measurements.
+        """
+        alpha = 1 / length
+        super().__init__([alpha], [1, alpha - 1])
+
+    def process(self, timestamps, values):
+        timestamps, baseline = super().process(timestamps, values)
+        return timestamps, values - baseline
+
+
+class Decimation(FilterStage):
+    """
+    Keeps every factor-th measurement, the position is carried from chunk to chunk.
+    Without a preceding low-pass stage (e.g., MovingAverage), high frequencies are aliased.
+    """
+    def __init__(self, factor):
+        """
+        Initializes the stage.
+        :param factor: Decimation factor.
+        """
+        self.factor = factor
+
+        # Number of measurements to skip before the next kept one
+        self.skip = 0
+
+    def process(self, timestamps, values):
+        kept = slice(self.skip, None, self.factor)
+        self.skip = (self.skip - len(timestamps)) % self.factor
+        return timestamps[kept], values[kept]
+
+    def reset(self):
+        self.skip = 0
+
+
+class Pipeline:
+    """
+    Chain of filter stages, the output of every stage is the input of the next one.
+    """
+    def __init__(self, stages):
+        """
+        Initializes the pipeline.
+        :param stages: Filter stages in the order they are applied.
+        """
+        self.stages = list(stages)
+
+    def process(self, timestamps, values):
+        """
+        Processes the next chunk of measurements with all stages.
+        :param timestamps: Timestamps of the measurements, dimensions (time).
+        :param values: Physical values, dimensions (time, sensors).
+        :return: Timestamps and values of the output of the last stage.
+        """
+        for stage in self.stages:
+            timestamps, values = stage.process(timestamps, values)
+        return timestamps, values
+
+    def reset(self):
+        """
+        Removes the state of all stages.
+        """
+        for stage in self.stages:
+            stage.reset()
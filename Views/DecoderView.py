@@ -299,27 +299,34 @@ class DecoderView(QWidget):
         #if ViewUtils.message_box_warning(self.style(), "Stop decoder?", "Are you sure you want to stop the decoder?", "Once the decoder is stopped, no more new data can be shown."):
         self.view.controller.stop_decoder()
 
-    def update_(self, decoded):
+    def update_(self, changes):
         """
-        Updates the decoder view based on new information from the decoder.
-        :param decoded: New decoder information.
+        Updates the decoder view based on the changes of the decoder since the last update.
+        :param changes: Changes from the decoder (see DecoderInterface.get_changes_since).
         """
-        symbol_values, sequence = decoded['symbol_values'], decoded['sequence']
-        self.update_symbol_values(symbol_values)
-        self.update_sequence(sequence)
+        if changes['reset']:
+            self.decoder_clear()
+        self.update_symbol_values(changes['symbol_values'], changes['symbol_values_start'])
+        self.update_sequence(changes['sequence'])
 
     def update_sequence(self, sequence):
         """
-        Updates the displayed sequence.
-        :param sequence: New sequence from the decoder.
+        Appends new characters to the displayed sequence.
+        :param sequence: New characters from the decoder.
         """
-        self.text_edit_sequence.setPlainText(sequence)
+        if sequence:
+            self.text_edit_sequence.moveCursor(QTextCursor.End)
+            self.text_edit_sequence.insertPlainText(sequence)
 
-    def update_symbol_values(self, symbol_values):
+    def update_symbol_values(self, symbol_values, start):
         """
-        Converts symbol values list to a string and updates the displayed symbol values.
+        Converts new symbol values to a string and appends them to the displayed symbol values.
         :param symbol_values: New symbol values from the decoder.
-        """
-        symbol_values_str = str(symbol_values)
-        symbol_values_str = symbol_values_str.replace("[", "").replace("]", "").replace("'", "")
-        self.text_edit_symbol_values.setPlainText(symbol_values_str)
\ No newline at end of file
+        :param start: Index of the first new symbol value.
+        """
+        if symbol_values:
+            symbol_values_str = ", ".join(str(symbol_value) for symbol_value in symbol_values)
+            if start > 0:
+                symbol_values_str = ", " + symbol_values_str
+            self.text_edit_symbol_values.moveCursor(QTextCursor.End)
+            self.text_edit_symbol_values.insertPlainText(symbol_values_str)
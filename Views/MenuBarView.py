@@ -6,6 +6,7 @@ import os
 
 from Views import SettingsDialog
 from Utils import ViewUtils
+from Utils.Settings import SettingsStore
 
 
 class MenuBarView(QMenuBar):
@@ -15,6 +16,7 @@ class MenuBarView(QMenuBar):
 
         menu_file = self.addMenu("File")
         self.settings_dialog = SettingsDialog.SettingsDialog(self)
+        menu_file.addAction("Open Session", self.open_session)
         menu_file.addAction(ViewUtils.get_icon('export'), "Export (Native)", self.export)
         menu_file.addAction(ViewUtils.get_icon('export'), "Export (Custom)", self.export_custom)
         menu_file.addAction(ViewUtils.get_icon('settings'), "Settings", self.show_settings)
@@ -50,6 +52,11 @@ class MenuBarView(QMenuBar):
     def export(self):
         self.view.data_view.tab_plot.plot_widget.export_plot()
 
+    def open_session(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select Session Directory",
+                                                     SettingsStore.settings['SESSION_DIRECTORY'])
+        self.view.controller.load_session(directory)
+
     def export_custom(self):
         directory = QFileDialog.getExistingDirectory(self, "Select Directory")
         self.view.controller.export_custom(directory)
@@ -7,6 +7,7 @@ from datetime import datetime
 import numpy as np
 import time
 
+from Utils.SampleStore import to_physical
 from Utils.Settings import SettingsStore
 
 
@@ -33,6 +34,8 @@ class PlotWidgetView(pg.PlotWidget):
         self.additional_datalines = []
         self.datalines = []
         self.landmarks = []
+        # Visible X range and measurements per receiver that were read for a range that is no longer in the decoder's arrays
+        self.paged = {}
         self.text_items = []
         self.vertical_lines = []
 
@@ -99,6 +102,7 @@ class PlotWidgetView(pg.PlotWidget):
             self.additional_datalines[i].clear()
         for i in range(len(self.landmarks)):
             self.landmarks[i].clear()
+        self.paged = {}
         self.clear_symbol_intervals()
         self.clear_symbol_values()
         self.repaint_plot()
@@ -157,6 +161,49 @@ class PlotWidgetView(pg.PlotWidget):
         self.e = exportDialog.ExportDialog(self.plotItem.scene())
         self.e.show(self.plotItem)
 
+    def get_aggregated(self, receiver_index, timestamps):
+        """
+        Gets the minimum and maximum per time bucket in the visible X range if more measurements are visible than
+        PLOT_MAX_POINTS (e.g., because the user zoomed out of a long session).
+        Every bucket is drawn as a vertical line from its minimum to its maximum.
+        :param receiver_index: Index of the receiver.
+        :param timestamps: Timestamps in the decoder's arrays, used to estimate the number of visible measurements.
+        :return: X and Y values of the datalines, dimensions (2 * buckets) and (2 * buckets, sensors), None if the
+                 measurements can be shown directly.
+        """
+        x_min, x_max = self.viewRange()[0]
+        max_points = SettingsStore.settings['PLOT_MAX_POINTS']
+        duration = timestamps[-1] - timestamps[0]
+        visible = len(timestamps) * (x_max - x_min) / duration if duration > 0 else len(timestamps)
+        if visible / self.plot_view.settings['step_size'] <= max_points:
+            return None
+        aggregates = self.plot_view.data_view.view.controller.get_aggregates(receiver_index, x_min, x_max, max_points // 2)
+        if aggregates is None:
+            return None
+        centers, minimum, maximum, mean = aggregates
+        return np.repeat(centers, 2), np.stack((minimum, maximum), axis=1).reshape((-1, minimum.shape[1]))
+
+    def get_paged(self, receiver_index, first_timestamp):
+        """
+        Gets the measurements in the visible X range if the user scrolled back before the first measurement in the
+        decoder's arrays (e.g., because older measurements have been archived by a rolling store).
+        The measurements are only read again when the visible X range changes.
+        :param receiver_index: Index of the receiver.
+        :param first_timestamp: First timestamp in the decoder's arrays.
+        :return: Timestamps and values in the visible X range, None if the decoder's arrays cover it.
+        """
+        x_min, x_max = self.viewRange()[0]
+        if self.autoscroll or x_min >= first_timestamp:
+            self.paged.pop(receiver_index, None)
+            return None
+        x_range, paged = self.paged.get(receiver_index, (None, None))
+        if x_range != (x_min, x_max):
+            paged = self.plot_view.data_view.view.controller.get_received(receiver_index, x_min, x_max)
+            if paged is None:
+                paged = np.empty((0,)), np.empty((0, len(self.datalines[receiver_index])))
+            self.paged[receiver_index] = ((x_min, x_max), paged)
+        return paged
+
     def repaint_plot(self):
         """
         Repaints the plot.
@@ -307,14 +354,27 @@ class PlotWidgetView(pg.PlotWidget):
         :param received: Measurement values from the receivers.
         """
         lengths, timestamps, values = received['lengths'], received['timestamps'], received['values']
+        step_size = self.plot_view.settings['step_size']
         for receiver_index in range(len(values)):
             if lengths[receiver_index] > 0:
-                for sensor_index in range(values[receiver_index].shape[1]):
+                length = lengths[receiver_index]
+                receiver_timestamps, receiver_values = timestamps[receiver_index][:length], values[receiver_index][:length]
+                aggregated = self.get_aggregated(receiver_index, receiver_timestamps)
+                if aggregated is not None:
+                    x, y = aggregated
+                else:
+                    paged = self.get_paged(receiver_index, receiver_timestamps[0])
+                    if paged is not None:
+                        # Paged values are already physical values
+                        x, y = paged[0][::step_size], paged[1][::step_size]
+                    else:
+                        # Only the plotted values are converted from the storage dtype
+                        x = receiver_timestamps[::step_size]
+                        y = to_physical(receiver_values[::step_size], received['scales'][receiver_index],
+                                        received['value_offsets'][receiver_index])
+                for sensor_index in range(y.shape[1]):
                     if self.plot_view.settings['datalines_active'][receiver_index][sensor_index]:
-                        length = lengths[receiver_index]
-                        x = timestamps[receiver_index][:length:self.plot_view.settings['step_size']]
-                        y = values[receiver_index][:length:self.plot_view.settings['step_size'], sensor_index]
-                        self.datalines[receiver_index][sensor_index].setData(x, y)
+                        self.datalines[receiver_index][sensor_index].setData(x, y[:, sensor_index])
 
     def update_landmarks(self, landmarks):
         """
@@ -364,34 +424,35 @@ class PlotWidgetView(pg.PlotWidget):
         :param symbol_intervals: Symbol interval positions (relevant for the x-position of the symbol values).
         :param symbol_values: Symbol values.
         """
-        # This is necessary (for now), because symbol_values/symbol_intervals are not updated atomically
-        symbol_values = symbol_values[:len(symbol_intervals) - 1]
-
         if self.plot_view.settings['symbol_values']:
             for i in range(len(self.text_items), len(symbol_values)):
                 x_pos = 0.5 * (symbol_intervals[i] + symbol_intervals[i+1])
 
                 if self.plot_view.settings['symbol_values_position'] in ['Above', 'Below']:
-                    timestamps, values = vals['timestamps'], vals['values']
+                    lengths, timestamps, values = vals['lengths'], vals['timestamps'], vals['values']
                     minimum_values, maximum_values = [], []
                     for receiver_index in range(len(timestamps)):
+                        if lengths[receiver_index] == 0:
+                            continue
 
                         start_time = symbol_intervals[i]
                         end_time = symbol_intervals[i+1]
 
-                        start_index = np.argmax(timestamps[receiver_index] > start_time)
-                        end_index = np.argmax(timestamps[receiver_index] > end_time)
-
-                        if start_index == end_index:
-                            max_tmp = values[receiver_index][start_index]
-                            min_tmp = values[receiver_index][start_index]
-                        else:
-                            max_tmp = np.max(values[receiver_index][start_index:end_index])
-                            min_tmp = np.min(values[receiver_index][start_index:end_index])
+                        # Binary search on the valid timestamps
+                        valid_timestamps = timestamps[receiver_index][:lengths[receiver_index]]
+                        start_index = np.searchsorted(valid_timestamps, start_time, side='right')
+                        end_index = np.searchsorted(valid_timestamps, end_time, side='right')
+                        start_index = min(start_index, lengths[receiver_index] - 1)
+                        end_index = max(start_index + 1, end_index)
+
+                        interval_values = to_physical(values[receiver_index][start_index:end_index],
+                                                      vals['scales'][receiver_index], vals['value_offsets'][receiver_index])
+                        max_tmp = np.max(interval_values)
+                        min_tmp = np.min(interval_values)
                         maximum_values.append(max_tmp)
                         minimum_values.append(min_tmp)
-                    maximum_interval_value = max(maximum_values)
-                    minimum_interval_value = min(minimum_values)
+                    maximum_interval_value = max(maximum_values, default=0)
+                    minimum_interval_value = min(minimum_values, default=0)
 
                     if self.plot_view.settings['symbol_values_position'] == 'Above':
                         y_pos = maximum_interval_value + (0.1 + 0.001 * self.plot_view.settings['symbol_values_size']) #* np.abs(maximum_interval_value)
@@ -3,12 +3,15 @@ from PyQt5.QtGui import *
 from PyQt5.QtWidgets import *
 from datetime import datetime
 
+from Utils.SampleStore import to_physical
+
 
 class TableView(QTableWidget):
     def __init__(self, column_names):
         super().__init__()
 
-        self.old_length = 0
+        # Absolute number of samples (archived samples included) shown so far
+        self.old_count = 0
         self.num_columns = len(column_names) + 1
 
         # Row count
@@ -23,10 +26,32 @@ class TableView(QTableWidget):
         self.horizontalHeader().setStretchLastSection(True)
         self.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
-    def update_table(self, length, timestamps, values):
-        self.setRowCount(length)
-        for i in range(self.old_length, length):
-            self.setItem(i, 0, QTableWidgetItem(str(datetime.fromtimestamp(timestamps[i]))))
+    def update_table(self, length, timestamps, values, scale=None, offset=None, archived=0):
+        """
+        Updates the table with the new samples of a receiver, rows of samples that have been archived are removed.
+        :param length: Number of samples in the published arrays.
+        :param timestamps: Published timestamps.
+        :param values: Published values (storage dtype).
+        :param scale: Scale of the values, see to_physical.
+        :param offset: Value offset of the values, see to_physical.
+        :param archived: Number of archived samples before the published arrays.
+        """
+        count = archived + length
+        if count < self.old_count:
+            # The store was cleared or replaced
+            self.setRowCount(0)
+            self.old_count = 0
+        # The first row of the table shows the sample with the absolute index count - rowCount
+        for _ in range(min(archived - (self.old_count - self.rowCount()), self.rowCount())):
+            self.removeRow(0)
+        first = max(self.old_count, archived)
+        rows = self.rowCount()
+        self.setRowCount(rows + count - first)
+        # Only the new rows are converted from the storage dtype
+        new_values = to_physical(values[first - archived:length], scale, offset)
+        for i in range(len(new_values)):
+            row = rows + i
+            self.setItem(row, 0, QTableWidgetItem(str(datetime.fromtimestamp(timestamps[first - archived + i]))))
             for sensor_index in range(0, values.shape[1]):
-                self.setItem(i, sensor_index+1, QTableWidgetItem(str(values[i, sensor_index])))
-        self.old_length = length
\ No newline at end of file
+                self.setItem(row, sensor_index+1, QTableWidgetItem(str(new_values[i, sensor_index])))
+        self.old_count = count
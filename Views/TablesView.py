@@ -43,6 +43,7 @@ class TablesView(QWidget):
         """
         for table in self.tables:
             table.setRowCount(0)
+            table.old_count = 0
 
     def decoder_removed(self):
         """
@@ -61,4 +62,5 @@ class TablesView(QWidget):
         lengths, timestamps, values = received['lengths'], received['timestamps'], received['values']
         for i in range(len(timestamps)):
             if timestamps[i] is not None:
-                self.tables[i].update_table(lengths[i], timestamps[i], values[i])
\ No newline at end of file
+                self.tables[i].update_table(lengths[i], timestamps[i], values[i], received['scales'][i],
+                                            received['value_offsets'][i], received['offsets'][i])
\ No newline at end of file
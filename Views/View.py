@@ -71,6 +71,8 @@ class View(QMainWindow):
 
         self.last_time = time.time()
         self.last_fps = []
+        # Version of the last decoder snapshot that was shown
+        self.decoded_version = 0
 
     def close_all_windows(self):
         """
@@ -96,6 +98,7 @@ class View(QMainWindow):
         Do stuff when a decoder is added.
         :param decoder_info: Information about decoder.
         """
+        self.decoded_version = 0
         self.data_view.decoder_added(decoder_info)
         self.decoder_view.decoder_added(decoder_info)
         self.update_window_title()
@@ -155,10 +158,12 @@ class View(QMainWindow):
         Updates the view.
         This function is repeatedly called whenever the QTimer times out.
         """
-        decoded = self.controller.get_decoded()
-        if decoded is not None:
-            self.data_view.update_(decoded)
-            self.decoder_view.update_(decoded)
+        changes = self.controller.get_changes_since(self.decoded_version)
+        if changes is not None:
+            self.data_view.update_(changes['snapshot'])
+            if changes['version'] != self.decoded_version:
+                self.decoder_view.update_(changes)
+                self.decoded_version = changes['version']
 
         encoder_info = self.controller.get_encoder_info()
         if encoder_info is not None: